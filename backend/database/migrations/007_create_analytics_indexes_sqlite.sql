@@ -0,0 +1,9 @@
+-- Indexes for the Python analytics reads (core/member_db.py, core/alert_tracker.py)
+-- Date: 2025-09-01
+
+-- Sidebar range filters on the segmentation page
+CREATE INDEX IF NOT EXISTS idx_age ON pension_data(age);
+CREATE INDEX IF NOT EXISTS idx_annual_income ON pension_data(annual_income);
+
+-- Change tracking watermark for incremental risk alerts
+CREATE INDEX IF NOT EXISTS idx_pension_data_updated_at ON pension_data(updated_at);
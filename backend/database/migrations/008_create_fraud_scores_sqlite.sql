@@ -0,0 +1,19 @@
+-- Transaction anomaly scores written by core/fraud_scoring.py
+-- Date: 2025-09-01
+
+CREATE TABLE IF NOT EXISTS fraud_scores (
+  pension_id INTEGER PRIMARY KEY,
+  user_id TEXT NOT NULL,
+  score REAL NOT NULL,
+  flagged INTEGER NOT NULL,
+  amount_z REAL,
+  time_deviation REAL,
+  new_device INTEGER,
+  new_ip INTEGER,
+  channel_rarity REAL,
+  model_version TEXT NOT NULL,
+  scored_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_fraud_scores_user_id ON fraud_scores(user_id);
+CREATE INDEX IF NOT EXISTS idx_fraud_scores_score ON fraud_scores(score);
@@ -0,0 +1,12 @@
+-- Advisor rationales pre-generated by core/rationales.py, keyed on the prompt inputs
+-- Date: 2025-09-01
+
+CREATE TABLE IF NOT EXISTS advisor_rationales (
+  user_id TEXT NOT NULL,
+  input_hash TEXT NOT NULL,
+  model TEXT NOT NULL,
+  prompt TEXT NOT NULL,
+  rationale TEXT NOT NULL,
+  created_at TEXT NOT NULL,
+  PRIMARY KEY (user_id, input_hash)
+);
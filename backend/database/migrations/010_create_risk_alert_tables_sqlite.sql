@@ -0,0 +1,29 @@
+-- Incremental withdrawal-risk alerts maintained by core/alert_tracker.py
+-- Date: 2025-09-01
+
+CREATE TABLE IF NOT EXISTS risk_alert_state (
+  user_id TEXT PRIMARY KEY,
+  row_hash TEXT NOT NULL,
+  withdrawal_rate REAL NOT NULL,
+  status TEXT NOT NULL,
+  years_to_depletion INTEGER NOT NULL,
+  source_updated_at TEXT,
+  evaluated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS risk_alert_events (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_id TEXT NOT NULL,
+  from_status TEXT,
+  to_status TEXT NOT NULL,
+  withdrawal_rate REAL NOT NULL,
+  occurred_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS risk_alert_meta (
+  key TEXT PRIMARY KEY,
+  value TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_risk_alert_events_user_id ON risk_alert_events(user_id);
+CREATE INDEX IF NOT EXISTS idx_risk_alert_state_status ON risk_alert_state(status);
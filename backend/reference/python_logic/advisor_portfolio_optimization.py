@@ -3,52 +3,32 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-import requests
+
+from core.allocation import guess_current_allocation, rebalance_deltas, recommend_allocation
+from core.instrumentation import debug_enabled, panel_rows, stage, start_run
+from core.llm_client import stream_ollama
+from core.member_store import fill_category_defaults, load_members
+from core.rationales import build_rationale_prompt
 
 st.set_page_config(page_title="Advisor – Portfolio Optimization", layout="wide")
 st.title("📈 Advisor: Portfolio Optimization Suggestions")
-
-# -----------------------------
-# Helper: Call Ollama API
-# -----------------------------
-def ask_ollama(prompt: str) -> str:
-    try:
-        resp = requests.post(
-            "http://localhost:11434/api/generate",
-            json={"model": "mistral", "prompt": prompt, "stream": False},
-            timeout=120
-        )
-        resp.raise_for_status()
-        return resp.json().get("response", "⚠️ No response from Ollama.")
-    except Exception as e:
-        return f"⚠️ Ollama error: {str(e)}"
+timings = start_run("advisor_portfolio_optimization")
 
 # -----------------------------
 # Load Data
 # -----------------------------
+# Columns we’ll try to use; missing ones come back as NaN so the app doesn't crash
+needed = ["User_ID", "Age", "Risk_Tolerance", "Pension_Type", "Withdrawal_Strategy",
+          "Current_Savings", "Annual_Income", "Investment_Type", "Retirement_Age_Goal"]
+
+# Numeric coercion happens once when the workbook is converted to the
+# Parquet cache (see core/member_store.py); category defaults are this page's.
 @st.cache_data
 def load_data():
-    return pd.read_excel("Copy of Usecase 5(1).xlsx", sheet_name="Usecase 5 data")
+    return fill_category_defaults(load_members(columns=needed))
 
 df = load_data()
 
-# Columns we’ll try to use; we’ll be resilient if something is missing
-needed = ["User_ID", "Age", "Risk_Tolerance", "Pension_Type", "Withdrawal_Strategy",
-          "Current_Savings", "Annual_Income", "Investment_Type", "Retirement_Age_Goal"]
-for col in needed:
-    if col not in df.columns:
-        df[col] = np.nan  # create missing columns so the app doesn't crash
-
-# Basic cleaning
-df["Age"] = pd.to_numeric(df["Age"], errors="coerce")
-df["Current_Savings"] = pd.to_numeric(df["Current_Savings"], errors="coerce")
-df["Annual_Income"] = pd.to_numeric(df["Annual_Income"], errors="coerce")
-df["Retirement_Age_Goal"] = pd.to_numeric(df["Retirement_Age_Goal"], errors="coerce")
-df["Risk_Tolerance"] = df["Risk_Tolerance"].fillna("Medium")
-df["Pension_Type"] = df["Pension_Type"].fillna("Defined Contribution")
-df["Withdrawal_Strategy"] = df["Withdrawal_Strategy"].fillna("Fixed")
-df["Investment_Type"] = df["Investment_Type"].fillna("Mixed")
-
 valid_rows = df.dropna(subset=["User_ID", "Age"])
 if valid_rows.empty:
     st.error("No valid member rows found. Please check your sheet.")
@@ -75,84 +55,6 @@ with col3:
     st.metric("Withdrawal Strategy", str(member.get("Withdrawal_Strategy", "-")))
     st.metric("Current Savings ($)", f"{float(member.get('Current_Savings', 0)):,.0f}")
 
-# -----------------------------
-# Heuristic Recommendation Engine
-# -----------------------------
-def recommend_allocation(age: float,
-                         risk: str = "Medium",
-                         pension_type: str = "Defined Contribution",
-                         withdrawal_strategy: str = "Fixed",
-                         retirement_age_goal: float = 65.0):
-    """
-    Returns a dict: {'Stocks': pct, 'Bonds': pct, 'Cash': pct} summing to 100.
-    Rule-of-thumb glide path + risk tilt + withdrawal/pension adjustments.
-    """
-    # Base equity by risk
-    risk = (risk or "Medium").strip().title()
-    base_equity = {"Low": 0.40, "Medium": 0.60, "High": 0.75}.get(risk, 0.60)
-
-    # Age-based glide path: reduce equity as age increases (soft slope)
-    # Roughly -0.5% equity per year after age 30
-    glide_adj = max(0, (age - 30) * 0.005)
-    equity = max(0.25, min(0.90, base_equity - glide_adj))
-
-    # Withdrawal strategy: Flexible favors slightly more equity; Fixed/Guaranteed favors less
-    ws = (withdrawal_strategy or "Fixed").strip().title()
-    if ws in ["Flexible", "Dynamic"]:
-        equity += 0.03
-    elif ws in ["Fixed", "Bucket"]:
-        equity -= 0.03
-
-    # Pension type: Defined Benefit acts like bond-like floor -> slightly more equity possible
-    pt = (pension_type or "Defined Contribution").strip().title()
-    if "Defined Benefit" in pt:
-        equity += 0.03
-    elif "Defined Contribution" in pt:
-        equity += 0.00
-    else:
-        equity += 0.00
-
-    # Near retirement: dampen equity if within 7 years of goal
-    if not pd.isna(retirement_age_goal) and not pd.isna(age):
-        years_to_ret = max(0, float(retirement_age_goal) - float(age))
-        if years_to_ret <= 7:
-            equity -= 0.05
-
-    equity = float(np.clip(equity, 0.15, 0.90))
-    # Split remainder between bonds & cash (more cash when older or low risk)
-    remainder = 1.0 - equity
-    # Cash tilt
-    cash_base = 0.10
-    if age >= 55:
-        cash_base += 0.05
-    if risk == "Low":
-        cash_base += 0.05
-    cash = float(np.clip(cash_base, 0.05, 0.25))
-    bonds = float(max(0.0, remainder - cash))
-
-    # Normalize to 100%
-    total = equity + bonds + cash
-    equity /= total; bonds /= total; cash /= total
-
-    return {
-        "Stocks": round(equity * 100, 1),
-        "Bonds": round(bonds * 100, 1),
-        "Cash": round(cash * 100, 1),
-    }
-
-# -----------------------------
-# Estimate Current Allocation (from Investment_Type) + allow edits
-# -----------------------------
-def guess_current_allocation(investment_type: str):
-    it = (investment_type or "Mixed").strip().lower()
-    if "bond" in it:
-        return {"Stocks": 20.0, "Bonds": 70.0, "Cash": 10.0}
-    if "equity" in it or "stock" in it:
-        return {"Stocks": 70.0, "Bonds": 20.0, "Cash": 10.0}
-    if "balanced" in it or "mixed" in it or "fund" in it:
-        return {"Stocks": 50.0, "Bonds": 40.0, "Cash": 10.0}
-    return {"Stocks": 50.0, "Bonds": 40.0, "Cash": 10.0}
-
 st.subheader("📐 Current vs Recommended Allocation")
 left, right = st.columns(2)
 
@@ -204,32 +106,23 @@ st.table(pd.DataFrame({
     "Change Needed (pp)": list(delta.values())
 }))
 
+# -----------------------------
+# Firm-wide view: same rules applied to every member in one pass
+# -----------------------------
+with st.expander("Firm-wide Rebalance Deltas (all members)"):
+    with stage("rebalance_deltas", rows=len(valid_rows)):
+        book = rebalance_deltas(valid_rows)
+    st.dataframe(book, use_container_width=True)
+    st.download_button("Download CSV", book.to_csv(index=False), file_name="rebalance_deltas.csv")
+
 # -----------------------------
 # AI: Advisor Explanation
 # -----------------------------
 if st.button("🤖 Generate Advisor Rationale"):
     with st.spinner("Thinking..."):
-        prompt = f"""
-You are a portfolio strategist for retirement plans.
-
-Member Profile:
-- Age: {member.get('Age')}
-- Risk Tolerance: {member.get('Risk_Tolerance')}
-- Pension Type: {member.get('Pension_Type')}
-- Withdrawal Strategy: {member.get('Withdrawal_Strategy')}
-- Current Savings: ${member.get('Current_Savings')}
-- Current Allocation: {current_alloc}
-- Recommended Allocation: {rec}
-
-Explain in 3–5 sentences:
-1) Why this recommended mix balances growth vs. safety for this member.
-2) The main risks if they keep current allocation.
-3) A simple next-step (rebalance suggestion).
-Keep it crisp, professional, and client-friendly.
-"""
-        ai_text = ask_ollama(prompt)
+        prompt = build_rationale_prompt(member, current_alloc, rec)
         st.markdown("### 🧠 Advisor Rationale")
-        st.write(ai_text)
+        st.write_stream(stream_ollama(prompt))
 
 # -----------------------------
 # Notes
@@ -241,3 +134,10 @@ with st.expander("Notes on the Recommendation Engine"):
 - Adds a de-risking tilt when **within ~7 years** of retirement age goal.
 - These are **heuristics** (good defaults). Advisors can override based on total picture (tax, outside assets, liabilities).
 """)
+
+# -----------------------------
+# Debug: stage timings for this run
+# -----------------------------
+if debug_enabled() or st.query_params.get("debug") == "1":
+    with st.expander("⏱️ Stage timings"):
+        st.dataframe(panel_rows(timings), use_container_width=True)
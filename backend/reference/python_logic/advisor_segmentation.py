@@ -1,125 +1,172 @@
 # advisor_segmentation.py
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
 import json
-import requests
+
+from core.cohort_aggregates import (INCOME_BAND_WIDTH, MEMBER_COLUMNS as AGGREGATE_COLUMNS, CohortAggregates,
+                                    band_range)
+from core.instrumentation import debug_enabled, panel_rows, stage, start_run
+from core.llm_client import stream_ollama
+from core.member_db import db_column, open_member_db
+from core.member_store import DEFAULT_CACHE_DIR, data_version, load_members
+from core.model_selection import select_k
+from core.plot_sampling import POINT_LIMIT, density_grid, render_mode, stratified_sample
+from core.segment_cache import SegmentationCache, segmentation_key
+from core.segmentation import (FEATURE_COLUMNS, MEMBER_COLUMNS, RISK_MAP, filter_members, prepare_members,
+                               segment_members, standardize)
+from core.similar_members import MemberIndex, sync_index
 
 st.set_page_config(page_title="Advisor – Member Segmentation", layout="wide")
 st.title("👥 Advisor: Member Segmentation for Tailored Advice")
-
-# -----------------------------
-# Helper: Call Ollama API
-# -----------------------------
-def ask_ollama(prompt: str) -> str:
-    try:
-        resp = requests.post(
-            "http://localhost:11434/api/generate",
-            json={"model": "mistral", "prompt": prompt, "stream": False},
-            timeout=120
-        )
-        resp.raise_for_status()
-        return resp.json().get("response", "⚠️ No response from Ollama.")
-    except Exception as e:
-        return f"⚠️ Ollama error: {str(e)}"
+timings = start_run("advisor_segmentation")
 
 # -----------------------------
 # Load Data
 # -----------------------------
+needed_cols = MEMBER_COLUMNS
+
+@st.cache_resource
+def get_member_db():
+    # The backend's pension_insights.db when it's there; otherwise the workbook
+    return open_member_db()
+
 @st.cache_data
-def load_data():
-    return pd.read_excel("Copy of Usecase 5(1).xlsx", sheet_name="Usecase 5 data")
+def load_data(version):
+    return load_members(columns=needed_cols)
 
-df = load_data()
+@st.cache_resource
+def get_cohort_store():
+    return CohortAggregates()
+
+def cohort_aggregates(version):
+    # Cells are rebuilt once per data version; slider bounds and the cohort
+    # overview after that only read the cells, never the member rows
+    store = get_cohort_store()
+    if store.version() != version:
+        members = (member_db.fetch_frame(AGGREGATE_COLUMNS) if member_db is not None
+                   else load_members(columns=AGGREGATE_COLUMNS))
+        store.refresh(members, version)
+    return store
+
+member_db = get_member_db()
+source_version = member_db.version() if member_db is not None else data_version()
 
 # Basic checks & cleanup
-needed_cols = [
-    "User_ID", "Age", "Annual_Income", "Current_Savings", "Risk_Tolerance"
-]
-missing = [c for c in needed_cols if c not in df.columns]
+if member_db is not None:
+    missing = [c for c in needed_cols + ["Pension_Type"] if db_column(c) not in member_db.table_columns]
+    if not missing and not cohort_aggregates(source_version).bounds():
+        # pension_data has no members yet: use the workbook instead
+        member_db, source_version = None, data_version()
+if member_db is None:
+    df = load_data(source_version)
+    missing = [c for c in needed_cols if df[c].isna().all()]
+    if not missing:
+        df_clean = prepare_members(df)
 if missing:
     st.error(f"Missing required columns in your sheet: {missing}")
     st.stop()
-
-# Keep only rows with complete required fields
-df_clean = df.dropna(subset=needed_cols).copy()
-
-# Encode Risk_Tolerance
-risk_map = {"Low": 1, "Medium": 2, "High": 3}
-df_clean["Risk_Tolerance_Num"] = df_clean["Risk_Tolerance"].map(risk_map).fillna(2)
+# Same members prepare_members keeps: every feature present, a known risk tolerance
+bounds = cohort_aggregates(source_version).bounds(list(RISK_MAP))
+if not bounds:
+    st.error("No members with the required fields to segment. Please check your sheet.")
+    st.stop()
 
 # Optional: sidebar filters to focus segmentation
 st.sidebar.header("Filters")
-age_min, age_max = int(df_clean["Age"].min()), int(df_clean["Age"].max())
+age_min, age_max = int(bounds["Age"][0]), int(bounds["Age"][1])
 age_range = st.sidebar.slider("Age range", min_value=age_min, max_value=age_max,
                               value=(age_min, age_max))
-income_min, income_max = float(df_clean["Annual_Income"].min()), float(df_clean["Annual_Income"].max())
-income_range = st.sidebar.slider("Annual Income range ($)", min_value=float(income_min),
-                                 max_value=float(income_max), value=(float(income_min), float(income_max)))
+# Income moves in whole $5k bands, so the cohort and the cell overview cover the same members
+income_min = float(bounds["Annual_Income"][0] // INCOME_BAND_WIDTH * INCOME_BAND_WIDTH)
+income_max = float((bounds["Annual_Income"][1] // INCOME_BAND_WIDTH + 1) * INCOME_BAND_WIDTH)
+income_edges = st.sidebar.slider("Annual Income range ($)", min_value=income_min, max_value=income_max,
+                                 value=(income_min, income_max), step=float(INCOME_BAND_WIDTH))
+income_range = band_range(*income_edges)
 
 risk_filter = st.sidebar.multiselect("Risk Tolerance", ["Low", "Medium", "High"],
                                      default=["Low", "Medium", "High"])
 
-mask = (
-    (df_clean["Age"].between(age_range[0], age_range[1])) &
-    (df_clean["Annual_Income"].between(income_range[0], income_range[1])) &
-    (df_clean["Risk_Tolerance"].isin(risk_filter))
-)
-data = df_clean.loc[mask].copy()
+@st.cache_data
+def load_cohort(version, age_range, income_range, risk_filter):
+    if member_db is not None:
+        # Filters run in SQLite on indexed columns; only the page's columns come back
+        filters = {"Age": tuple(age_range), "Annual_Income": tuple(income_range),
+                   "Risk_Tolerance": list(risk_filter)}
+        return prepare_members(member_db.fetch_frame(needed_cols, filters))
+    return filter_members(df_clean, age_range, income_range, risk_filter)
 
-st.caption(f"Showing **{len(data)}** members after filters.")
+cohort = load_cohort(source_version, age_range, income_range, risk_filter)
 
 # -----------------------------
-# KMeans Segmentation
+# Cohort overview (pre-aggregated cells)
 # -----------------------------
-features = data[["Age", "Annual_Income", "Current_Savings", "Risk_Tolerance_Num"]].copy()
-
-# Standardize (robust fallback if sklearn missing)
-try:
-    from sklearn.preprocessing import StandardScaler
-    from sklearn.cluster import KMeans
-    scaler = StandardScaler()
-    X = scaler.fit_transform(features.values)
-    sklearn_ok = True
-except Exception:
-    # Manual standardization
-    mu = features.mean()
-    sigma = features.std().replace(0, 1)
-    X = ((features - mu) / sigma).values
-    sklearn_ok = False
+with st.expander("📋 Cohort overview"):
+    overview = cohort_aggregates(source_version).summary(age_range, income_range, risk_filter)
+    st.dataframe(overview.round(2), use_container_width=True)
+    st.caption("From pre-aggregated cells: counts, means, min and max are exact; medians are within 1%.")
 
+# -----------------------------
+# KMeans Segmentation
+# -----------------------------
 st.sidebar.header("Segmentation Settings")
-k = st.sidebar.slider("Number of clusters (k)", 2, 6, 4)
-
-if sklearn_ok:
-    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)  # fixed here
-    labels = kmeans.fit_predict(X)
-else:
-    # Very small fallback: pick k random centroids and do a few iterations
-    rng = np.random.RandomState(42)
-    centroids = X[rng.choice(len(X), size=k, replace=False)]
-    for _ in range(10):
-        dists = ((X[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
-        labels = dists.argmin(axis=1)
-        for ci in range(k):
-            pts = X[labels == ci]
-            if len(pts):
-                centroids[ci] = pts.mean(axis=0)
-
-data["Cluster"] = labels
+auto_k = st.sidebar.checkbox("Suggest k automatically", value=False)
+k_default = 4
+if auto_k:
+    # Fits k = 2..10 (in parallel for large cohorts); cached per filtered dataset
+    X, _, _ = standardize(cohort[FEATURE_COLUMNS].values)
+    with stage("select_k", rows=len(X)):
+        k_sweep = select_k(X, range(2, 11))
+    k_default = k_sweep["recommended_k"]
+k = st.sidebar.slider("Number of clusters (k)", 2, 10, k_default)
+
+@st.cache_resource
+def get_segment_cache():
+    return SegmentationCache(max_entries=64, disk_dir=DEFAULT_CACHE_DIR / "segments")
+
+full_filters = ((age_min, age_max), band_range(income_min, income_max), list(RISK_MAP))
+
+def compute_anchor():
+    # Seeded cold fit over the unfiltered book for this data version and k
+    return segment_members(load_cohort(source_version, *full_filters), *full_filters, k)
+
+def compute_segments(init_centroids_raw):
+    # Warm start from the anchor's centroids (raw feature units) so nudging a
+    # filter is one short refinement instead of 10 restarts. The anchor only
+    # depends on (data version, k), so the shared cache stays reproducible.
+    # Cluster and member segment labels come from the rule engine in
+    # core.segment_labels.
+    return segment_members(cohort, age_range, income_range, risk_filter, k,
+                           init_centroids_raw=init_centroids_raw)
+
+# Filter mask, scaling, fit, profile and labels are only recomputed when the
+# data or a segmentation input changes (not on drill-down or button clicks).
+seg_cache = get_segment_cache()
+seg_key = segmentation_key(source_version, age_range, income_range, risk_filter, k)
+anchor_key = segmentation_key(source_version, *full_filters, k)
+segments = seg_cache.get_warm_started(seg_key, anchor_key, compute_segments, compute_anchor)
+st.sidebar.caption("Segmentation cache: {hits} hits, {disk_hits} from disk, {misses} misses"
+                   .format(**seg_cache.stats))
+
+data = cohort.loc[segments["index"]].copy()
+data["Cluster"] = segments["labels"]
+data["Segment"] = segments["member_segments"]
+
+st.caption(f"Showing **{len(data)}** members after filters.")
+
+if auto_k:
+    with st.expander(f"Model selection: suggested k = {k_sweep['recommended_k']} "
+                     f"(elbow at k = {k_sweep['elbow_k']})"):
+        metrics_df = pd.DataFrame(k_sweep["metrics"]).set_index("k")
+        st.dataframe(metrics_df.round(3))
+        st.line_chart(metrics_df[["silhouette", "davies_bouldin"]])
+        st.caption("Silhouette: higher is better (computed on a sample). "
+                   "Davies–Bouldin: lower is better. Inertia flattens past the elbow.")
 
 # -----------------------------
 # Cluster Profiles
 # -----------------------------
-profile_cols = ["Age", "Annual_Income", "Current_Savings", "Risk_Tolerance_Num"]
-cluster_profile = (
-    data.groupby("Cluster")[profile_cols]
-    .agg(["mean", "median", "min", "max"])
-    .round(2)
-)
-cluster_counts = data["Cluster"].value_counts().sort_index()
-cluster_profile["count"] = cluster_counts
+cluster_profile = segments["profile"]
 
 st.subheader("📊 Cluster Profiles")
 st.dataframe(cluster_profile)
@@ -127,52 +174,63 @@ st.dataframe(cluster_profile)
 # -----------------------------
 # Visualization
 # -----------------------------
-st.subheader("📈 Income vs. Savings by Cluster")
-fig = px.scatter(
-    data,
-    x="Annual_Income",
-    y="Current_Savings",
-    color=data["Cluster"].astype(str),
-    hover_data=["User_ID", "Age", "Risk_Tolerance"],
-    labels={"color": "Cluster"},
-    title="Member Segments"
-)
-st.plotly_chart(fig, use_container_width=True)
+DETAIL_COLUMNS = ["User_ID", "Age", "Annual_Income", "Current_Savings", "Risk_Tolerance", "Segment"]
 
-# Optional second view: Age vs. Savings
-with st.expander("Show Age vs. Savings"):
-    fig2 = px.scatter(
-        data,
-        x="Age",
-        y="Current_Savings",
-        color=data["Cluster"].astype(str),
-        hover_data=["User_ID", "Annual_Income", "Risk_Tolerance"],
+def member_scatter(data, x, y, title, key, data_key):
+    # The browser gets at most POINT_LIMIT points (a per-cluster stratified
+    # sample, WebGL above a thousand) or a density grid, however large the
+    # cohort. Points carry only their row position; member details are
+    # looked up for the points an advisor selects. The chart is keyed by
+    # ``data_key`` (the segmentation key), so a selection made before a
+    # filter change is dropped rather than read against other rows.
+    # Returns the points sent.
+    view = "Points"
+    if len(data) > POINT_LIMIT:
+        view = st.radio("View", ["Sampled points", "Density"], horizontal=True, key=f"{key}_view")
+    if view == "Density":
+        grid = density_grid(data[x], data[y], data["Cluster"])
+        fig = px.scatter(grid, x="x", y="y", size="count", color=grid["group"].astype(str),
+                         hover_data={"count": True, "share": ":.0%"},
+                         labels={"x": x, "y": y, "color": "Cluster"},
+                         title=f"{title} (density of {len(data):,} members)")
+        st.plotly_chart(fig, use_container_width=True, key=key)
+        st.caption("Marker size is the member count per cell, coloured by its most common cluster. "
+                   "Switch to sampled points to inspect members.")
+        return len(grid)
+
+    rows = stratified_sample(data["Cluster"].to_numpy())
+    shown = data.iloc[rows]
+    fig = px.scatter(
+        shown,
+        x=x,
+        y=y,
+        color=shown["Cluster"].astype(str),
+        custom_data=[rows],
+        render_mode=render_mode(len(shown)),
         labels={"color": "Cluster"},
-        title="Age vs. Savings by Cluster"
+        title=title if len(shown) == len(data) else f"{title} ({len(shown):,} of {len(data):,} members)"
     )
-    st.plotly_chart(fig2, use_container_width=True)
-
-# -----------------------------
-# Quick Labels for Clusters (rule-of-thumb)
-# -----------------------------
-def label_cluster(row):
-    inc = row[("Annual_Income", "mean")]
-    sav = row[("Current_Savings", "mean")]
-    risk = row[("Risk_Tolerance_Num", "mean")]
-    # Simple heuristics
-    if sav >= data["Current_Savings"].median() and inc >= data["Annual_Income"].median():
-        return "High Capacity Savers"
-    if sav < data["Current_Savings"].median() and inc >= data["Annual_Income"].median():
-        return "High Income, Low Savings"
-    if risk >= 2.5 and sav < data["Current_Savings"].median():
-        return "Aggressive & Underfunded"
-    if risk <= 1.5 and sav >= data["Current_Savings"].median():
-        return "Conservative & Funded"
-    return "Balanced"
-
-cluster_labels = {}
-for c in cluster_profile.index:
-    cluster_labels[int(c)] = label_cluster(cluster_profile.loc[c])
+    event = st.plotly_chart(fig, use_container_width=True, key=f"{key}_{data_key[:12]}", on_select="rerun",
+                            selection_mode=("points", "box", "lasso"))
+    picked = sorted({int(p["customdata"][0]) for p in event.selection.points if p.get("customdata")}
+                    & set(range(len(data))))
+    if picked:
+        st.dataframe(data.iloc[picked][DETAIL_COLUMNS], use_container_width=True)
+    else:
+        st.caption("Click, box- or lasso-select points to see member details.")
+    return len(shown)
+
+st.subheader("📈 Income vs. Savings by Cluster")
+with stage("plot_income_savings", rows=len(data)) as timing:
+    timing.meta["points_sent"] = member_scatter(data, "Annual_Income", "Current_Savings", "Member Segments",
+                                                key="scatter_income", data_key=seg_key)
+
+# Optional second view: Age vs. Savings
+with st.expander("Show Age vs. Savings"), stage("plot_age_savings", rows=len(data)) as timing:
+    timing.meta["points_sent"] = member_scatter(data, "Age", "Current_Savings", "Age vs. Savings by Cluster",
+                                                key="scatter_age", data_key=seg_key)
+
+cluster_labels = segments["cluster_labels"]
 
 st.subheader("🏷️ Suggested Cluster Labels")
 st.write({f"Cluster {k}": v for k, v in cluster_labels.items()})
@@ -209,9 +267,8 @@ For each cluster:
 3) Flag urgent risks if any (e.g., low savings + high risk).
 Keep it crisp and actionable.
 """
-        ai_text = ask_ollama(prompt)
         st.markdown("### 🤖 Advisor Playbook by Segment")
-        st.write(ai_text)
+        st.write_stream(stream_ollama(prompt))
 
 # -----------------------------
 # Drilldown: Members in a Cluster
@@ -219,8 +276,48 @@ Keep it crisp and actionable.
 st.subheader("🔎 Drill Down by Cluster")
 sel_cluster = st.selectbox("Select cluster to inspect", sorted(data["Cluster"].unique()))
 cluster_view = data[data["Cluster"] == sel_cluster][
-    ["User_ID", "Age", "Annual_Income", "Current_Savings", "Risk_Tolerance"]
+    ["User_ID", "Age", "Annual_Income", "Current_Savings", "Risk_Tolerance", "Segment"]
 ].sort_values("Current_Savings", ascending=False)
 st.dataframe(cluster_view, use_container_width=True)
 
+# -----------------------------
+# Members like me (k-NN over the standardized features)
+# -----------------------------
+@st.cache_resource
+def get_member_index(version):
+    # Built over every member (not just the filtered cohort) and kept on disk
+    # so a restart doesn't rescan the table. When the database changes, the
+    # stored index only re-reads rows updated since its watermark; the
+    # workbook has no updated_at, so a new workbook version is a rebuild.
+    path = DEFAULT_CACHE_DIR / "member_index.npz"
+    index = MemberIndex.load(path) if path.exists() else None
+    if index is not None and index.version == version:
+        return index
+    if member_db is not None:
+        index = sync_index(member_db, needed_cols, version, index)
+    else:
+        index = MemberIndex.build(df_clean, version=version)
+    index.save(path)
+    return index
+
+st.subheader("🤝 Members Like Me")
+like_col1, like_col2 = st.columns([3, 1])
+with like_col1:
+    like_user = st.selectbox("Benchmark member", data["User_ID"], key="like_user")
+with like_col2:
+    like_k = st.number_input("Neighbours", min_value=1, max_value=50, value=10)
+member_index = get_member_index(source_version)
+with stage("similar_members", rows=len(member_index)):
+    similar = member_index.query(like_user, k=int(like_k))
+similar["Risk_Tolerance"] = similar["Risk_Tolerance_Num"].round().map({v: k for k, v in RISK_MAP.items()})
+st.dataframe(similar.drop(columns="Risk_Tolerance_Num").round(2), use_container_width=True)
+st.caption("Nearest members across the whole book on standardized age, income, savings and risk tolerance.")
+
+# -----------------------------
+# Debug: stage timings for this run
+# -----------------------------
+if debug_enabled() or st.query_params.get("debug") == "1":
+    with st.expander("⏱️ Stage timings"):
+        st.dataframe(panel_rows(timings), use_container_width=True)
+
 st.caption("Tip: Use filters (left sidebar) to focus on specific cohorts before clustering.")
@@ -0,0 +1,7 @@
+"""
+Headless benchmarks for the python_logic compute paths.
+
+    python -m benchmarks.run --sizes 1000 100000 --compare benchmarks/baseline.json
+
+Set PYTHON_LOGIC_BENCH_1M=1 to include the 1M-row tier.
+"""
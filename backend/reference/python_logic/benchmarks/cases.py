@@ -0,0 +1,190 @@
+# benchmarks/cases.py
+"""
+Benchmark cases. Each case has an untimed ``setup(members, workdir)`` that
+returns the state the timed ``run(state)`` works on, and an optional row cap
+for paths that are too slow to be worth timing at scale (XLSX parsing, the
+per-member scalar loops kept for comparison).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from core.allocation import recommend_allocation, recommend_allocation_batch
+from core.member_db import MemberDB
+from core.member_store import clean_members, pyarrow_ok, read_workbook
+from core.projection import RISK_RETURNS, balance_path, future_value
+from core.real_projection import MEMBER_COLUMNS as REAL_COLUMNS, project_real_members
+from core.risk_alerts import scan_members
+from core.segmentation import FEATURE_COLUMNS, MEMBER_COLUMNS, cluster_profile, prepare_members, segment_members
+
+from .synthetic import to_member_frame, write_sqlite, write_workbook
+
+ALLOCATION_COLUMNS = ["Age", "Risk_Tolerance", "Pension_Type", "Withdrawal_Strategy", "Retirement_Age_Goal"]
+
+
+@dataclass
+class Case:
+    name: str
+    setup: object
+    run: object
+    max_rows: int = None
+
+
+CASES = {}
+
+
+def case(name: str, max_rows: int = None):
+    def register(setup):
+        def decorator(run):
+            CASES[name] = Case(name, setup, run, max_rows)
+            return run
+        return decorator
+    return register
+
+
+def _segment_frame(members):
+    return prepare_members(to_member_frame(members)[MEMBER_COLUMNS])
+
+
+# -----------------------------
+# Loading
+# -----------------------------
+def _setup_xlsx(members, workdir):
+    path = workdir / f"members_{len(members)}.xlsx"
+    write_workbook(members, path)
+    return path
+
+
+@case("load_xlsx", max_rows=10_000)(_setup_xlsx)
+def _load_xlsx(path):
+    return clean_members(read_workbook(path))
+
+
+def _setup_parquet(members, workdir):
+    path = workdir / f"members_{len(members)}.parquet"
+    to_member_frame(members).to_parquet(path, engine="pyarrow", index=False)
+    return path
+
+
+if pyarrow_ok:
+    import pyarrow.parquet as pq
+
+    @case("load_parquet_cache")(_setup_parquet)
+    def _load_parquet(path):
+        # What load_members does on a warm cache
+        return pq.read_table(path, columns=MEMBER_COLUMNS, memory_map=True).to_pandas()
+
+
+def _setup_sqlite(members, workdir):
+    path = workdir / f"members_{len(members)}.db"
+    write_sqlite(members, path)
+    return MemberDB(path, wal=False)
+
+
+@case("load_sqlite_pushdown")(_setup_sqlite)
+def _load_sqlite(db):
+    return db.fetch_frame(MEMBER_COLUMNS, {"Age": (30, 55), "Risk_Tolerance": ["Low", "High"]})
+
+
+# -----------------------------
+# Allocation
+# -----------------------------
+def _setup_allocation(members, workdir):
+    return to_member_frame(members)[ALLOCATION_COLUMNS]
+
+
+@case("recommend_allocation_scalar", max_rows=100_000)(_setup_allocation)
+def _allocation_scalar(df):
+    # The portfolio page's per-member call, applied row by row
+    return [recommend_allocation(m["Age"], m["Risk_Tolerance"], m["Pension_Type"],
+                                 m["Withdrawal_Strategy"], m["Retirement_Age_Goal"])
+            for m in df.to_dict("records")]
+
+
+@case("recommend_allocation_batch")(_setup_allocation)
+def _allocation_batch(df):
+    return recommend_allocation_batch(df)
+
+
+# -----------------------------
+# Projections
+# -----------------------------
+def _setup_growth(members, workdir):
+    df = to_member_frame(members)
+    return {
+        "savings": df["Current_Savings"].to_numpy(dtype=float),
+        "contribution": df["Contribution_Amount"].to_numpy(dtype=float),
+        "rate": df["Risk_Tolerance"].map(RISK_RETURNS).astype(float).fillna(0.06).to_numpy(),
+        "years": np.maximum(df["Retirement_Age_Goal"].to_numpy() - df["Age"].to_numpy(), 0),
+    }
+
+
+def _yearly_loop(balance, contribution, rate, years):
+    # simulate_growth as the pages originally wrote it
+    balances = []
+    for _ in range(int(years)):
+        balance = balance * (1 + rate) + contribution
+        balances.append(balance)
+    return balances
+
+
+@case("simulate_growth_loop", max_rows=100_000)(_setup_growth)
+def _growth_loop(state):
+    return [_yearly_loop(s, c, r, y) for s, c, r, y in
+            zip(state["savings"], state["contribution"], state["rate"], state["years"])]
+
+
+@case("simulate_growth_paths", max_rows=100_000)(_setup_growth)
+def _growth_paths(state):
+    # Today's simulate_growth (closed-form balance_path), once per member
+    return [balance_path(s, c, r, y) for s, c, r, y in
+            zip(state["savings"], state["contribution"], state["rate"], state["years"])]
+
+
+@case("simulate_growth_final_batch")(_setup_growth)
+def _growth_batch(state):
+    return future_value(state["savings"], state["contribution"], state["rate"], state["years"])
+
+
+def _setup_real(members, workdir):
+    return to_member_frame(members)[REAL_COLUMNS]
+
+
+@case("real_projection_monthly")(_setup_real)
+def _real_projection(df):
+    return project_real_members(df)
+
+
+def _setup_withdrawal(members, workdir):
+    return to_member_frame(members)[["User_ID", "Age", "Current_Savings", "Monthly_Expenses"]]
+
+
+@case("withdrawal_projection")(_setup_withdrawal)
+def _withdrawal(df):
+    return scan_members(df)
+
+
+# -----------------------------
+# Segmentation
+# -----------------------------
+def _setup_kmeans(members, workdir):
+    df = _segment_frame(members)
+    return df, (df["Age"].min(), df["Age"].max()), (df["Annual_Income"].min(), df["Annual_Income"].max())
+
+
+@case("kmeans_segmentation")(_setup_kmeans)
+def _kmeans(state):
+    df, age_range, income_range = state
+    return segment_members(df, age_range, income_range, ["Low", "Medium", "High"], 4)
+
+
+def _setup_profile(members, workdir):
+    df = _segment_frame(members)
+    labels = np.random.default_rng(0).integers(0, 4, len(df))
+    return df, labels
+
+
+@case("profile_aggregation")(_setup_profile)
+def _profile(state):
+    df, labels = state
+    return cluster_profile(df, labels, FEATURE_COLUMNS)
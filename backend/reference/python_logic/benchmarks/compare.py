@@ -0,0 +1,80 @@
+# benchmarks/compare.py
+"""
+Regression gate: compare a benchmark report against a stored baseline.
+
+A case regresses when its median time grows by more than ``time_tolerance``
+(relative) or its peak memory by more than ``memory_tolerance``. Timings
+under ``min_seconds`` in both runs are treated as noise. Cases missing from
+either side are reported but never fail the gate.
+
+    python -m benchmarks.compare benchmarks/baseline.json results.json
+"""
+import argparse
+import json
+from pathlib import Path
+
+DEFAULT_TIME_TOLERANCE = 0.25
+DEFAULT_MEMORY_TOLERANCE = 0.25
+DEFAULT_MIN_SECONDS = 0.005
+
+
+def load_report(path) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def _ratio(new, old):
+    return new / old if old else float("inf") if new else 1.0
+
+
+def compare(baseline: dict, current: dict, time_tolerance: float = DEFAULT_TIME_TOLERANCE,
+            memory_tolerance: float = DEFAULT_MEMORY_TOLERANCE, min_seconds: float = DEFAULT_MIN_SECONDS) -> list:
+    """One row per case in either report: ratios, status and a ``regression`` flag."""
+    old, new = baseline["results"], current["results"]
+    rows = []
+    for key in sorted(set(old) | set(new)):
+        if key not in new or key not in old:
+            rows.append({"key": key, "status": "missing" if key not in new else "new", "regression": False})
+            continue
+        before, after = old[key], new[key]
+        time_ratio = _ratio(after["seconds_median"], before["seconds_median"])
+        memory_ratio = _ratio(after["peak_mb"], before["peak_mb"])
+        slower = (time_ratio > 1 + time_tolerance
+                  and max(after["seconds_median"], before["seconds_median"]) >= min_seconds)
+        bigger = memory_ratio > 1 + memory_tolerance
+        status = " + ".join(s for s, hit in (("slower", slower), ("more memory", bigger)) if hit) or "ok"
+        rows.append({"key": key, "status": status, "regression": slower or bigger,
+                     "time_ratio": time_ratio, "memory_ratio": memory_ratio,
+                     "seconds": after["seconds_median"], "baseline_seconds": before["seconds_median"],
+                     "peak_mb": after["peak_mb"], "baseline_peak_mb": before["peak_mb"]})
+    return rows
+
+
+def format_report(rows) -> str:
+    lines = [f"{'case':<42} {'time':>8} {'memory':>8}  status"]
+    for row in rows:
+        if "time_ratio" in row:
+            lines.append(f"{row['key']:<42} {row['time_ratio']:7.2f}x {row['memory_ratio']:7.2f}x  {row['status']}")
+        else:
+            lines.append(f"{row['key']:<42} {'-':>8} {'-':>8}  {row['status']}")
+    regressions = sum(row["regression"] for row in rows)
+    lines.append(f"{regressions} regression(s)" if regressions else "no regressions")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Fail when a benchmark report regresses against a baseline.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--time-tolerance", type=float, default=DEFAULT_TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE)
+    parser.add_argument("--min-seconds", type=float, default=DEFAULT_MIN_SECONDS)
+    args = parser.parse_args(argv)
+
+    rows = compare(load_report(args.baseline), load_report(args.current),
+                   args.time_tolerance, args.memory_tolerance, args.min_seconds)
+    print(format_report(rows))
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
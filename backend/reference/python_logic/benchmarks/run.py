@@ -0,0 +1,133 @@
+# benchmarks/run.py
+"""
+Time every benchmark case at each member count and record peak memory.
+
+    python -m benchmarks.run --sizes 1000 100000 --out results.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+
+Timings are the median and min of ``--repeat`` runs after one warm-up;
+peak memory is measured with tracemalloc on a separate run so tracing
+doesn't skew the timings (Arrow buffers are allocated outside Python, so
+the Parquet case under-reports). Nothing here imports streamlit or Ollama.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cases import CASES
+from .compare import DEFAULT_MEMORY_TOLERANCE, DEFAULT_TIME_TOLERANCE, compare, format_report, load_report
+from .synthetic import generate_members
+
+DEFAULT_SIZES = [1_000, 100_000]
+LARGE_SIZE = 1_000_000
+DEFAULT_REPEAT = 5
+
+
+def default_sizes() -> list:
+    # The 1M tier takes minutes (mostly building the inputs), so it is opt-in
+    if os.environ.get("PYTHON_LOGIC_BENCH_1M") == "1":
+        return DEFAULT_SIZES + [LARGE_SIZE]
+    return list(DEFAULT_SIZES)
+
+
+def result_key(name: str, size: int) -> str:
+    return f"{name}@{size}"
+
+
+def measure(run, state, repeat: int = DEFAULT_REPEAT) -> dict:
+    run(state)    # warm-up: imports, caches, page faults
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds_median": statistics.median(times),
+        "seconds_min": min(times),
+        "peak_mb": peak / 2**20,
+        "repeat": repeat,
+    }
+
+
+def run_benchmarks(sizes=None, names=None, repeat: int = DEFAULT_REPEAT, workdir=None, log=print) -> dict:
+    sizes = sizes or default_sizes()
+    names = names or list(CASES)
+    unknown = set(names) - set(CASES)
+    if unknown:
+        raise KeyError(f"unknown benchmark cases: {', '.join(sorted(unknown))}")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="python_logic_bench_") as tmp:
+        workdir = Path(workdir or tmp)
+        for size in sizes:
+            members = generate_members(size)
+            for name in names:
+                case = CASES[name]
+                if case.max_rows is not None and size > case.max_rows:
+                    continue
+                state = case.setup(members, workdir)
+                try:
+                    results[result_key(name, size)] = {"case": name, "rows": size, **measure(case.run, state, repeat)}
+                finally:
+                    if hasattr(state, "close"):
+                        state.close()
+                r = results[result_key(name, size)]
+                log(f"{name:<30} {size:>9,} rows  {r['seconds_median'] * 1000:10.2f} ms  {r['peak_mb']:8.1f} MB")
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", help="member counts (default 1000 100000, plus 1M "
+                        "when PYTHON_LOGIC_BENCH_1M=1)")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), help="subset of cases to run")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", metavar="BASELINE", help="fail on regressions against this report")
+    parser.add_argument("--time-tolerance", type=float, default=DEFAULT_TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE)
+    args = parser.parse_args(argv)
+    # Keep the instrumented loaders from logging every repeat to backend/logs
+    os.environ.setdefault("PYTHON_LOGIC_TIMING", "0")
+
+    report = run_benchmarks(args.sizes, args.cases, args.repeat)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2) + "\n")
+    if args.compare:
+        rows = compare(load_report(args.compare), report, args.time_tolerance, args.memory_tolerance)
+        print(format_report(rows))
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
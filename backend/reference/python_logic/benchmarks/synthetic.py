@@ -0,0 +1,124 @@
+# benchmarks/synthetic.py
+"""
+Synthetic members shaped like the backend's ``pension_data`` table.
+
+Column names, types and category levels follow ``pension_insights.db``, and
+each numeric range is the seeded members' min/max rounded outwards. Like the
+seeded data, every column is drawn on its own: ``total_annual_contribution``
+is not derived from ``contribution_amount`` or the frequency. The same frame
+can be written to SQLite, XLSX or Parquet and read back through the real
+loaders.
+"""
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from core.member_db import frame_column
+from core.member_store import DEFAULT_SHEET, clean_members
+
+# (low, high) for uniform integer columns, inclusive
+INT_RANGES = {
+    "age": (25, 64), "number_of_dependents": (0, 4), "life_expectancy_estimate": (75, 94),
+    "annual_income": (30_000, 150_000), "current_savings": (5_000, 500_000), "debt_level": (0, 200_000),
+    "monthly_expenses": (1_000, 10_000), "retirement_age_goal": (60, 69), "contribution_amount": (100, 2_000),
+    "employer_contribution": (0, 1_000), "total_annual_contribution": (1_000, 24_000), "years_contributed": (1, 39),
+    "projected_pension_amount": (50_000, 1_000_000), "expected_annual_payout": (10_000, 80_000),
+    "inflation_adjusted_payout": (8_000, 75_000), "years_of_payout": (10, 29), "transaction_amount": (100, 10_000),
+    "account_age": (1, 29),
+}
+# (low, high, decimals) for uniform real columns
+REAL_RANGES = {
+    "savings_rate": (0.05, 0.30, 2), "annual_return_rate": (2.0, 12.0, 2), "volatility": (0.5, 5.0, 2),
+    "fees_percentage": (0.1, 2.0, 2), "portfolio_diversity_score": (0.1, 1.0, 2), "anomaly_score": (0.0, 1.0, 2),
+    "transaction_pattern_score": (0.0, 1.0, 2), "time_of_transaction": (0.0, 1.0, 6),
+}
+CATEGORIES = {
+    "gender": ["Male", "Female", "Other"],
+    "country": ["Germany", "Canada", "Australia", "USA", "UK"],
+    "employment_status": ["Self-employed", "Retired", "Part-time", "Unemployed", "Full-time"],
+    "marital_status": ["Divorced", "Single", "Widowed", "Married"],
+    "education_level": ["PhD", "Master's", "High School", "Bachelor's"],
+    "health_status": ["Good", "Average", "Poor"],
+    "home_ownership_status": ["Rent", "Own", "Mortgage"],
+    "risk_tolerance": ["High", "Low", "Medium"],
+    "contribution_frequency": ["Quarterly", "Annually", "Monthly"],
+    "investment_type": ["Stocks", "Bonds", "Mutual Fund", "ETF", "Real Estate"],
+    "investment_experience_level": ["Intermediate", "Beginner", "Expert"],
+    "survivor_benefits": ["Yes", "No"],
+    "pension_type": ["Defined Contribution", "Defined Benefit"],
+    "withdrawal_strategy": ["Bucket", "Fixed", "Dynamic"],
+    "tax_benefits_eligibility": ["Yes", "No"],
+    "government_pension_eligibility": ["Yes", "No"],
+    "private_pension_eligibility": ["Yes", "No"],
+    "insurance_coverage": ["Yes", "No"],
+    "financial_goals": ["Travel", "Legacy Planning", "Home Purchase", "Healthcare"],
+    "transaction_channel": ["Branch", "Online", "ATM"],
+}
+FUND_NAMES = ["Murphy Inc", "Miller Ltd", "Jones and Sons", "Smith PLC", "Garcia Group", "Lee LLC"]
+PLACES = ["West David", "Roberttown", "Port Johnhaven", "Lake Maria", "New Sarah", "East Kevin"]
+
+# Column order of pension_data (migration 004)
+COLUMNS = [
+    "id", "user_id", "age", "gender", "country", "employment_status", "marital_status", "number_of_dependents",
+    "education_level", "health_status", "life_expectancy_estimate", "annual_income", "current_savings",
+    "debt_level", "monthly_expenses", "savings_rate", "home_ownership_status", "retirement_age_goal",
+    "risk_tolerance", "contribution_amount", "contribution_frequency", "employer_contribution",
+    "total_annual_contribution", "years_contributed", "investment_type", "fund_name", "annual_return_rate",
+    "volatility", "fees_percentage", "investment_experience_level", "portfolio_diversity_score",
+    "projected_pension_amount", "expected_annual_payout", "inflation_adjusted_payout", "years_of_payout",
+    "survivor_benefits", "pension_type", "withdrawal_strategy", "tax_benefits_eligibility",
+    "government_pension_eligibility", "private_pension_eligibility", "insurance_coverage", "financial_goals",
+    "transaction_id", "transaction_amount", "transaction_date", "transaction_channel", "time_of_transaction",
+    "suspicious_flag", "anomaly_score", "transaction_pattern_score", "previous_fraud_flag", "ip_address",
+    "device_id", "geo_location", "account_age", "created_at", "updated_at",
+]
+
+
+def _hex_ids(rng, n: int) -> list:
+    raw = rng.bytes(16 * n)
+    return [raw[i:i + 16].hex() for i in range(0, 16 * n, 16)]
+
+
+def generate_members(n: int, seed: int = 0) -> pd.DataFrame:
+    """``n`` rows with the ``pension_data`` columns (snake_case)."""
+    rng = np.random.default_rng(seed)
+    data = {"id": np.arange(1, n + 1), "user_id": [f"U{i}" for i in range(1000, 1000 + n)]}
+    for col, (lo, hi) in INT_RANGES.items():
+        data[col] = rng.integers(lo, hi + 1, n)
+    for col, (lo, hi, decimals) in REAL_RANGES.items():
+        data[col] = rng.uniform(lo, hi, n).round(decimals)
+    for col, levels in CATEGORIES.items():
+        data[col] = np.asarray(levels, dtype=object)[rng.integers(0, len(levels), n)]
+    data["fund_name"] = np.asarray(FUND_NAMES, dtype=object)[rng.integers(0, len(FUND_NAMES), n)]
+    data["geo_location"] = np.asarray(PLACES, dtype=object)[rng.integers(0, len(PLACES), n)]
+    data["transaction_id"] = _hex_ids(rng, n)
+    data["device_id"] = _hex_ids(rng, n)
+    data["ip_address"] = ["%d.%d.%d.%d" % tuple(o) for o in rng.integers(1, 255, size=(n, 4)).tolist()]
+    days = rng.integers(0, 240, n)
+    data["transaction_date"] = (np.datetime64("2025-01-01") + days).astype(str)
+    data["suspicious_flag"] = np.where(rng.random(n) < 0.06, "1.0", "0.0")
+    data["previous_fraud_flag"] = np.where(rng.random(n) < 0.03, "1.0", "0.0")
+    data["created_at"] = data["updated_at"] = np.full(n, "2025-08-19 15:29:55")
+    return pd.DataFrame(data)[COLUMNS]
+
+
+def to_member_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """The Title_Case, cleaned frame ``load_members`` returns."""
+    frame = df.drop(columns=["id", "created_at", "updated_at"]).rename(columns=frame_column)
+    return clean_members(frame)
+
+
+def write_sqlite(df: pd.DataFrame, path) -> None:
+    conn = sqlite3.connect(str(path))
+    try:
+        df.to_sql("pension_data", conn, index=False, if_exists="replace", chunksize=50_000)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_risk_tolerance ON pension_data(risk_tolerance)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_age ON pension_data(age)")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def write_workbook(df: pd.DataFrame, path) -> None:
+    to_member_frame(df).to_excel(path, sheet_name=DEFAULT_SHEET, index=False)
@@ -0,0 +1,34 @@
+# benchmarks/test_benchmarks.py
+"""
+The same cases under pytest-benchmark, at 1k members:
+
+    pytest benchmarks --benchmark-only --benchmark-autosave
+    pytest benchmarks --benchmark-only --benchmark-compare --benchmark-compare-fail=median:25%
+
+Skipped when pytest-benchmark isn't installed; ``python -m benchmarks.run``
+needs nothing beyond the pages' own dependencies.
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from .cases import CASES  # noqa: E402
+from .synthetic import generate_members  # noqa: E402
+
+ROWS = 1_000
+
+
+@pytest.fixture(scope="module")
+def members():
+    return generate_members(ROWS)
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_case(benchmark, members, tmp_path, name):
+    case = CASES[name]
+    state = case.setup(members, tmp_path)
+    try:
+        benchmark(case.run, state)
+    finally:
+        if hasattr(state, "close"):
+            state.close()
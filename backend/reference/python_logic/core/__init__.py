@@ -0,0 +1,48 @@
+"""
+Headless compute core shared by the python_logic Streamlit pages.
+
+Nothing in this package imports streamlit, plotly or matplotlib, so batch
+jobs and the Node backend can use it directly. The public names below are
+re-exported lazily: ``core.recommend_allocation`` imports ``core.allocation``
+on first access, and pandas / scikit-learn / requests are only loaded by the
+modules (or functions) that need them.
+"""
+import importlib
+
+_EXPORTS = {
+    "allocation": ["recommend_allocation", "guess_current_allocation", "recommend_allocation_batch",
+                   "guess_current_allocation_batch", "rebalance_deltas"],
+    "projection": ["future_value", "balance_path", "simulate_growth", "market_rate",
+                   "required_contribution_rate", "required_years", "required_retirement_age",
+                   "member_required_contributions"],
+    "monte_carlo": ["member_return_params", "simulate_paths"],
+    "scenario_grid": ["ScenarioGrid", "build_grid", "member_grid"],
+    "risk_alerts": ["withdrawal_rate", "withdrawal_status", "depletion_years", "depletion_path", "scan_members",
+                    "alert_queue"],
+    "member_batch": ["member_arrays", "project_members", "run_sharded", "project_frame"],
+    "real_projection": ["real_annual_rate", "project_real", "project_real_members"],
+    "segmentation": ["prepare_members", "filter_members", "fit_segments", "segment_members", "cluster_profile"],
+    "similar_members": ["MemberIndex"],
+    "segment_labels": ["label_members", "label_profiles"],
+    "model_selection": ["select_k"],
+    "whatif_parser": ["parse_whatif", "resolve_whatif"],
+    "member_store": ["load_members", "clean_members", "fill_category_defaults"],
+    "member_db": ["MemberDB", "open_member_db"],
+    "llm_client": ["ask_ollama", "stream_ollama"],
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULES)
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value    # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
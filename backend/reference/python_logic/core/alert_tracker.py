@@ -0,0 +1,156 @@
+# core/alert_tracker.py
+"""
+Incremental withdrawal-risk re-evaluation over the SQLite ``pension_data`` table.
+
+Only members whose alert inputs changed are re-scored. Candidates are rows
+with ``updated_at`` at or after the last run's watermark, plus rows with no
+``updated_at`` at all (they can't be ordered, so they are re-read every run);
+a hash of the alert inputs then drops rows whose savings/expenses didn't
+actually change. Results are materialized in ``risk_alert_state`` (one row per
+member) and every status change (e.g. Safe -> Caution) is appended to
+``risk_alert_events``. State rows of members deleted from ``pension_data`` are
+removed on each run; their events are kept as history.
+
+The tables come from migration 010; the ``updated_at`` index from 007.
+
+    python -m core.alert_tracker              # changed members only
+    python -m core.alert_tracker --full       # re-hash every row (no updated_at trust)
+"""
+import argparse
+import hashlib
+import logging
+import sqlite3
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from .member_db import DEFAULT_DB_PATH, apply_migration
+from .risk_alerts import scan_members
+
+logger = logging.getLogger(__name__)
+
+# pension_data column -> member_store column used by risk_alerts
+INPUT_COLUMNS = {
+    "user_id": "User_ID",
+    "age": "Age",
+    "current_savings": "Current_Savings",
+    "monthly_expenses": "Monthly_Expenses",
+}
+WATERMARK_KEY = "pension_data.updated_at"
+MIGRATION = "010_create_risk_alert_tables_sqlite.sql"
+
+
+def row_hash(values) -> str:
+    """Stable hash of one member's alert inputs (everything but user_id)."""
+    return hashlib.sha1(repr(tuple(values)).encode()).hexdigest()
+
+
+class AlertTracker:
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.conn = sqlite3.connect(str(db_path))
+        # Normally already applied by the backend; a no-op then
+        apply_migration(self.conn, MIGRATION)
+
+    def watermark(self):
+        row = self.conn.execute("SELECT value FROM risk_alert_meta WHERE key = ?", (WATERMARK_KEY,)).fetchone()
+        return row[0] if row else None
+
+    def _candidates(self, full: bool) -> pd.DataFrame:
+        columns = ", ".join(list(INPUT_COLUMNS) + ["updated_at"])
+        mark = None if full else self.watermark()
+        # >= rather than >: rows updated in the watermark's own second are
+        # re-read, and the row hash filters out the ones already scored
+        if mark is None:
+            return pd.read_sql_query(f"SELECT {columns} FROM pension_data", self.conn)
+        return pd.read_sql_query(f"SELECT {columns} FROM pension_data WHERE updated_at >= ? OR updated_at IS NULL",
+                                 self.conn, params=(mark,))
+
+    def _remove_deleted(self) -> int:
+        with self.conn:
+            return self.conn.execute(
+                "DELETE FROM risk_alert_state WHERE NOT EXISTS "
+                "(SELECT 1 FROM pension_data WHERE pension_data.user_id = risk_alert_state.user_id)").rowcount
+
+    def _stored(self, user_ids) -> dict:
+        stored = {}
+        ids = list(user_ids)
+        # stay under SQLite's bound-parameter limit
+        for lo in range(0, len(ids), 900):
+            chunk = ids[lo:lo + 900]
+            marks = ", ".join("?" * len(chunk))
+            stored.update((uid, (h, status)) for uid, h, status in self.conn.execute(
+                f"SELECT user_id, row_hash, status FROM risk_alert_state WHERE user_id IN ({marks})", chunk))
+        return stored
+
+    def refresh(self, full: bool = False) -> dict:
+        """Re-score changed members; returns candidate/changed/transition/removed counts and the new watermark."""
+        rows = self._candidates(full)
+        stats = {"candidates": len(rows), "changed": 0, "transitions": 0, "removed": self._remove_deleted(),
+                 "watermark": self.watermark()}
+        if rows.empty:
+            return stats
+
+        inputs = list(INPUT_COLUMNS)[1:]
+        hashes = [row_hash(v) for v in rows[inputs].itertuples(index=False, name=None)]
+        stored = self._stored(rows["user_id"])
+        changed = [i for i, (uid, h) in enumerate(zip(rows["user_id"], hashes))
+                   if stored.get(uid, (None,))[0] != h]
+        now = datetime.now(timezone.utc).isoformat()
+        stamps = rows["updated_at"].dropna()
+        new_mark = max([m for m in (stamps.max() if len(stamps) else None, stats["watermark"]) if m is not None],
+                       default=None)
+
+        if changed:
+            subset = rows.iloc[changed]
+            scan = scan_members(subset.rename(columns=INPUT_COLUMNS))
+            state, events = [], []
+            for (uid, updated_at), h, r in zip(subset[["user_id", "updated_at"]].itertuples(index=False),
+                                                [hashes[i] for i in changed],
+                                                scan.itertuples(index=False)):
+                status = str(r.Status)
+                state.append((uid, h, float(r.Withdrawal_Rate), status, int(r.Years_To_Depletion), updated_at, now))
+                previous = stored.get(uid, (None, None))[1]
+                if previous != status:
+                    events.append((uid, previous, status, float(r.Withdrawal_Rate), now))
+            with self.conn:
+                self.conn.executemany("INSERT OR REPLACE INTO risk_alert_state VALUES (?, ?, ?, ?, ?, ?, ?)", state)
+                self.conn.executemany(
+                    "INSERT INTO risk_alert_events (user_id, from_status, to_status, withdrawal_rate, occurred_at) "
+                    "VALUES (?, ?, ?, ?, ?)", events)
+            stats.update(changed=len(state), transitions=len(events))
+
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO risk_alert_meta VALUES (?, ?)", (WATERMARK_KEY, new_mark))
+        stats["watermark"] = new_mark
+        return stats
+
+    def events(self, user_id: str = None, limit: int = 100) -> pd.DataFrame:
+        query = "SELECT user_id, from_status, to_status, withdrawal_rate, occurred_at FROM risk_alert_events"
+        params = ()
+        if user_id is not None:
+            query += " WHERE user_id = ?"
+            params = (user_id,)
+        return pd.read_sql_query(query + " ORDER BY id DESC LIMIT ?", self.conn, params=params + (limit,))
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Re-evaluate withdrawal risk alerts for changed members.")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH), help="SQLite file with the pension_data table")
+    parser.add_argument("--full", action="store_true", help="ignore the updated_at watermark and re-hash every row")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    tracker = AlertTracker(args.db)
+    try:
+        stats = tracker.refresh(full=args.full)
+    finally:
+        tracker.close()
+    logger.info("done: %s", stats)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,218 @@
+# core/allocation.py
+"""
+Heuristic allocation engine for the portfolio optimization page.
+
+``recommend_allocation`` / ``guess_current_allocation`` are the per-member
+rules; the ``*_batch`` variants apply the same rules to a whole member frame
+by normalizing each categorical's categories once and indexing lookup
+tables with the category codes, so no Python runs per row. The batch
+variants take pandas objects and import pandas themselves; the per-member
+rules only need NumPy.
+"""
+import numpy as np
+
+ASSET_CLASSES = ["Stocks", "Bonds", "Cash"]
+
+BASE_EQUITY = {"Low": 0.40, "Medium": 0.60, "High": 0.75}
+DEFAULT_BASE_EQUITY = 0.60
+
+
+# -----------------------------
+# Heuristic Recommendation Engine
+# -----------------------------
+def recommend_allocation(age: float,
+                         risk: str = "Medium",
+                         pension_type: str = "Defined Contribution",
+                         withdrawal_strategy: str = "Fixed",
+                         retirement_age_goal: float = 65.0):
+    """
+    Returns a dict: {'Stocks': pct, 'Bonds': pct, 'Cash': pct} summing to 100.
+    Rule-of-thumb glide path + risk tilt + withdrawal/pension adjustments.
+    """
+    # Base equity by risk
+    risk = (risk or "Medium").strip().title()
+    base_equity = BASE_EQUITY.get(risk, DEFAULT_BASE_EQUITY)
+
+    # Age-based glide path: reduce equity as age increases (soft slope)
+    # Roughly -0.5% equity per year after age 30
+    glide_adj = max(0, (age - 30) * 0.005)
+    equity = max(0.25, min(0.90, base_equity - glide_adj))
+
+    # Withdrawal strategy: Flexible favors slightly more equity; Fixed/Guaranteed favors less
+    ws = (withdrawal_strategy or "Fixed").strip().title()
+    equity += _withdrawal_adjustment(ws)
+
+    # Pension type: Defined Benefit acts like bond-like floor -> slightly more equity possible
+    pt = (pension_type or "Defined Contribution").strip().title()
+    equity += _pension_adjustment(pt)
+
+    # Near retirement: dampen equity if within 7 years of goal
+    if not _missing(retirement_age_goal) and not _missing(age):
+        years_to_ret = max(0, float(retirement_age_goal) - float(age))
+        if years_to_ret <= 7:
+            equity -= 0.05
+
+    equity = float(np.clip(equity, 0.15, 0.90))
+    # Split remainder between bonds & cash (more cash when older or low risk)
+    remainder = 1.0 - equity
+    # Cash tilt
+    cash_base = 0.10
+    if age >= 55:
+        cash_base += 0.05
+    if risk == "Low":
+        cash_base += 0.05
+    cash = float(np.clip(cash_base, 0.05, 0.25))
+    bonds = float(max(0.0, remainder - cash))
+
+    # Normalize to 100%
+    total = equity + bonds + cash
+    equity /= total; bonds /= total; cash /= total
+
+    return {
+        "Stocks": round(equity * 100, 1),
+        "Bonds": round(bonds * 100, 1),
+        "Cash": round(cash * 100, 1),
+    }
+
+
+def _missing(value) -> bool:
+    # pd.isna for the scalars a member row holds (None, NaN)
+    return value is None or value != value
+
+
+def _withdrawal_adjustment(ws: str) -> float:
+    if ws in ["Flexible", "Dynamic"]:
+        return 0.03
+    if ws in ["Fixed", "Bucket"]:
+        return -0.03
+    return 0.0
+
+
+def _pension_adjustment(pt: str) -> float:
+    if "Defined Benefit" in pt:
+        return 0.03
+    return 0.0
+
+
+# -----------------------------
+# Estimate Current Allocation (from Investment_Type)
+# -----------------------------
+def guess_current_allocation(investment_type: str):
+    it = (investment_type or "Mixed").strip().lower()
+    if "bond" in it:
+        return {"Stocks": 20.0, "Bonds": 70.0, "Cash": 10.0}
+    if "equity" in it or "stock" in it:
+        return {"Stocks": 70.0, "Bonds": 20.0, "Cash": 10.0}
+    if "balanced" in it or "mixed" in it or "fund" in it:
+        return {"Stocks": 50.0, "Bonds": 40.0, "Cash": 10.0}
+    return {"Stocks": 50.0, "Bonds": 40.0, "Cash": 10.0}
+
+
+# -----------------------------
+# Batch (whole member table)
+# -----------------------------
+def _category_lookup(series, fn, missing):
+    """
+    Evaluate ``fn`` once per distinct category and return (codes, table).
+    The table has one extra trailing slot holding ``missing``, so the -1
+    code pandas uses for NaN indexes it directly.
+    """
+    cat = series if series.dtype == "category" else series.astype("category")
+    table = [fn(c) for c in cat.cat.categories] + [missing]
+    return cat.cat.codes.to_numpy(), np.asarray(table)
+
+
+def _round_half_like_python(values: np.ndarray, ndigits: int = 1) -> np.ndarray:
+    """
+    ``np.round`` scales before rounding, which can disagree with Python's
+    correctly-rounded ``round`` on near-ties; re-round just those elements.
+    """
+    out = np.round(values, ndigits)
+    scaled = values * 10 ** ndigits
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ties.any():
+        out[ties] = [round(float(v), ndigits) for v in values[ties]]
+    return out
+
+
+def recommend_allocation_batch(df):
+    """
+    Vectorized ``recommend_allocation`` over a cleaned member frame with
+    Age, Risk_Tolerance, Pension_Type, Withdrawal_Strategy and
+    Retirement_Age_Goal columns. Returns Stocks/Bonds/Cash on ``df.index``.
+    """
+    import pandas as pd
+
+    age = df["Age"].to_numpy(dtype=float)
+    goal = df["Retirement_Age_Goal"].to_numpy(dtype=float)
+
+    risk_codes, risk_names = _category_lookup(
+        df["Risk_Tolerance"], lambda r: str(r).strip().title(), "Medium")
+    base_equity = np.array([BASE_EQUITY.get(r, DEFAULT_BASE_EQUITY) for r in risk_names])[risk_codes]
+    is_low = (risk_names == "Low")[risk_codes]
+
+    ws_codes, ws_adj = _category_lookup(
+        df["Withdrawal_Strategy"], lambda w: _withdrawal_adjustment(str(w).strip().title()),
+        _withdrawal_adjustment("Fixed"))
+    pt_codes, pt_adj = _category_lookup(
+        df["Pension_Type"], lambda p: _pension_adjustment(str(p).strip().title()),
+        _pension_adjustment("Defined Contribution"))
+
+    # Same operation order as the scalar path so results are bit-identical
+    # max(0, nan) is 0 in the scalar path; np.maximum would propagate the NaN
+    glide_adj = np.where(np.isnan(age), 0.0, np.maximum(0, (age - 30) * 0.005))
+    equity = np.maximum(0.25, np.minimum(0.90, base_equity - glide_adj))
+    equity = equity + ws_adj.astype(float)[ws_codes]
+    equity = equity + pt_adj.astype(float)[pt_codes]
+
+    near_retirement = ~np.isnan(goal) & ~np.isnan(age) & (np.maximum(0, goal - age) <= 7)
+    equity = np.where(near_retirement, equity - 0.05, equity)
+    equity = np.clip(equity, 0.15, 0.90)
+
+    remainder = 1.0 - equity
+    cash = np.full(len(df), 0.10)
+    cash = np.where(age >= 55, cash + 0.05, cash)
+    cash = np.where(is_low, cash + 0.05, cash)
+    cash = np.clip(cash, 0.05, 0.25)
+    bonds = np.maximum(0.0, remainder - cash)
+
+    total = equity + bonds + cash
+    return pd.DataFrame({
+        "Stocks": _round_half_like_python(equity / total * 100),
+        "Bonds": _round_half_like_python(bonds / total * 100),
+        "Cash": _round_half_like_python(cash / total * 100),
+    }, index=df.index)
+
+
+def guess_current_allocation_batch(investment_type):
+    """Vectorized ``guess_current_allocation`` over an Investment_Type column."""
+    import pandas as pd
+
+    codes, table = _category_lookup(
+        investment_type,
+        lambda it: [guess_current_allocation(str(it))[a] for a in ASSET_CLASSES],
+        [guess_current_allocation(None)[a] for a in ASSET_CLASSES])
+    return pd.DataFrame(table.astype(float)[codes], columns=ASSET_CLASSES, index=investment_type.index)
+
+
+def rebalance_deltas(df):
+    """
+    Firm-wide rebalance table: current (from Investment_Type), recommended and
+    the percentage-point change needed per asset class for every member.
+    """
+    import pandas as pd
+
+    current = guess_current_allocation_batch(df["Investment_Type"])
+    recommended = recommend_allocation_batch(df)
+    delta = pd.DataFrame(
+        _round_half_like_python((recommended - current).to_numpy()),
+        columns=ASSET_CLASSES, index=df.index)
+
+    out = pd.concat([
+        current.add_prefix("Current_"),
+        recommended.add_prefix("Recommended_"),
+        delta.add_prefix("Delta_"),
+    ], axis=1)
+    if "User_ID" in df.columns:
+        out.insert(0, "User_ID", df["User_ID"])
+    return out
@@ -0,0 +1,298 @@
+# core/cohort_aggregates.py
+"""
+Pre-aggregated cohort cells for dashboard summaries.
+
+Members are bucketed into cells keyed by (age band, income band,
+risk_tolerance, pension_type). For every cell and metric we store count, sum,
+min, max and a mergeable quantile sketch. A filtered cohort summary is
+answered by combining the cells the filter covers, so its cost depends on the
+number of cells, not the number of members.
+
+The sketch is DDSketch-style: values fall into logarithmic buckets with a
+fixed relative accuracy, and merging two sketches adds their bucket counts.
+Quantiles (medians) are therefore within ``relative_accuracy`` of a true
+member value.
+
+Ages are banded by single year, so age filters are exact. Income is banded
+in $5k steps, so an income filter covers every band it overlaps; pass
+``band_range(lo_edge, hi_edge)`` to filter on whole bands and keep counts
+exact.
+
+    python -m core.cohort_aggregates          # (re)build the cells
+"""
+import argparse
+import json
+import logging
+import math
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .member_store import DEFAULT_CACHE_DIR, data_version, load_members
+from .segmentation import FEATURE_COLUMNS, RISK_MAP
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = DEFAULT_CACHE_DIR / "cohort_aggregates.db"
+AGE_BAND_WIDTH = 1
+INCOME_BAND_WIDTH = 5_000
+DIMENSIONS = ["age_band", "income_band", "risk_tolerance", "pension_type"]
+METRICS = FEATURE_COLUMNS
+MEMBER_COLUMNS = ["Age", "Annual_Income", "Current_Savings", "Risk_Tolerance", "Pension_Type"]
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+
+# -----------------------------
+# Quantile sketch
+# -----------------------------
+class QuantileSketch:
+    """Log-bucketed sketch with relative accuracy ``alpha``; mergeable by adding counts."""
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.zero = 0
+        self.positive = {}
+        self.negative = {}
+
+    @property
+    def count(self) -> int:
+        return self.zero + sum(self.positive.values()) + sum(self.negative.values())
+
+    def bucket(self, values: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(values) / self._log_gamma).astype(np.int64)
+
+    @staticmethod
+    def _add_counts(store: dict, keys: np.ndarray) -> None:
+        for key, n in zip(*np.unique(keys, return_counts=True)):
+            store[int(key)] = store.get(int(key), 0) + int(n)
+
+    def add(self, values) -> "QuantileSketch":
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.zero += int(np.count_nonzero(values == 0))
+        self._add_counts(self.positive, self.bucket(values[values > 0]))
+        self._add_counts(self.negative, self.bucket(-values[values < 0]))
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("cannot merge sketches with different relative accuracy")
+        self.zero += other.zero
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, n in theirs.items():
+                mine[key] = mine.get(key, 0) + n
+        return self
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        total = self.count
+        if total == 0:
+            return float("nan")
+        rank = q * (total - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+    def to_json(self) -> str:
+        return json.dumps({"alpha": self.relative_accuracy, "zero": self.zero,
+                           "pos": self.positive, "neg": self.negative})
+
+    @classmethod
+    def from_json(cls, text: str) -> "QuantileSketch":
+        raw = json.loads(text)
+        sketch = cls(raw["alpha"])
+        sketch.zero = raw["zero"]
+        sketch.positive = {int(k): v for k, v in raw["pos"].items()}
+        sketch.negative = {int(k): v for k, v in raw["neg"].items()}
+        return sketch
+
+
+# -----------------------------
+# Cells
+# -----------------------------
+def band(values, width: float) -> np.ndarray:
+    return np.floor(np.asarray(values, dtype=float) / width).astype(np.int64)
+
+
+def band_range(lo_edge: float, hi_edge: float) -> tuple:
+    """Inclusive (lo, hi) filter covering [lo_edge, hi_edge), so a filter on band edges selects whole bands."""
+    return float(lo_edge), float(np.nextafter(hi_edge, -np.inf))
+
+
+def build_cells(df: pd.DataFrame, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> pd.DataFrame:
+    """One row per (cell, metric) with count, sum, min, max and a ``QuantileSketch``."""
+    df = df.dropna(subset=["Age", "Annual_Income", "Current_Savings"])
+    keys = pd.DataFrame({
+        "age_band": band(df["Age"], AGE_BAND_WIDTH),
+        "income_band": band(df["Annual_Income"], INCOME_BAND_WIDTH),
+        "risk_tolerance": df["Risk_Tolerance"].astype(str).to_numpy(),
+        "pension_type": df["Pension_Type"].astype(str).to_numpy(),
+    })
+    values = {
+        "Age": df["Age"].to_numpy(dtype=float),
+        "Annual_Income": df["Annual_Income"].to_numpy(dtype=float),
+        "Current_Savings": df["Current_Savings"].to_numpy(dtype=float),
+        "Risk_Tolerance_Num": df["Risk_Tolerance"].map(RISK_MAP).astype(float).fillna(2).to_numpy(),
+    }
+    groups = keys.groupby(DIMENSIONS, sort=True).indices
+    rows = []
+    for cell, idx in groups.items():
+        for metric in METRICS:
+            v = values[metric][idx]
+            rows.append((*cell, metric, len(v), float(v.sum()), float(v.min()), float(v.max()),
+                         QuantileSketch(relative_accuracy).add(v)))
+    return pd.DataFrame(rows, columns=DIMENSIONS + ["metric", "count", "sum", "min", "max", "sketch"])
+
+
+def combine_cells(cells: pd.DataFrame, quantiles=(0.5,)) -> pd.DataFrame:
+    """Cohort summary (count, mean, min, max, quantiles) per metric from a set of cells."""
+    rows = {}
+    for metric, group in cells.groupby("metric", sort=False):
+        sketch = QuantileSketch(group["sketch"].iloc[0].relative_accuracy)
+        for part in group["sketch"]:
+            sketch.merge(part)
+        count = int(group["count"].sum())
+        row = {"count": count, "mean": group["sum"].sum() / count if count else float("nan"),
+               "min": group["min"].min(), "max": group["max"].max()}
+        for q in quantiles:
+            row["median" if q == 0.5 else f"q{int(q * 100)}"] = sketch.quantile(q)
+        rows[metric] = row
+    summary = pd.DataFrame.from_dict(rows, orient="index")
+    return summary.reindex([m for m in METRICS if m in rows])
+
+
+def select_cells(cells: pd.DataFrame, age_range=None, income_range=None, risk_filter=None,
+                 pension_types=None) -> pd.DataFrame:
+    mask = np.ones(len(cells), dtype=bool)
+    if age_range is not None:
+        lo, hi = band(age_range, AGE_BAND_WIDTH)
+        mask &= cells["age_band"].between(lo, hi).to_numpy()
+    if income_range is not None:
+        lo, hi = band(income_range, INCOME_BAND_WIDTH)
+        mask &= cells["income_band"].between(lo, hi).to_numpy()
+    if risk_filter is not None:
+        mask &= cells["risk_tolerance"].isin(list(risk_filter)).to_numpy()
+    if pension_types is not None:
+        mask &= cells["pension_type"].isin(list(pension_types)).to_numpy()
+    return cells[mask]
+
+
+# -----------------------------
+# SQLite store
+# -----------------------------
+class CohortAggregates:
+    """Cells materialized in SQLite, tagged with the data version they were built from."""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cohort_cells (
+              age_band INTEGER NOT NULL,
+              income_band INTEGER NOT NULL,
+              risk_tolerance TEXT NOT NULL,
+              pension_type TEXT NOT NULL,
+              metric TEXT NOT NULL,
+              count INTEGER NOT NULL,
+              sum REAL NOT NULL,
+              min REAL NOT NULL,
+              max REAL NOT NULL,
+              sketch TEXT NOT NULL,
+              PRIMARY KEY (age_band, income_band, risk_tolerance, pension_type, metric)
+            );
+            CREATE INDEX IF NOT EXISTS idx_cohort_cells_bands ON cohort_cells(age_band, income_band);
+            CREATE TABLE IF NOT EXISTS cohort_meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self.conn.commit()
+
+    def version(self):
+        row = self.conn.execute("SELECT value FROM cohort_meta WHERE key = 'data_version'").fetchone()
+        return row[0] if row else None
+
+    def refresh(self, df: pd.DataFrame, version: str) -> int:
+        """Rebuild every cell from ``df``; returns the number of cells."""
+        cells = build_cells(df)
+        rows = [(int(age), int(income), risk, pension, metric, int(count), total, lo, hi, sketch.to_json())
+                for age, income, risk, pension, metric, count, total, lo, hi, sketch
+                in cells.itertuples(index=False, name=None)]
+        with self.conn:
+            self.conn.execute("DELETE FROM cohort_cells")
+            self.conn.executemany("INSERT INTO cohort_cells VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.execute("INSERT OR REPLACE INTO cohort_meta VALUES ('data_version', ?)", (version,))
+        return len(cells) // len(METRICS)
+
+    def bounds(self, risk_filter=None) -> dict:
+        """{metric: (min, max)} over the whole book (or some risk tolerances); empty if there are no cells."""
+        where, params = "", []
+        if risk_filter is not None:
+            risk_filter = list(risk_filter)
+            where = f" WHERE risk_tolerance IN ({', '.join('?' * len(risk_filter))})" if risk_filter else " WHERE 0"
+            params = risk_filter
+        return {m: (lo, hi) for m, lo, hi in self.conn.execute(
+            f"SELECT metric, MIN(min), MAX(max) FROM cohort_cells{where} GROUP BY metric", params)}
+
+    def cells(self, age_range=None, income_range=None, risk_filter=None, pension_types=None) -> pd.DataFrame:
+        clauses, params = [], []
+        if age_range is not None:
+            clauses.append("age_band BETWEEN ? AND ?")
+            params.extend(int(b) for b in band(age_range, AGE_BAND_WIDTH))
+        if income_range is not None:
+            clauses.append("income_band BETWEEN ? AND ?")
+            params.extend(int(b) for b in band(income_range, INCOME_BAND_WIDTH))
+        for col, values in (("risk_tolerance", risk_filter), ("pension_type", pension_types)):
+            if values is not None:
+                values = list(values)
+                clauses.append(f"{col} IN ({', '.join('?' * len(values))})" if values else "0")
+                params.extend(values)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        cells = pd.read_sql_query(f"SELECT * FROM cohort_cells{where}", self.conn, params=params)
+        cells["sketch"] = [QuantileSketch.from_json(s) for s in cells["sketch"]]
+        return cells
+
+    def summary(self, age_range=None, income_range=None, risk_filter=None, pension_types=None,
+                quantiles=(0.5,)) -> pd.DataFrame:
+        return combine_cells(self.cells(age_range, income_range, risk_filter, pension_types), quantiles)
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build pre-aggregated cohort cells for dashboards.")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH))
+    parser.add_argument("--source", help="member workbook (defaults to member_store resolution)")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the data version is unchanged")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    store = CohortAggregates(args.db)
+    try:
+        version = data_version(args.source)
+        if not args.force and store.version() == version:
+            logger.info("cells already built for data version %s", version[:12])
+            return 0
+        n = store.refresh(load_members(args.source, columns=MEMBER_COLUMNS), version)
+        logger.info("built %d cells for data version %s", n, version[:12])
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,303 @@
+# core/fraud_scoring.py
+"""
+Transaction anomaly scores for ``pension_data``, computed in bulk.
+
+Two chunked passes over the table, both vectorized per chunk:
+
+1. ``fit`` accumulates per-user amount and time-of-day statistics with a
+   groupby per chunk, plus mergeable quantile sketches and channel counts for
+   population fallbacks.
+2. ``score`` walks the rows in id order and builds the features below. It then
+   writes ``fraud_scores`` (migration 008) with one ``executemany`` per chunk,
+   all in one transaction, so readers see the previous scores until the run
+   commits and a failed run leaves them untouched.
+
+Features:
+
+- ``amount_z``: z-score of the amount against the mean/std of the user's
+  other transactions when they have ``MIN_HISTORY`` of them, else a robust
+  population z (median and IQR / 1.349). Leaving the row out keeps one large
+  payment from inflating its own baseline.
+- ``time_deviation``: circular distance from the user's usual time of day
+  (same fallback), weighted by how concentrated those times are (0..1).
+- ``new_device`` / ``new_ip``: the user has history but this device or IP
+  wasn't seen for them before. Membership is a lookup in sorted uint64 hash
+  sets, so no strings are kept.
+- ``channel_rarity``: 1 - the channel's share of all transactions.
+
+The score is a weighted ensemble of the clipped features plus the
+``previous_fraud_flag`` prior, in 0..1.
+
+    python -m core.fraud_scoring --chunk-size 50000
+"""
+import argparse
+import logging
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from .cohort_aggregates import QuantileSketch
+from .member_db import DEFAULT_DB_PATH, apply_migration
+
+logger = logging.getLogger(__name__)
+
+MIGRATION = "008_create_fraud_scores_sqlite.sql"
+MODEL_VERSION = "robust-z-1"
+DEFAULT_CHUNK_SIZE = 50_000
+MIN_HISTORY = 3
+Z_CAP = 4.0
+FLAG_THRESHOLD = 0.5
+WEIGHTS = {"amount_z": 0.35, "time_deviation": 0.15, "new_device": 0.15, "new_ip": 0.10,
+           "channel_rarity": 0.10, "previous_fraud": 0.15}
+READ_COLUMNS = ["id", "user_id", "transaction_amount", "time_of_transaction", "transaction_channel",
+                "ip_address", "device_id", "previous_fraud_flag"]
+FEATURE_COLUMNS = ["amount_z", "time_deviation", "new_device", "new_ip", "channel_rarity"]
+
+_PAIR_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+# -----------------------------
+# Hashing
+# -----------------------------
+def hash_values(values) -> np.ndarray:
+    """Stable uint64 hash per value (NULLs hash alike)."""
+    return pd.util.hash_array(np.asarray(pd.Series(values).astype(str), dtype=object))
+
+
+def hash_pairs(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    with np.errstate(over="ignore"):
+        return (left * _PAIR_MIX) ^ right
+
+
+class HashSet:
+    """Growing set of uint64 hashes kept as one sorted array; vectorized membership."""
+
+    def __init__(self):
+        self.values = np.empty(0, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        pos = np.searchsorted(self.values, hashes)
+        found = np.zeros(len(hashes), dtype=bool)
+        inside = pos < len(self.values)
+        found[inside] = self.values[pos[inside]] == hashes[inside]
+        return found
+
+    def add(self, hashes: np.ndarray) -> None:
+        # Merge in place of a re-sort: only the chunk's unseen hashes are sorted
+        new = np.unique(hashes)
+        new = new[~self.contains(new)]
+        self.values = np.insert(self.values, np.searchsorted(self.values, new), new)
+
+
+def first_seen(hashes: np.ndarray, seen: HashSet) -> np.ndarray:
+    """True where a hash is neither in ``seen`` nor earlier in this chunk."""
+    return ~seen.contains(hashes) & ~pd.Series(hashes).duplicated().to_numpy()
+
+
+# -----------------------------
+# Model
+# -----------------------------
+def _angles(time_of_day) -> np.ndarray:
+    return 2 * np.pi * pd.to_numeric(pd.Series(time_of_day), errors="coerce").to_numpy(dtype=float)
+
+
+def _flag(values) -> np.ndarray:
+    # previous_fraud_flag arrives as '1.0' / '0.0' text, 1 / 0 or NULL
+    return pd.to_numeric(pd.Series(values), errors="coerce").fillna(0).to_numpy(dtype=float) > 0
+
+
+@dataclass
+class FraudModel:
+    user_stats: pd.DataFrame = None          # per user hash: n, sum, sumsq, timed, cos, sin
+    amount_median: float = 0.0
+    amount_scale: float = 1.0
+    time_angle: float = 0.0
+    time_r: float = 0.0
+    channel_share: dict = field(default_factory=dict)
+    rows: int = 0
+
+
+class _FitState:
+    def __init__(self):
+        self.sums = None
+        self.amounts = QuantileSketch()
+        self.channels = pd.Series(dtype=float)
+        self.cos = self.sin = 0.0
+        self.timed = 0
+        self.rows = 0
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        amount = pd.to_numeric(chunk["transaction_amount"], errors="coerce").to_numpy(dtype=float)
+        angle = _angles(chunk["time_of_transaction"])
+        timed = ~np.isnan(angle)
+        parts = pd.DataFrame({
+            "user": hash_values(chunk["user_id"]),
+            "n": ~np.isnan(amount), "sum": np.nan_to_num(amount), "sumsq": np.nan_to_num(amount) ** 2,
+            "timed": timed, "cos": np.where(timed, np.cos(angle), 0.0), "sin": np.where(timed, np.sin(angle), 0.0),
+        }).groupby("user").sum()
+        self.sums = parts if self.sums is None else self.sums.add(parts, fill_value=0)
+        self.amounts.add(amount[~np.isnan(amount)])
+        counts = chunk["transaction_channel"].astype(str).value_counts()
+        self.channels = self.channels.add(counts, fill_value=0)
+        self.cos += parts["cos"].sum()
+        self.sin += parts["sin"].sum()
+        self.timed += int(timed.sum())
+        self.rows += len(chunk)
+
+    def model(self) -> FraudModel:
+        model = FraudModel(rows=self.rows)
+        if self.sums is None:
+            return model
+        model.user_stats = self.sums.astype(float)
+        if self.amounts.count:
+            q25, model.amount_median, q75 = (self.amounts.quantile(q) for q in (0.25, 0.5, 0.75))
+            model.amount_scale = (q75 - q25) / 1.349 or 1.0
+        if self.timed:
+            model.time_angle = float(np.arctan2(self.sin, self.cos))
+            model.time_r = float(np.hypot(self.cos, self.sin) / self.timed)
+        model.channel_share = (self.channels / self.channels.sum()).to_dict()
+        return model
+
+
+def fit_model(chunks) -> FraudModel:
+    """Population and per-user statistics from an iterable of READ_COLUMNS chunks."""
+    state = _FitState()
+    for chunk in chunks:
+        state.update(chunk)
+    return state.model()
+
+
+def transaction_features(chunk: pd.DataFrame, model: FraudModel, seen_users: HashSet,
+                         seen_devices: HashSet, seen_ips: HashSet) -> pd.DataFrame:
+    """FEATURE_COLUMNS for ``chunk`` (rows in id order); adds the chunk to the seen sets."""
+    users = hash_values(chunk["user_id"])
+    stats = {name: values.to_numpy() for name, values in model.user_stats.reindex(users).fillna(0).items()}
+    amount = pd.to_numeric(chunk["transaction_amount"], errors="coerce").to_numpy(dtype=float)
+    angle = _angles(chunk["time_of_transaction"])
+    valid, timed = ~np.isnan(amount), ~np.isnan(angle)
+
+    # The user's other transactions: subtract this row from their sums
+    n = stats["n"] - valid
+    x = np.where(valid, amount, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = (stats["sum"] - x) / n
+        std = np.sqrt(np.maximum(stats["sumsq"] - x ** 2 - n * mean ** 2, 0) / (n - 1))
+        own = (n >= MIN_HISTORY) & (std > 0)
+        amount_z = np.where(own, (amount - mean) / std, (amount - model.amount_median) / model.amount_scale)
+
+        cos = stats["cos"] - np.where(timed, np.cos(angle), 0.0)
+        sin = stats["sin"] - np.where(timed, np.sin(angle), 0.0)
+        own_time = stats["timed"] - timed >= MIN_HISTORY
+        reference = np.where(own_time, np.arctan2(sin, cos), model.time_angle)
+        concentration = np.where(own_time, np.hypot(cos, sin) / (stats["timed"] - timed), model.time_r)
+    distance = np.abs(np.angle(np.exp(1j * (angle - reference)))) / np.pi        # 0..1
+    time_deviation = np.nan_to_num(distance * concentration)
+
+    devices = hash_pairs(users, hash_values(chunk["device_id"]))
+    ips = hash_pairs(users, hash_values(chunk["ip_address"]))
+    has_history = ~first_seen(users, seen_users)
+    new_device = has_history & first_seen(devices, seen_devices)
+    new_ip = has_history & first_seen(ips, seen_ips)
+    seen_users.add(users)
+    seen_devices.add(devices)
+    seen_ips.add(ips)
+
+    share = chunk["transaction_channel"].astype(str).map(model.channel_share).astype(float).fillna(0.0)
+    return pd.DataFrame({
+        "amount_z": np.nan_to_num(amount_z),
+        "time_deviation": time_deviation,
+        "new_device": new_device,
+        "new_ip": new_ip,
+        "channel_rarity": 1.0 - share.to_numpy(),
+    }, index=chunk.index)
+
+
+def ensemble_score(features: pd.DataFrame, previous_fraud) -> np.ndarray:
+    """Weighted 0..1 score from clipped features and the previous-fraud prior."""
+    parts = {
+        "amount_z": np.minimum(np.abs(features["amount_z"].to_numpy()) / Z_CAP, 1.0),
+        "time_deviation": features["time_deviation"].to_numpy(),
+        "new_device": features["new_device"].to_numpy(dtype=float),
+        "new_ip": features["new_ip"].to_numpy(dtype=float),
+        "channel_rarity": features["channel_rarity"].to_numpy(),
+        "previous_fraud": _flag(previous_fraud).astype(float),
+    }
+    return sum(WEIGHTS[name] * values for name, values in parts.items())
+
+
+# -----------------------------
+# SQLite pipeline
+# -----------------------------
+class FraudScorer:
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.conn = sqlite3.connect(str(db_path))
+        # Normally already applied by the backend; a no-op then
+        apply_migration(self.conn, MIGRATION)
+
+    def _chunks(self, chunk_size: int):
+        query = f"SELECT {', '.join(READ_COLUMNS)} FROM pension_data ORDER BY id"
+        return pd.read_sql_query(query, self.conn, chunksize=chunk_size)
+
+    def fit(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> FraudModel:
+        return fit_model(self._chunks(chunk_size))
+
+    def score(self, model: FraudModel = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              threshold: float = FLAG_THRESHOLD) -> dict:
+        """Score every row and replace ``fraud_scores``; returns row and flag counts."""
+        model = model or self.fit(chunk_size)
+        seen = HashSet(), HashSet(), HashSet()
+        now = datetime.now(timezone.utc).isoformat()
+        stats = {"rows": 0, "flagged": 0, "chunks": 0}
+        # One transaction for the delete and every chunk: readers keep the
+        # previous scores until the commit, and a failure rolls back to them
+        with self.conn:
+            self.conn.execute("DELETE FROM fraud_scores")
+            for chunk in self._chunks(chunk_size):
+                features = transaction_features(chunk, model, *seen)
+                score = ensemble_score(features, chunk["previous_fraud_flag"])
+                flagged = score >= threshold
+                rows = zip(chunk["id"].astype(int).tolist(), chunk["user_id"].astype(str).tolist(),
+                           score.tolist(), flagged.astype(int).tolist(),
+                           features["amount_z"].tolist(), features["time_deviation"].tolist(),
+                           features["new_device"].astype(int).tolist(), features["new_ip"].astype(int).tolist(),
+                           features["channel_rarity"].tolist())
+                self.conn.executemany("INSERT OR REPLACE INTO fraud_scores VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                      [row + (MODEL_VERSION, now) for row in rows])
+                stats["rows"] += len(chunk)
+                stats["flagged"] += int(flagged.sum())
+                stats["chunks"] += 1
+        return stats
+
+    def top(self, limit: int = 50) -> pd.DataFrame:
+        return pd.read_sql_query("SELECT * FROM fraud_scores ORDER BY score DESC LIMIT ?", self.conn,
+                                 params=(limit,))
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Score pension_data transactions for anomalies.")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH), help="SQLite file with the pension_data table")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--threshold", type=float, default=FLAG_THRESHOLD, help="flag rows scoring at least this")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    scorer = FraudScorer(args.db)
+    try:
+        stats = scorer.score(chunk_size=args.chunk_size, threshold=args.threshold)
+    finally:
+        scorer.close()
+    logger.info("done: %s", stats)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
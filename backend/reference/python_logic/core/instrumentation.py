@@ -0,0 +1,272 @@
+# core/instrumentation.py
+"""
+Per-stage timing for the analytics pages and the core jobs behind them.
+
+Wrap a stage in ``with stage("kmeans_fit", rows=len(X)):`` or decorate a
+function with ``@timed("load_members", rows=len)``. Each stage records:
+
+- wall time and process CPU time;
+- rows processed;
+- the process peak RSS;
+- with ``PYTHON_LOGIC_TRACE_MEMORY=1``, the peak Python allocation during the
+  stage (tracemalloc, which slows allocation-heavy code, so opt-in).
+
+Records are appended as JSON lines to
+``backend/logs/python_timing-YYYY-MM-DD.log``, the same layout and camelCase
+keys ``AuditService`` uses, so ``/api/logs/PYTHON_TIMING/<date>`` serves them.
+Records are also kept in memory for the pages' debug panel.
+
+Environment switches:
+
+- ``PYTHON_LOGIC_TIMING=0``: don't write log files (records are still kept).
+- ``PYTHON_LOGIC_LOG_DIR``: write somewhere other than ``backend/logs``.
+- ``PYTHON_LOGIC_PROFILE=kmeans_fit,load_members`` (or ``*``): profile those
+  stages into ``<log dir>/profiles/``. This uses the pyinstrument sampling
+  profiler when installed and cProfile otherwise, one stage at a time.
+- ``PYTHON_LOGIC_DEBUG=1``: show the debug panel on every page (``?debug=1``
+  does it for one browser tab).
+
+Standard library only, so importing it never pulls in pandas.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from importlib.util import find_spec
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:          # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+LOG_DIR = Path(__file__).resolve().parents[3] / "logs"
+LOG_TYPE = "PYTHON_TIMING"
+RECENT_LIMIT = 500
+PANEL_COLUMNS = ["stage", "parentStage", "wallMs", "cpuMs", "rows", "peakMb", "maxRssMb", "error"]
+
+pyinstrument_ok = find_spec("pyinstrument") is not None
+
+_recent = deque(maxlen=RECENT_LIMIT)
+_write_lock = threading.Lock()
+_profiler_lock = threading.Lock()
+_stack = contextvars.ContextVar("instrumentation_stack", default=())
+_run = contextvars.ContextVar("instrumentation_run", default=None)
+
+
+def log_dir() -> Path:
+    return Path(os.environ.get("PYTHON_LOGIC_LOG_DIR") or LOG_DIR)
+
+
+def log_path(day=None) -> Path:
+    day = day or datetime.now(timezone.utc).date()
+    return log_dir() / f"{LOG_TYPE.lower()}-{day.isoformat()}.log"
+
+
+def debug_enabled() -> bool:
+    return os.environ.get("PYTHON_LOGIC_DEBUG") == "1"
+
+
+def _camel(name: str) -> str:
+    head, *rest = name.split("_")
+    return head + "".join(part.title() for part in rest)
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+# -----------------------------
+# Runs and records
+# -----------------------------
+def start_run(page: str) -> list:
+    """Start collecting this script run's stages (tagged with ``page``); returns the live list."""
+    records = []
+    _run.set((page, records))
+    return records
+
+
+def recent(limit: int = RECENT_LIMIT) -> list:
+    """The most recent records from any run in this process, newest last."""
+    return list(_recent)[-limit:]
+
+
+def emit(record: dict) -> None:
+    _recent.append(record)
+    run = _run.get()
+    if run is not None:
+        run[1].append(record)
+    if os.environ.get("PYTHON_LOGIC_TIMING", "1") == "0":
+        return
+    try:
+        path = log_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(record, default=str) + "\n"
+        with _write_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+    except OSError as e:
+        logger.warning("could not write timing record: %s", e)
+
+
+# -----------------------------
+# Profiler hook
+# -----------------------------
+def _profile_wanted(name: str) -> bool:
+    targets = {t.strip() for t in os.environ.get("PYTHON_LOGIC_PROFILE", "").split(",") if t.strip()}
+    return bool(targets) and ("*" in targets or name in targets)
+
+
+def _start_profiler(name: str):
+    # One profiler at a time: nested or concurrent stages run unprofiled
+    if not _profile_wanted(name) or not _profiler_lock.acquire(blocking=False):
+        return None
+    if pyinstrument_ok:
+        from pyinstrument import Profiler
+
+        profiler = Profiler(interval=0.001)
+        profiler.start()
+    else:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    return profiler
+
+
+def _stop_profiler(profiler, name: str) -> str:
+    try:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        path = log_dir() / "profiles" / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}-{stamp}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if pyinstrument_ok:
+            profiler.stop()
+            path = path.with_suffix(".html")
+            path.write_text(profiler.output_html(), encoding="utf-8")
+        else:
+            profiler.disable()
+            path = path.with_suffix(".prof")
+            profiler.dump_stats(path)
+        return str(path)
+    finally:
+        _profiler_lock.release()
+
+
+# -----------------------------
+# Stages
+# -----------------------------
+class Stage:
+    """One timed stage; set ``rows`` (or add ``meta``) inside the block when only known there."""
+
+    __slots__ = ("name", "page", "parent", "rows", "meta", "wall_ms", "cpu_ms", "peak_mb", "max_rss_mb",
+                 "error", "profile", "_traced_start", "_peak_seen")
+
+    def __init__(self, name: str, page: str = None, parent: "Stage" = None, rows: int = None, meta: dict = None):
+        self.name, self.page, self.parent, self.rows = name, page, parent, rows
+        self.meta = dict(meta or {})
+        self.wall_ms = self.cpu_ms = self.peak_mb = self.max_rss_mb = None
+        self.error = self.profile = None
+        self._traced_start = self._peak_seen = 0
+
+    def record(self) -> dict:
+        record = {
+            "id": uuid.uuid4().hex[:16],
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "type": LOG_TYPE,
+            "page": self.page,
+            "stage": self.name,
+            "parentStage": self.parent.name if self.parent else None,
+            "wallMs": round(self.wall_ms, 3),
+            "cpuMs": round(self.cpu_ms, 3),
+            "rows": None if self.rows is None else int(self.rows),
+            "peakMb": None if self.peak_mb is None else round(self.peak_mb, 3),
+            "maxRssMb": self.max_rss_mb,
+            "pid": os.getpid(),
+            "error": self.error,
+        }
+        if self.profile:
+            record["profile"] = self.profile
+        record.update({_camel(k): v for k, v in self.meta.items()})
+        return record
+
+
+@contextmanager
+def stage(name: str, rows: int = None, page: str = None, **meta):
+    """Time the block as stage ``name`` and emit its record on exit (errors included)."""
+    stack = _stack.get()
+    parent = stack[-1] if stack else None
+    run = _run.get()
+    page = page or (parent.page if parent else run[0] if run else None)
+    current = Stage(name, page, parent, rows, meta)
+    token = _stack.set(stack + (current,))
+
+    trace = os.environ.get("PYTHON_LOGIC_TRACE_MEMORY") == "1"
+    started_tracing = trace and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if trace:
+        traced, peak = tracemalloc.get_traced_memory()
+        if parent is not None:
+            # reset_peak() below would hide the parent's peak so far
+            parent._peak_seen = max(parent._peak_seen, peak)
+        tracemalloc.reset_peak()
+        current._traced_start = current._peak_seen = traced
+
+    profiler = _start_profiler(name)
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.wall_ms = (time.perf_counter() - wall) * 1000
+        current.cpu_ms = (time.process_time() - cpu) * 1000
+        if profiler is not None:
+            current.profile = _stop_profiler(profiler, name)
+        if trace and tracemalloc.is_tracing():
+            peak = max(tracemalloc.get_traced_memory()[1], current._peak_seen)
+            current.peak_mb = (peak - current._traced_start) / 2**20
+            if parent is not None:
+                parent._peak_seen = max(parent._peak_seen, peak)
+        if started_tracing:
+            tracemalloc.stop()
+        current.max_rss_mb = _max_rss_mb()
+        _stack.reset(token)
+        emit(current.record())
+
+
+def timed(name: str = None, rows=None):
+    """Decorator form of ``stage``; ``rows(result)`` gives the row count (e.g. ``rows=len``)."""
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(label) as current:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    current.rows = rows(result)
+                return result
+        return wrapper
+    return decorate
+
+
+def panel_rows(records) -> list:
+    """The debug panel's view of ``records``: PANEL_COLUMNS only, in run order."""
+    return [{column: record.get(column) for column in PANEL_COLUMNS} for record in records]
@@ -0,0 +1,226 @@
+# core/llm_client.py
+"""
+Shared Ollama client for the python_logic pages and batch jobs.
+
+- ``OllamaClient``: keep-alive ``requests.Session`` with a sized connection
+  pool, blocking ``generate`` and token-by-token ``stream``.
+- ``AsyncOllamaClient``: asyncio front-end with bounded concurrency.
+- ``ResponseCache``: content-addressed (model + normalized prompt) LRU with TTL,
+  so re-clicking a button for the same profile doesn't cost a generation.
+- ``ask_ollama``: drop-in for the per-page helper; returns an error string
+  instead of raising.
+
+``requests`` is imported when the first client is created, so importing this
+module (e.g. through a page that never calls the LLM) stays cheap.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .instrumentation import stage, timed
+
+DEFAULT_BASE_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434")
+DEFAULT_MODEL = "mistral"
+DEFAULT_TIMEOUT = 120
+
+
+# -----------------------------
+# Response cache
+# -----------------------------
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so indentation/blank-line differences share a cache entry."""
+    return " ".join(prompt.split())
+
+
+class ResponseCache:
+    """Thread-safe LRU of generated responses with a per-entry TTL (seconds)."""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model}\0{normalize_prompt(prompt)}".encode()).hexdigest()
+
+    def get(self, model: str, prompt: str):
+        key = self.key(model, prompt)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl is not None and time.monotonic() - entry[0] > self.ttl):
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, model: str, prompt: str, response: str) -> None:
+        key = self.key(model, prompt)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# -----------------------------
+# Blocking client (pooled keep-alive session)
+# -----------------------------
+def make_session(pool_size: int):
+    """``requests.Session`` with a connection pool of ``pool_size`` per scheme."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class OllamaClient:
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, model: str = DEFAULT_MODEL,
+                 timeout: float = DEFAULT_TIMEOUT, pool_size: int = 8, cache: ResponseCache = None):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+        self.cache = cache if cache is not None else ResponseCache()
+        self.session = make_session(pool_size)
+
+    @property
+    def generate_url(self) -> str:
+        return f"{self.base_url}/api/generate"
+
+    def generate(self, prompt: str, model: str = None, use_cache: bool = True) -> str:
+        """Full (non-streamed) completion. Raises ``requests`` errors on failure."""
+        model = model or self.model
+        if use_cache:
+            cached = self.cache.get(model, prompt)
+            if cached is not None:
+                return cached
+
+        resp = self.session.post(self.generate_url,
+                                 json={"model": model, "prompt": prompt, "stream": False},
+                                 timeout=self.timeout)
+        resp.raise_for_status()
+        text = resp.json().get("response")
+        if text is not None and use_cache:
+            self.cache.put(model, prompt, text)
+        return text
+
+    def stream(self, prompt: str, model: str = None, use_cache: bool = True):
+        """
+        Yield response fragments as Ollama produces them (NDJSON stream).
+        A cached response is yielded in one piece; a completed stream is cached.
+        """
+        model = model or self.model
+        if use_cache:
+            cached = self.cache.get(model, prompt)
+            if cached is not None:
+                yield cached
+                return
+
+        parts = []
+        with self.session.post(self.generate_url,
+                               json={"model": model, "prompt": prompt, "stream": True},
+                               timeout=self.timeout, stream=True) as resp:
+            resp.raise_for_status()
+            for line in resp.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                token = chunk.get("response", "")
+                if token:
+                    parts.append(token)
+                    yield token
+                if chunk.get("done"):
+                    break
+        if use_cache and parts:
+            self.cache.put(model, prompt, "".join(parts))
+
+    def close(self) -> None:
+        self.session.close()
+
+
+# -----------------------------
+# Asyncio front-end (bounded concurrency)
+# -----------------------------
+class AsyncOllamaClient:
+    """
+    Runs the pooled blocking client on worker threads, with at most
+    ``max_concurrency`` requests in flight. The cache is shared with ``client``.
+    """
+
+    def __init__(self, client: OllamaClient = None, max_concurrency: int = 4):
+        self.client = client or OllamaClient(pool_size=max_concurrency)
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._loop = None
+
+    def _limit(self) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop; rebuild when called from a new one
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def generate(self, prompt: str, model: str = None, use_cache: bool = True) -> str:
+        async with self._limit():
+            return await asyncio.to_thread(self.client.generate, prompt, model, use_cache)
+
+    async def generate_many(self, prompts, model: str = None, return_exceptions: bool = False):
+        return await asyncio.gather(*(self.generate(p, model) for p in prompts),
+                                    return_exceptions=return_exceptions)
+
+
+# -----------------------------
+# Page-level helper
+# -----------------------------
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def default_client() -> OllamaClient:
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = OllamaClient()
+        return _default_client
+
+
+@timed("ollama_generate")
+def ask_ollama(prompt: str, model: str = DEFAULT_MODEL) -> str:
+    try:
+        text = default_client().generate(prompt, model=model)
+        return text if text is not None else "⚠️ No response from Ollama."
+    except Exception as e:
+        return f"⚠️ Ollama error: {str(e)}"
+
+
+def stream_ollama(prompt: str, model: str = DEFAULT_MODEL):
+    """Streaming ``ask_ollama`` for ``st.write_stream``; errors become a final message."""
+    with stage("ollama_stream") as timing:
+        timing.rows = 0
+        try:
+            for chunk in default_client().stream(prompt, model=model):
+                timing.rows += 1
+                yield chunk
+        except Exception as e:
+            yield f"⚠️ Ollama error: {str(e)}"
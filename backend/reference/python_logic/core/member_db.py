@@ -0,0 +1,219 @@
+# core/member_db.py
+"""
+Member reads straight from the backend's SQLite ``pension_data`` table.
+
+The Node backend already loads members into ``pension_insights.db``. Pages
+ask for the handful of columns they use, and the sidebar filters become
+``WHERE`` predicates on indexed columns (risk_tolerance, pension_type, plus
+age/annual_income from migration 007), so SQLite does the filtering. Rows are
+fetched in chunks over a small pool of read-only connections and converted
+column by column to NumPy arrays, then to the same Title_Case frame
+``member_store.load_members`` returns.
+"""
+import os
+import queue
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import timed
+from .member_store import BACKEND_DIR, CATEGORICAL_COLUMNS, NUMERIC_COLUMNS, clean_members
+
+DEFAULT_DB_PATH = BACKEND_DIR / "database" / "pension_insights.db"
+MIGRATIONS_DIR = BACKEND_DIR / "database" / "migrations"
+TABLE = "pension_data"
+DEFAULT_CHUNK_SIZE = 10_000
+
+# pension_data uses lower-cased workbook names; these are the ones .title() can't recover
+TEXT_COLUMNS = ["User_ID", "Fund_Name", "Transaction_ID", "Transaction_Date",
+                "IP_Address", "Device_ID", "Geo_Location", "Time_of_Transaction"]
+FRAME_COLUMNS = {c.lower(): c for c in NUMERIC_COLUMNS + CATEGORICAL_COLUMNS + TEXT_COLUMNS}
+FLOAT_COLUMNS = {c.lower() for c in NUMERIC_COLUMNS} | {"id", "time_of_transaction"}
+
+
+def db_column(name: str) -> str:
+    return name.lower()
+
+
+def frame_column(name: str) -> str:
+    return FRAME_COLUMNS.get(name, "_".join(part.capitalize() for part in name.split("_")))
+
+
+def resolve_db_path(db_path=None) -> Path:
+    return Path(db_path or os.environ.get("MEMBER_DB_PATH") or DEFAULT_DB_PATH)
+
+
+class MemberDB:
+    """Pooled read-only access to ``pension_data``."""
+
+    def __init__(self, db_path=None, pool_size: int = 4, wal: bool = True):
+        self.db_path = resolve_db_path(db_path)
+        if not self.db_path.exists():
+            raise FileNotFoundError(self.db_path)
+        if wal:
+            self._enable_wal()
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._pool.put(None)    # connections are opened lazily
+        with self.connection() as conn:
+            info = list(conn.execute(f"PRAGMA table_info({TABLE})"))
+        self.table_columns = [row[1] for row in info]
+        self.integer_columns = {row[1] for row in info if row[2].upper() == "INTEGER"}
+
+    def _enable_wal(self) -> None:
+        # WAL lets these readers run alongside the backend's writes. It is a
+        # property of the file, so it needs one writable connection; skip it
+        # when the database is read-only for us.
+        try:
+            conn = sqlite3.connect(str(self.db_path), timeout=1)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only = 1")
+        conn.execute("PRAGMA mmap_size = 268435456")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._pool.get()
+        try:
+            if conn is None:
+                conn = self._connect()
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            conn = self._pool.get_nowait()
+            if conn is not None:
+                conn.close()
+
+    def version(self) -> str:
+        """Changes whenever the database (or its WAL) is written."""
+        parts = []
+        for path in (self.db_path, Path(f"{self.db_path}-wal")):
+            if path.exists():
+                stat = path.stat()
+                parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+        return "sqlite:" + "|".join(parts)
+
+    # -----------------------------
+    # Query building
+    # -----------------------------
+    def _column(self, name: str) -> str:
+        col = db_column(name)
+        if col not in self.table_columns:
+            raise KeyError(f"{TABLE} has no column {name!r}")
+        return col
+
+    def where(self, filters=None):
+        """
+        ``filters`` maps column -> (lo, hi) for BETWEEN ((lo, None) for >= lo),
+        a list/set for IN, None for IS NULL, or a scalar for equality.
+        Returns (sql, params).
+        """
+        clauses, params = [], []
+        for name, value in (filters or {}).items():
+            col = self._column(name)
+            if isinstance(value, tuple) and value[1] is None:
+                clauses.append(f"{col} >= ?")
+                params.append(value[0])
+            elif isinstance(value, tuple):
+                clauses.append(f"{col} BETWEEN ? AND ?")
+                params.extend(value)
+            elif value is None:
+                clauses.append(f"{col} IS NULL")
+            elif isinstance(value, (list, set, frozenset)):
+                values = sorted(value)
+                if not values:
+                    clauses.append("0")
+                    continue
+                clauses.append(f"{col} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+            else:
+                clauses.append(f"{col} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def iter_chunks(self, columns, filters=None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Yield {db column: ndarray} for each ``chunk_size`` block of matching rows."""
+        cols = [self._column(c) for c in columns]
+        where, params = self.where(filters)
+        with self.connection() as conn:
+            cursor = conn.execute(f"SELECT {', '.join(cols)} FROM {TABLE}{where} ORDER BY id", params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield {col: np.array(values, dtype=float if col in FLOAT_COLUMNS else object)
+                       for col, values in zip(cols, zip(*rows))}
+
+    def fetch_arrays(self, columns, filters=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+        cols = [self._column(c) for c in columns]
+        chunks = list(self.iter_chunks(cols, filters, chunk_size))
+        if not chunks:
+            return {col: np.empty(0, dtype=float if col in FLOAT_COLUMNS else object) for col in cols}
+        return {col: np.concatenate([chunk[col] for chunk in chunks]) for col in cols}
+
+    @timed("fetch_frame", rows=len)
+    def fetch_frame(self, columns, filters=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+        """Cleaned Title_Case frame like ``load_members(columns=...)``, indexed by ``pension_data.id``."""
+        arrays = self.fetch_arrays(["id"] + list(columns), filters, chunk_size)
+        index = pd.Index(arrays.pop("id").astype(np.int64), name=None)
+        for col, values in arrays.items():
+            # INTEGER columns come back as float (NULL -> NaN); restore int64 when there are no gaps
+            if col in self.integer_columns and values.dtype == float and not np.isnan(values).any():
+                arrays[col] = values.astype(np.int64)
+        df = pd.DataFrame({frame_column(col): values for col, values in arrays.items()}, index=index)
+        return clean_members(df)[list(columns)]
+
+    def bounds(self, columns, filters=None) -> dict:
+        """{column: (min, max)} computed by SQLite."""
+        cols = [self._column(c) for c in columns]
+        where, params = self.where(filters)
+        select = ", ".join(f"MIN({c}), MAX({c})" for c in cols)
+        with self.connection() as conn:
+            row = conn.execute(f"SELECT {select} FROM {TABLE}{where}", params).fetchone()
+        return {name: (row[2 * i], row[2 * i + 1]) for i, name in enumerate(columns)}
+
+
+def migration_statements(sql: str) -> list:
+    """Statements of a migration file as the backend's SQLite runner sees them."""
+    # runMigrations (backend/src/config/database.js) splits on ';' and drops
+    # full-line comments from each chunk. Do the same, so a migration that
+    # works here works there. A ';' inside a comment still splits.
+    statements = []
+    for chunk in sql.split(";"):
+        code = "\n".join(line for line in chunk.splitlines() if not line.strip().startswith("--")).strip()
+        if code:
+            statements.append(code)
+    return statements
+
+
+def apply_migration(conn: sqlite3.Connection, name: str) -> None:
+    """Run backend migration ``name`` on ``conn`` (they are idempotent, like the runner assumes)."""
+    sql = (MIGRATIONS_DIR / name).read_text(encoding="utf-8")
+    with conn:
+        for statement in migration_statements(sql):
+            conn.execute(statement)
+
+
+def open_member_db(db_path=None, **kwargs):
+    """A ``MemberDB``, or None when the database file isn't there (pages fall back to the workbook)."""
+    try:
+        return MemberDB(db_path, **kwargs)
+    except (FileNotFoundError, sqlite3.Error):
+        return None
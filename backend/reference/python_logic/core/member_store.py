@@ -0,0 +1,244 @@
+# core/member_store.py
+"""
+Columnar cache for the member workbook.
+
+Parsing the XLSX with openpyxl dominates cold start for every page, so the
+workbook is converted once into a typed Parquet file (numerics coerced,
+low-cardinality text as categoricals, defaults filled). The cache is checked
+against the source's mtime/size, falling back to a SHA-256 comparison when
+those change, and is read back memory-mapped with only the requested columns.
+
+Missing categories stay NaN in the cache: the segmentation page drops members
+without a risk tolerance, while the allocation page fills them with
+``fill_category_defaults``.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import timed
+
+try:
+    import pyarrow.parquet as pq
+    pyarrow_ok = True
+except Exception:
+    pq = None
+    pyarrow_ok = False
+
+CACHE_VERSION = 2
+
+PYTHON_LOGIC_DIR = Path(__file__).resolve().parents[1]
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+# Candidate workbooks, in priority order. MEMBER_DATA_PATH overrides both.
+DEFAULT_SOURCES = (
+    Path("Copy of Usecase 5(1).xlsx"),
+    BACKEND_DIR / "database" / "CSV" / "data.xlsx",
+)
+DEFAULT_SHEET = "Usecase 5 data"
+DEFAULT_CACHE_DIR = PYTHON_LOGIC_DIR / ".cache"
+
+NUMERIC_COLUMNS = [
+    "Age", "Annual_Income", "Current_Savings", "Retirement_Age_Goal",
+    "Contribution_Amount", "Employer_Contribution", "Total_Annual_Contribution",
+    "Years_Contributed", "Annual_Return_Rate", "Volatility", "Fees_Percentage",
+    "Projected_Pension_Amount", "Expected_Annual_Payout", "Inflation_Adjusted_Payout",
+    "Years_of_Payout", "Transaction_Amount", "Anomaly_Score", "Number_of_Dependents",
+    "Life_Expectancy_Estimate", "Debt_Level", "Monthly_Expenses", "Savings_Rate",
+    "Portfolio_Diversity_Score", "Transaction_Pattern_Score", "Account_Age",
+]
+
+# Defaults the allocation page applies to missing categories (fill_category_defaults).
+CATEGORY_DEFAULTS = {
+    "Risk_Tolerance": "Medium",
+    "Pension_Type": "Defined Contribution",
+    "Withdrawal_Strategy": "Fixed",
+    "Investment_Type": "Mixed",
+}
+
+CATEGORICAL_COLUMNS = [
+    "Gender", "Country", "Employment_Status", "Risk_Tolerance", "Contribution_Frequency",
+    "Investment_Type", "Survivor_Benefits", "Suspicious_Flag", "Marital_Status",
+    "Education_Level", "Health_Status", "Home_Ownership_Status",
+    "Investment_Experience_Level", "Financial_Goals", "Insurance_Coverage",
+    "Tax_Benefits_Eligibility", "Government_Pension_Eligibility",
+    "Private_Pension_Eligibility", "Pension_Type", "Withdrawal_Strategy",
+    "Transaction_Channel", "Previous_Fraud_Flag",
+]
+
+
+# -----------------------------
+# Source resolution
+# -----------------------------
+def resolve_source(source=None) -> Path:
+    """Return the workbook to read: explicit path, MEMBER_DATA_PATH, then defaults."""
+    if source is not None:
+        return Path(source)
+    env_path = os.environ.get("MEMBER_DATA_PATH")
+    if env_path:
+        return Path(env_path)
+    for candidate in DEFAULT_SOURCES:
+        if candidate.exists():
+            return candidate
+    raise FileNotFoundError(
+        "No member workbook found; set MEMBER_DATA_PATH or place "
+        f"'{DEFAULT_SOURCES[0]}' in the working directory."
+    )
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# -----------------------------
+# Workbook -> typed frame
+# -----------------------------
+def read_workbook(source: Path, sheet_name=None) -> pd.DataFrame:
+    with pd.ExcelFile(source) as book:
+        if sheet_name is None:
+            sheet_name = DEFAULT_SHEET if DEFAULT_SHEET in book.sheet_names else book.sheet_names[0]
+        return pd.read_excel(book, sheet_name=sheet_name)
+
+
+def clean_members(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce numerics and convert text columns to compact dtypes (missing values stay NaN)."""
+    df = df.loc[:, [c for c in df.columns if not str(c).startswith("Unnamed:")]].copy()
+
+    if "User_ID" not in df.columns:
+        df["User_ID"] = np.nan
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    for col in df.columns:
+        if col in CATEGORICAL_COLUMNS:
+            df[col] = df[col].astype(str).where(df[col].notna()).astype("category")
+        elif col not in NUMERIC_COLUMNS and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype("string")
+    return df
+
+
+def fill_category_defaults(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of ``df`` with CATEGORY_DEFAULTS filled in (absent columns are created)."""
+    df = df.copy()
+    for col, default in CATEGORY_DEFAULTS.items():
+        if col not in df.columns:
+            df[col] = default
+            continue
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype) and default not in values.cat.categories:
+            values = values.cat.add_categories([default])
+        df[col] = values.fillna(default)
+    return df
+
+
+# -----------------------------
+# Parquet cache
+# -----------------------------
+def _cache_paths(source: Path, cache_dir=None):
+    cache_dir = Path(cache_dir or os.environ.get("MEMBER_CACHE_DIR") or DEFAULT_CACHE_DIR)
+    stem = f"{source.stem}-{hashlib.sha1(str(source.resolve()).encode()).hexdigest()[:8]}"
+    return cache_dir / f"{stem}.parquet", cache_dir / f"{stem}.json"
+
+
+def _read_meta(meta_path: Path):
+    try:
+        return json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path: Path, meta: dict) -> None:
+    tmp = meta_path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp, meta_path)
+
+
+def ensure_cache(source=None, sheet_name=None, cache_dir=None) -> dict:
+    """
+    Build or validate the Parquet cache for ``source``.
+    Returns the cache metadata (including ``path`` and the source ``sha256``).
+    """
+    source = resolve_source(source)
+    parquet_path, meta_path = _cache_paths(source, cache_dir)
+    stat = source.stat()
+    signature = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    meta = _read_meta(meta_path)
+    usable = (
+        meta is not None
+        and meta.get("version") == CACHE_VERSION
+        and meta.get("sheet_name") == sheet_name
+        and parquet_path.exists()
+    )
+    if usable and all(meta.get(k) == v for k, v in signature.items()):
+        return {**meta, "path": str(parquet_path)}
+
+    digest = file_sha256(source)
+    if usable and meta.get("sha256") == digest:
+        # Touched but unchanged (e.g. re-copied): refresh the cheap signature only.
+        meta.update(signature)
+        _write_meta(meta_path, meta)
+        return {**meta, "path": str(parquet_path)}
+
+    df = clean_members(read_workbook(source, sheet_name))
+    parquet_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = parquet_path.with_suffix(".parquet.tmp")
+    df.to_parquet(tmp, engine="pyarrow", index=False)
+    os.replace(tmp, parquet_path)
+
+    meta = {
+        "version": CACHE_VERSION,
+        "source": str(source),
+        "sheet_name": sheet_name,
+        "sha256": digest,
+        "rows": int(len(df)),
+        **signature,
+    }
+    _write_meta(meta_path, meta)
+    return {**meta, "path": str(parquet_path)}
+
+
+@timed("load_members", rows=len)
+def load_members(source=None, columns=None, sheet_name=None, cache_dir=None) -> pd.DataFrame:
+    """
+    Load the cleaned member table, reading only ``columns`` when given.
+    Requested columns absent from the workbook come back as all-NaN.
+    """
+    if not pyarrow_ok:
+        df = clean_members(read_workbook(resolve_source(source), sheet_name))
+        return _select(df, columns)
+
+    meta = ensure_cache(source, sheet_name, cache_dir)
+    if columns is None:
+        table = pq.read_table(meta["path"], memory_map=True)
+        return table.to_pandas()
+
+    available = set(pq.read_schema(meta["path"]).names)
+    present = [c for c in columns if c in available]
+    df = pq.read_table(meta["path"], columns=present, memory_map=True).to_pandas()
+    return _select(df, columns)
+
+
+def data_version(source=None, sheet_name=None, cache_dir=None) -> str:
+    """Content hash of the source workbook; changes whenever the data does."""
+    if not pyarrow_ok:
+        return file_sha256(resolve_source(source))
+    return ensure_cache(source, sheet_name, cache_dir)["sha256"]
+
+
+def _select(df: pd.DataFrame, columns):
+    if columns is None:
+        return df
+    for col in columns:
+        if col not in df.columns:
+            df[col] = np.nan
+    return df[list(columns)]
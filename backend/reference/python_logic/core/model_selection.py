@@ -0,0 +1,150 @@
+# core/model_selection.py
+"""
+Choose the number of member segments instead of guessing with the k slider.
+
+``select_k`` fits every k in a range (in a process pool for large inputs)
+and scores each fit with inertia (for the elbow), silhouette on a fixed-size
+sample (so scoring stays sub-quadratic in the member count) and
+Davies-Bouldin. Per-k results are cached on a fingerprint of the
+standardized data, so re-opening the same cohort costs nothing.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .segmentation import fit_segments, squared_distances
+
+DEFAULT_K_VALUES = range(2, 11)
+# Below this many rows process start-up costs more than the fits themselves
+PARALLEL_MIN_ROWS = 20_000
+CACHE_SIZE = 512
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def data_fingerprint(X: np.ndarray) -> str:
+    X = np.ascontiguousarray(X, dtype=float)
+    digest = hashlib.sha1(str(X.shape).encode())
+    digest.update(X.tobytes())
+    return digest.hexdigest()
+
+
+# -----------------------------
+# Cluster quality metrics
+# -----------------------------
+def silhouette_sampled(X: np.ndarray, labels: np.ndarray, sample_size: int = 2000, seed: int = 0) -> float:
+    """Mean silhouette over at most ``sample_size`` rows (O(sample^2), not O(N^2))."""
+    if len(X) > sample_size:
+        idx = np.random.default_rng(seed).choice(len(X), size=sample_size, replace=False)
+        X, labels = X[idx], labels[idx]
+    clusters = np.unique(labels)
+    if len(clusters) < 2:
+        return float("nan")
+
+    dist = np.sqrt(squared_distances(X, X))
+    onehot = labels[:, None] == clusters[None, :]
+    sizes = onehot.sum(axis=0)
+    mean_to = (dist @ onehot) / sizes                  # mean distance to each cluster
+    own = onehot.argmax(axis=1)
+    own_size = sizes[own]
+    # exclude the point itself from its own cluster's mean
+    a = mean_to[np.arange(len(X)), own] * own_size / np.maximum(own_size - 1, 1)
+    mean_to[np.arange(len(X)), own] = np.inf
+    b = mean_to.min(axis=1)
+    s = np.where(own_size > 1, (b - a) / np.maximum(a, b), 0.0)
+    return float(np.mean(s))
+
+
+def davies_bouldin(X: np.ndarray, labels: np.ndarray, centroids: np.ndarray) -> float:
+    k = len(centroids)
+    counts = np.bincount(labels, minlength=k)
+    spread = np.bincount(labels, weights=np.sqrt(squared_distances(X, centroids)[np.arange(len(X)), labels]),
+                         minlength=k) / np.maximum(counts, 1)
+    separation = np.sqrt(squared_distances(centroids, centroids))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = (spread[:, None] + spread[None, :]) / separation
+    np.fill_diagonal(ratio, -np.inf)
+    return float(np.mean(np.max(ratio, axis=1)))
+
+
+def elbow_k(k_values, inertias) -> int:
+    """Knee of the inertia curve: the point farthest below the first-to-last chord."""
+    ks = np.asarray(k_values, dtype=float)
+    y = np.asarray(inertias, dtype=float)
+    if len(ks) < 3 or y[0] == y[-1]:
+        return int(ks[0])
+    xn = (ks - ks[0]) / (ks[-1] - ks[0])
+    yn = (y - y[-1]) / (y[0] - y[-1])
+    return int(ks[np.argmax((1 - xn) - yn)])
+
+
+# -----------------------------
+# Sweep
+# -----------------------------
+_worker_X = None
+
+
+def _init_worker(X):
+    # Ship the matrix once per worker process instead of once per k
+    global _worker_X
+    _worker_X = X
+
+
+def _score_k(k, seed, sample_size, X=None):
+    X = _worker_X if X is None else X
+    fit = fit_segments(X, k, seed=seed)
+    labels = fit["labels"]
+    return {
+        "k": k,
+        "inertia": fit["inertia"],
+        "silhouette": silhouette_sampled(X, labels, sample_size, seed),
+        "davies_bouldin": davies_bouldin(X, labels, fit["centroids"]),
+    }
+
+
+def select_k(X: np.ndarray, k_values=DEFAULT_K_VALUES, sample_size: int = 2000, seed: int = 42,
+             max_workers: int = None, parallel_min_rows: int = PARALLEL_MIN_ROWS) -> dict:
+    """
+    Fit and score each k. Returns ``recommended_k`` (best silhouette, ties to
+    lower Davies-Bouldin), ``elbow_k`` and per-k ``metrics`` sorted by k.
+    """
+    X = np.asarray(X, dtype=float)
+    k_values = [k for k in k_values if 2 <= k <= len(X)]
+    fingerprint = data_fingerprint(X)
+    keys = {k: (fingerprint, k, seed, sample_size) for k in k_values}
+
+    with _cache_lock:
+        metrics = {k: _cache[key] for k, key in keys.items() if key in _cache}
+    todo = [k for k in k_values if k not in metrics]
+
+    if todo:
+        if len(X) >= parallel_min_rows and len(todo) > 1 and max_workers != 1:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(X,)) as pool:
+                scored = list(pool.map(_score_k, todo, [seed] * len(todo), [sample_size] * len(todo)))
+        else:
+            scored = [_score_k(k, seed, sample_size, X) for k in todo]
+        with _cache_lock:
+            for row in scored:
+                metrics[row["k"]] = row
+                _cache[keys[row["k"]]] = row
+                _cache.move_to_end(keys[row["k"]])
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    rows = [metrics[k] for k in k_values]
+    best = max(rows, key=lambda r: (np.nan_to_num(r["silhouette"], nan=-1.0), -r["davies_bouldin"]))
+    return {
+        "recommended_k": best["k"],
+        "elbow_k": elbow_k(k_values, [r["inertia"] for r in rows]),
+        "metrics": rows,
+        "fingerprint": fingerprint,
+    }
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
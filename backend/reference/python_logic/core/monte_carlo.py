@@ -0,0 +1,79 @@
+# core/monte_carlo.py
+"""
+Stochastic counterpart to the deterministic ``simulate_growth`` loops.
+
+Each chunk draws an (paths x years) matrix of annual returns in one call and
+turns it into balance paths with cumulative products, using the identity
+
+    b_t = G_t * (b_0 + C * sum_{s<=t} 1 / G_s),   G_t = prod_{s<=t} (1 + r_s)
+
+for ``b_t = b_{t-1} * (1 + r_t) + C``. Temporaries are bounded by
+``chunk_size``; only the float32 balance matrix is kept for the percentiles.
+"""
+import numpy as np
+
+DEFAULT_PERCENTILES = (5, 50, 95)
+# Floor on a single year's return so the cumulative product never hits zero.
+MIN_ANNUAL_RETURN = -0.95
+
+
+def member_return_params(member) -> tuple:
+    """(mean, volatility) as fractions from a member's percentage columns."""
+    mean = float(member.get("Annual_Return_Rate", np.nan)) / 100
+    volatility = float(member.get("Volatility", np.nan)) / 100
+    if np.isnan(mean):
+        mean = 0.06
+    if np.isnan(volatility):
+        volatility = 0.0
+    return mean, volatility
+
+
+def _balance_paths(returns: np.ndarray, initial_balance: float, yearly_contribution: float) -> np.ndarray:
+    growth = np.cumprod(1.0 + np.maximum(returns, MIN_ANNUAL_RETURN), axis=1)
+    return growth * (initial_balance + yearly_contribution * np.cumsum(1.0 / growth, axis=1))
+
+
+def simulate_paths(initial_balance: float,
+                   yearly_contribution: float,
+                   years: int,
+                   mean_return: float,
+                   volatility: float,
+                   n_paths: int = 10_000,
+                   goal: float = None,
+                   seed: int = None,
+                   chunk_size: int = 10_000,
+                   percentiles=DEFAULT_PERCENTILES):
+    """
+    Monte Carlo projection with normally distributed annual returns.
+
+    Returns a dict with ``years`` (1..years), one ``p<N>`` band per requested
+    percentile, ``final`` (float32 final balances per path) and, when
+    ``goal`` is given, ``success_probability``. A fixed ``seed`` reproduces
+    results exactly for the same ``n_paths``/``chunk_size``.
+    """
+    years = int(years)
+    result = {"years": np.arange(1, max(years, 0) + 1)}
+    if years <= 0:
+        for p in percentiles:
+            result[f"p{p}"] = np.empty(0)
+        result["final"] = np.full(n_paths, initial_balance, dtype=np.float32)
+        if goal is not None:
+            result["success_probability"] = float(initial_balance >= goal)
+        return result
+
+    balances = np.empty((n_paths, years), dtype=np.float32)
+    n_chunks = -(-n_paths // chunk_size)
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        lo = i * chunk_size
+        hi = min(lo + chunk_size, n_paths)
+        rng = np.random.default_rng(child)
+        returns = rng.normal(mean_return, volatility, size=(hi - lo, years))
+        balances[lo:hi] = _balance_paths(returns, initial_balance, yearly_contribution)
+
+    bands = np.percentile(balances, percentiles, axis=0)
+    for p, band in zip(percentiles, bands):
+        result[f"p{p}"] = band
+    result["final"] = balances[:, -1].copy()
+    if goal is not None:
+        result["success_probability"] = float(np.mean(result["final"] >= goal))
+    return result
@@ -0,0 +1,100 @@
+# core/plot_sampling.py
+"""
+Bounded plot payloads for member scatter plots.
+
+Serializing every member into a Plotly figure (with hover columns) costs more
+than clustering them once the book is large, and browsers struggle past a
+few thousand SVG points. The pages therefore send at most ``POINT_LIMIT``
+points, or a ``DENSITY_BINS`` x ``DENSITY_BINS`` aggregate:
+
+- ``stratified_sample`` keeps each cluster's share of the sample (with a
+  floor so small clusters stay visible) and is deterministic for a seed, so
+  reruns don't reshuffle the plot.
+- ``density_grid`` bins the points in 2-D and reports each non-empty cell's
+  count and dominant cluster.
+
+Neither depends on the number of members beyond a single O(n log n) pass.
+"""
+import numpy as np
+
+POINT_LIMIT = 5_000
+WEBGL_THRESHOLD = 1_000
+MIN_PER_GROUP = 50
+DENSITY_BINS = 40
+
+
+def render_mode(n_points: int, threshold: int = WEBGL_THRESHOLD) -> str:
+    """Plotly Express ``render_mode``: WebGL (scattergl) above ``threshold`` points."""
+    return "webgl" if n_points > threshold else "svg"
+
+
+def group_quotas(sizes: np.ndarray, max_points: int, min_per_group: int = MIN_PER_GROUP) -> np.ndarray:
+    """Points per group: proportional to size, at least ``min_per_group`` (or the whole group)."""
+    sizes = np.asarray(sizes, dtype=np.int64)
+    total = int(sizes.sum())
+    if total <= max_points:
+        return sizes.copy()
+    floor = np.minimum(sizes, min_per_group)
+    if floor.sum() >= max_points:
+        # More groups than the budget allows floors for: share it evenly instead
+        return np.minimum(sizes, max_points // len(sizes))
+    spare = max_points - int(floor.sum())
+    extra = np.minimum(np.floor((sizes - floor) * spare / (total - floor.sum())).astype(np.int64), sizes - floor)
+    return floor + extra
+
+
+def stratified_sample(groups, max_points: int = POINT_LIMIT, min_per_group: int = MIN_PER_GROUP,
+                      seed: int = 0) -> np.ndarray:
+    """Sorted positional indices of at most ``max_points`` rows, stratified by ``groups``."""
+    groups = np.asarray(groups)
+    n = len(groups)
+    if n <= max_points:
+        return np.arange(n)
+    _, codes, sizes = np.unique(groups, return_inverse=True, return_counts=True)
+    quotas = group_quotas(sizes, max_points, min_per_group)
+    # Rows grouped by code; draw each group's quota from its slice
+    order = np.argsort(codes, kind="stable")
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rng = np.random.default_rng(seed)
+    picked = [order[start + rng.choice(size, quota, replace=False)]
+              for start, size, quota in zip(starts, sizes, quotas) if quota]
+    return np.sort(np.concatenate(picked))
+
+
+def _bin_width(values: np.ndarray, bins: int):
+    lo, hi = float(values.min()), float(values.max())
+    return lo, (hi - lo) / bins or 1.0
+
+
+def density_grid(x, y, groups=None, bins: int = DENSITY_BINS):
+    """
+    Non-empty cells of a ``bins`` x ``bins`` grid over (x, y): cell centres,
+    point counts and, with ``groups``, the most common group and its share.
+    """
+    import pandas as pd
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[keep], y[keep]
+    if not len(x):
+        return pd.DataFrame(columns=["x", "y", "count", "group", "share"])
+    x_lo, x_width = _bin_width(x, bins)
+    y_lo, y_width = _bin_width(y, bins)
+    xi = np.clip(((x - x_lo) / x_width).astype(np.int64), 0, bins - 1)
+    yi = np.clip(((y - y_lo) / y_width).astype(np.int64), 0, bins - 1)
+    cell = xi * bins + yi
+    counts = np.bincount(cell, minlength=bins * bins)
+    occupied = np.flatnonzero(counts)
+    frame = pd.DataFrame({
+        "x": x_lo + (occupied // bins + 0.5) * x_width,
+        "y": y_lo + (occupied % bins + 0.5) * y_width,
+        "count": counts[occupied],
+    })
+    if groups is not None:
+        labels, codes = np.unique(np.asarray(groups)[keep], return_inverse=True)
+        by_group = np.bincount(cell * len(labels) + codes, minlength=bins * bins * len(labels))
+        by_group = by_group.reshape(bins * bins, len(labels))[occupied]
+        frame["group"] = labels[by_group.argmax(axis=1)]
+        frame["share"] = by_group.max(axis=1) / frame["count"].to_numpy()
+    return frame
@@ -0,0 +1,127 @@
+# core/projection.py
+"""
+Closed-form savings projections and goal-seeking solvers.
+
+The pages model ``balance = balance * (1 + r) + contribution`` once per year.
+That recurrence has the future-value-of-annuity solution
+
+    FV = B0 * (1 + r)^n + C * ((1 + r)^n - 1) / r        (B0 + C * n when r == 0)
+
+so final balances, and the contribution rate or horizon needed to hit a goal,
+are O(1) per scenario. Every function broadcasts over NumPy arrays, so a
+whole member book is one call. Only ``member_required_contributions`` needs
+pandas, and imports it when called.
+"""
+import numpy as np
+
+RISK_RETURNS = {"Low": 0.04, "Medium": 0.06, "High": 0.08}
+MARKET_RETURNS = {"Conservative": 0.04, "Moderate": 0.06, "Aggressive": 0.08}
+DEFAULT_RETURN = 0.08
+INFLATION_RATE = 0.02
+
+
+def _annuity_factor(rate, years):
+    """((1 + r)^n - 1) / r, with the r -> 0 limit n."""
+    rate = np.asarray(rate, dtype=float)
+    years = np.asarray(years, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = np.expm1(years * np.log1p(rate)) / rate
+    return np.where(rate == 0, years, factor)
+
+
+def future_value(initial_balance, yearly_contribution, rate, years):
+    """Balance after ``years`` of growth at ``rate`` with year-end contributions."""
+    initial_balance = np.asarray(initial_balance, dtype=float)
+    yearly_contribution = np.asarray(yearly_contribution, dtype=float)
+    years = np.maximum(np.asarray(years, dtype=float), 0)
+    growth = np.power(1 + np.asarray(rate, dtype=float), years)
+    return initial_balance * growth + yearly_contribution * _annuity_factor(rate, years)
+
+
+def balance_path(initial_balance: float, yearly_contribution: float, rate: float, years: int) -> np.ndarray:
+    """Year-end balances for years 1..``years`` (same values as the yearly loop)."""
+    return future_value(initial_balance, yearly_contribution, rate, np.arange(1, max(int(years), 0) + 1))
+
+
+def market_rate(scenario: str, inflation: bool = False, inflation_rate: float = INFLATION_RATE) -> float:
+    """Yearly growth rate for a market scenario, less inflation when adjusting for it."""
+    rate = MARKET_RETURNS.get(scenario, DEFAULT_RETURN)
+    return rate - inflation_rate if inflation else rate
+
+
+def simulate_growth(initial_balance: float, salary: float, contribution_rate: float, rate: float,
+                    years: int) -> np.ndarray:
+    """Year-end balances when contributing ``contribution_rate`` % of ``salary`` each year."""
+    return balance_path(initial_balance, contribution_rate / 100 * salary, rate, years)
+
+
+def required_contribution_rate(goal_amount, salary, years, rate, initial_balance=0.0):
+    """
+    Minimum contribution (% of salary) for the balance to reach ``goal_amount``
+    after ``years``. 0 when savings alone get there; NaN when no contribution
+    can (no years left, or no salary).
+    """
+    goal_amount = np.asarray(goal_amount, dtype=float)
+    salary = np.asarray(salary, dtype=float)
+    years = np.maximum(np.asarray(years, dtype=float), 0)
+    shortfall = goal_amount - future_value(initial_balance, 0.0, rate, years)
+    factor = _annuity_factor(rate, years)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = shortfall / (factor * salary) * 100
+    pct = np.where(shortfall <= 0, 0.0, pct)
+    return np.where((shortfall > 0) & ((factor <= 0) | (salary <= 0)), np.nan, pct)
+
+
+def required_years(goal_amount, yearly_contribution, rate, initial_balance=0.0):
+    """
+    Whole years of saving until the balance first reaches ``goal_amount``,
+    by inverting FV for n. NaN when the goal is never reached.
+    """
+    goal_amount = np.asarray(goal_amount, dtype=float)
+    contribution = np.asarray(yearly_contribution, dtype=float)
+    initial_balance = np.asarray(initial_balance, dtype=float)
+    rate = np.asarray(rate, dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # (1 + r)^n = (goal + C/r) / (B0 + C/r)
+        steady = contribution / rate
+        ratio = (goal_amount + steady) / (initial_balance + steady)
+        n = np.log(ratio) / np.log1p(rate)
+        n_flat = (goal_amount - initial_balance) / contribution
+    n = np.where(rate == 0, n_flat, n)
+    n = np.where(np.isfinite(n) & (n >= 0), np.ceil(n - 1e-9), np.nan)
+    return np.where(initial_balance >= goal_amount, 0.0, n)
+
+
+def required_retirement_age(goal_amount, current_age, salary, contribution_rate, rate, initial_balance=0.0):
+    """Earliest age at which the projected balance reaches ``goal_amount``."""
+    contribution = np.asarray(contribution_rate, dtype=float) / 100 * np.asarray(salary, dtype=float)
+    return np.asarray(current_age, dtype=float) + required_years(goal_amount, contribution, rate, initial_balance)
+
+
+def member_required_contributions(df, goal_amount, rate=None):
+    """
+    Required contribution rate and earliest goal-reaching age for every member.
+
+    Uses Annual_Income, Current_Savings, Age, Retirement_Age_Goal and
+    Contribution_Amount; ``rate`` defaults to each member's Annual_Return_Rate.
+    """
+    import pandas as pd
+
+    salary = df["Annual_Income"].to_numpy(dtype=float)
+    savings = df["Current_Savings"].to_numpy(dtype=float)
+    age = df["Age"].to_numpy(dtype=float)
+    years = df["Retirement_Age_Goal"].to_numpy(dtype=float) - age
+    if rate is None:
+        rate = df["Annual_Return_Rate"].to_numpy(dtype=float) / 100
+    with np.errstate(divide="ignore", invalid="ignore"):
+        current_rate = df["Contribution_Amount"].to_numpy(dtype=float) / salary * 100
+
+    out = pd.DataFrame({
+        "Projected_Balance": future_value(savings, current_rate / 100 * salary, rate, years),
+        "Required_Contribution_Pct": required_contribution_rate(goal_amount, salary, years, rate, savings),
+        "Goal_Reached_At_Age": required_retirement_age(goal_amount, age, salary, current_rate, rate, savings),
+    }, index=df.index)
+    if "User_ID" in df.columns:
+        out.insert(0, "User_ID", df["User_ID"])
+    return out
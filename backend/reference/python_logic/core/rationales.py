@@ -0,0 +1,242 @@
+# core/rationales.py
+"""
+Advisor rationale prompts and the overnight batch job that pre-generates them.
+
+The job walks every member (or a filtered cohort), builds the same prompt as
+the "Generate Advisor Rationale" button, and fans requests out over a thread
+pool with a shared rate limit and retry/backoff. Prompts are built lazily and
+only ``2 * workers`` requests are in flight at a time, so a book-wide run
+doesn't hold every prompt in memory. Results are written as they complete to
+the ``advisor_rationales`` table (migration 009), keyed on (user_id,
+input_hash), so a rerun only regenerates members whose prompt inputs changed.
+
+    python -m core.rationales --workers 4 --rate 2 --risk High --limit 500
+"""
+import argparse
+import hashlib
+import logging
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from itertools import islice
+
+from .allocation import ASSET_CLASSES, guess_current_allocation_batch, recommend_allocation_batch
+from .member_db import DEFAULT_DB_PATH, apply_migration
+from .member_store import fill_category_defaults, load_members
+
+logger = logging.getLogger(__name__)
+
+MIGRATION = "009_create_advisor_rationales_sqlite.sql"
+MEMBER_COLUMNS = ["User_ID", "Age", "Risk_Tolerance", "Pension_Type", "Withdrawal_Strategy",
+                  "Current_Savings", "Investment_Type", "Retirement_Age_Goal"]
+
+
+def build_rationale_prompt(member, current_alloc: dict, rec: dict) -> str:
+    return f"""
+You are a portfolio strategist for retirement plans.
+
+Member Profile:
+- Age: {member.get('Age')}
+- Risk Tolerance: {member.get('Risk_Tolerance')}
+- Pension Type: {member.get('Pension_Type')}
+- Withdrawal Strategy: {member.get('Withdrawal_Strategy')}
+- Current Savings: ${member.get('Current_Savings')}
+- Current Allocation: {current_alloc}
+- Recommended Allocation: {rec}
+
+Explain in 3–5 sentences:
+1) Why this recommended mix balances growth vs. safety for this member.
+2) The main risks if they keep current allocation.
+3) A simple next-step (rebalance suggestion).
+Keep it crisp, professional, and client-friendly.
+"""
+
+
+def input_hash(model: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model}\0{prompt}".encode()).hexdigest()
+
+
+# -----------------------------
+# Rate limiting & retries
+# -----------------------------
+class RateLimiter:
+    """Thread-safe token bucket: ``rate`` requests per second, bursts up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def generate_with_retry(client, prompt: str, model: str, limiter: RateLimiter = None,
+                        retries: int = 3, backoff: float = 1.0) -> str:
+    """Call ``client.generate``; on failure wait ``backoff * 2^attempt`` (+ jitter) and retry."""
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            text = client.generate(prompt, model=model)
+            if text:
+                return text
+            raise ValueError("empty response")
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = backoff * 2 ** attempt * (1 + random.random() * 0.25)
+            logger.warning("generation failed (%s); retry %d in %.1fs", e, attempt + 1, delay)
+            time.sleep(delay)
+
+
+# -----------------------------
+# Result store
+# -----------------------------
+class RationaleStore:
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.conn = sqlite3.connect(str(db_path))
+        # Normally already applied by the backend; a no-op then
+        apply_migration(self.conn, MIGRATION)
+
+    def existing_keys(self) -> set:
+        return set(self.conn.execute("SELECT user_id, input_hash FROM advisor_rationales"))
+
+    def save(self, user_id: str, key: str, model: str, prompt: str, rationale: str) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO advisor_rationales VALUES (?, ?, ?, ?, ?, ?)",
+            (user_id, key, model, prompt, rationale, datetime.now(timezone.utc).isoformat()))
+        self.conn.commit()
+
+    def latest(self, user_id: str):
+        row = self.conn.execute(
+            "SELECT rationale FROM advisor_rationales WHERE user_id = ? ORDER BY created_at DESC LIMIT 1",
+            (user_id,)).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+# -----------------------------
+# Batch job
+# -----------------------------
+def select_cohort(df, user_ids=None, risk=None, pension_type=None, min_age=None, max_age=None, limit=None):
+    df = df.dropna(subset=["User_ID", "Age"])
+    if user_ids:
+        df = df[df["User_ID"].astype(str).isin(user_ids)]
+    if risk:
+        df = df[df["Risk_Tolerance"].isin(risk)]
+    if pension_type:
+        df = df[df["Pension_Type"].isin(pension_type)]
+    if min_age is not None:
+        df = df[df["Age"] >= min_age]
+    if max_age is not None:
+        df = df[df["Age"] <= max_age]
+    return df.head(limit) if limit else df
+
+
+def build_jobs(members, model: str):
+    """Yield (user_id, input_hash, prompt) per member, from the batch allocation engine."""
+    current = guess_current_allocation_batch(members["Investment_Type"])
+    recommended = recommend_allocation_batch(members)
+    for (_, member), cur, rec in zip(members.iterrows(),
+                                     current.itertuples(index=False),
+                                     recommended.itertuples(index=False)):
+        current_alloc = {a: float(v) for a, v in zip(ASSET_CLASSES, cur)}
+        rec_alloc = {a: float(v) for a, v in zip(ASSET_CLASSES, rec)}
+        prompt = build_rationale_prompt(member, current_alloc, rec_alloc)
+        yield str(member["User_ID"]), input_hash(model, prompt), prompt
+
+
+def run_batch(members, client, store: RationaleStore, model: str = "mistral", workers: int = 4,
+              rate: float = None, retries: int = 3, backoff: float = 1.0) -> dict:
+    """Generate missing rationales; returns counts of generated/skipped/failed members."""
+    done = store.existing_keys()
+    stats = {"generated": 0, "skipped": 0, "failed": 0}
+    logger.info("%d members to check", len(members))
+
+    def missing():
+        for job in build_jobs(members, model):
+            if job[:2] in done:
+                stats["skipped"] += 1
+            else:
+                yield job
+
+    jobs = missing()
+    limiter = RateLimiter(rate) if rate else None
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        def submit(uid, key, prompt):
+            future = pool.submit(generate_with_retry, client, prompt, model, limiter, retries, backoff)
+            pending[future] = (uid, key, prompt)
+
+        # A bounded window of requests in flight, refilled as each finishes
+        pending = {}
+        for job in islice(jobs, 2 * workers):
+            submit(*job)
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            # Results are written from this thread only, as each member finishes
+            for future in finished:
+                uid, key, prompt = pending.pop(future)
+                try:
+                    store.save(uid, key, model, prompt, future.result())
+                    stats["generated"] += 1
+                except Exception as e:
+                    stats["failed"] += 1
+                    logger.error("member %s failed: %s", uid, e)
+                for job in islice(jobs, 1):
+                    submit(*job)
+    return stats
+
+
+def main(argv=None) -> int:
+    from .llm_client import OllamaClient
+
+    parser = argparse.ArgumentParser(description="Pre-generate advisor rationales for a member cohort.")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH), help="SQLite file for the advisor_rationales table")
+    parser.add_argument("--source", help="member workbook (defaults to member_store resolution)")
+    parser.add_argument("--model", default="mistral")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=None, help="max requests per second")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--user-id", action="append", dest="user_ids")
+    parser.add_argument("--risk", action="append", help="Risk_Tolerance filter (repeatable)")
+    parser.add_argument("--pension-type", action="append")
+    parser.add_argument("--min-age", type=float)
+    parser.add_argument("--max-age", type=float)
+    parser.add_argument("--limit", type=int)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    # Same defaults as the allocation page, so prompts (and hashes) match it
+    members = select_cohort(fill_category_defaults(load_members(args.source, columns=MEMBER_COLUMNS)),
+                            args.user_ids, args.risk, args.pension_type, args.min_age, args.max_age, args.limit)
+    store = RationaleStore(args.db)
+    try:
+        stats = run_batch(members, OllamaClient(pool_size=args.workers), store, args.model,
+                          args.workers, args.rate, args.retries)
+    finally:
+        store.close()
+    logger.info("done: %s", stats)
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,93 @@
+# core/scenario_grid.py
+"""
+Every what-if for one member, precomputed.
+
+The what-if page projects ``balance = balance * (1 + r) + contribution`` to a
+retirement age for one (age, contribution rate, market scenario, inflation)
+choice at a time. ``build_grid`` evaluates the closed-form final balance for
+all retirement ages 50-75 x contribution rates 0-50% x the three market
+scenarios x inflation on/off in one broadcast, so answering a what-if is an
+index lookup. Grids are cached per member inputs.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from .projection import INFLATION_RATE, MARKET_RETURNS, future_value, market_rate
+
+RETIREMENT_AGES = np.arange(50, 76)
+CONTRIBUTION_RATES = np.arange(0, 51)          # % of salary
+DEFAULT_CONTRIBUTION_RATE = 10                 # when a member's own rate is unknown
+SCENARIOS = list(MARKET_RETURNS)
+
+
+def scenario_rates(inflation_rate: float = INFLATION_RATE) -> np.ndarray:
+    """(scenario, inflation) growth rates, as the page applies them (nominal, then minus inflation)."""
+    nominal = np.array([MARKET_RETURNS[s] for s in SCENARIOS])
+    return np.stack([nominal, nominal - inflation_rate], axis=1)
+
+
+def build_grid(current_savings: float, salary: float, current_age: float,
+               retirement_ages=RETIREMENT_AGES, contribution_rates=CONTRIBUTION_RATES,
+               inflation_rate: float = INFLATION_RATE) -> np.ndarray:
+    """
+    Final balances shaped (scenario, inflation off/on, retirement age, contribution rate).
+    Retirement ages at or below ``current_age`` keep today's savings.
+    """
+    rates = scenario_rates(inflation_rate)[:, :, None, None]
+    years = np.maximum(np.asarray(retirement_ages, dtype=float) - current_age, 0)[None, None, :, None]
+    contributions = (np.asarray(contribution_rates, dtype=float) / 100 * salary)[None, None, None, :]
+    return future_value(current_savings, contributions, rates, years)
+
+
+class ScenarioGrid:
+    def __init__(self, current_savings: float, salary: float, current_age: float,
+                 retirement_ages=RETIREMENT_AGES, contribution_rates=CONTRIBUTION_RATES,
+                 inflation_rate: float = INFLATION_RATE):
+        self.current_savings = float(current_savings)
+        self.salary = float(salary)
+        self.current_age = float(current_age)
+        self.retirement_ages = np.asarray(retirement_ages)
+        self.contribution_rates = np.asarray(contribution_rates)
+        self.inflation_rate = inflation_rate
+        self.values = build_grid(current_savings, salary, current_age, retirement_ages,
+                                 contribution_rates, inflation_rate)
+        self.values.setflags(write=False)
+        self._age_index = {int(a): i for i, a in enumerate(self.retirement_ages)}
+        self._rate_index = {float(r): i for i, r in enumerate(self.contribution_rates)}
+
+    def final_balance(self, retirement_age, contribution_rate, scenario: str, inflation: bool) -> float:
+        """Grid lookup; off-grid ages or rates fall back to the same closed form."""
+        s = SCENARIOS.index(scenario) if scenario in SCENARIOS else None
+        a = self._age_index.get(int(retirement_age)) if float(retirement_age).is_integer() else None
+        r = self._rate_index.get(float(contribution_rate))
+        if s is not None and a is not None and r is not None:
+            return float(self.values[s, int(inflation), a, r])
+        rate = market_rate(scenario, inflation, self.inflation_rate)
+        years = max(retirement_age - self.current_age, 0)
+        return float(future_value(self.current_savings, contribution_rate / 100 * self.salary, rate, years))
+
+    def nearest_rate(self, contribution_rate) -> int:
+        """Closest whole rate on the grid; ``DEFAULT_CONTRIBUTION_RATE`` when the rate is NaN or infinite."""
+        rate = float(contribution_rate)
+        if not np.isfinite(rate):
+            rate = DEFAULT_CONTRIBUTION_RATE
+        return int(np.clip(round(rate), self.contribution_rates[0], self.contribution_rates[-1]))
+
+    def heatmap(self, scenario: str, inflation: bool):
+        """Retirement age x contribution rate table of final balances."""
+        import pandas as pd
+
+        return pd.DataFrame(self.values[SCENARIOS.index(scenario), int(inflation)],
+                            index=pd.Index(self.retirement_ages, name="Retirement_Age"),
+                            columns=pd.Index(self.contribution_rates, name="Contribution_Rate"))
+
+
+@lru_cache(maxsize=1024)
+def _cached_grid(current_savings: float, salary: float, current_age: float) -> ScenarioGrid:
+    return ScenarioGrid(current_savings, salary, current_age)
+
+
+def member_grid(member) -> ScenarioGrid:
+    """Default grid for a member row (Current_Savings, Annual_Income, Age), cached on those inputs."""
+    return _cached_grid(float(member["Current_Savings"]), float(member["Annual_Income"]), float(member["Age"]))
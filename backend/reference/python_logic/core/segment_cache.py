@@ -0,0 +1,124 @@
+# core/segment_cache.py
+"""
+Memoization for segmentation results.
+
+Streamlit reruns the whole page on every interaction, including ones that
+change no segmentation input (the drill-down selectbox, the AI button). Results
+are keyed on (data version, age range, income range, risk filter, k) and held
+in a bounded in-memory LRU, optionally backed by pickles on disk so they
+survive restarts and are shared between server processes.
+
+Because results are shared, a cached result must depend on its key alone.
+``get_warm_started`` therefore warm-starts a miss from an *anchor* result
+(the same data version and k over the unfiltered book) rather than from
+whatever the session clustered last.
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+def segmentation_key(data_version: str, age_range, income_range, risk_filter, k: int) -> str:
+    payload = {
+        "data": data_version,
+        "age": [float(v) for v in age_range],
+        "income": [float(v) for v in income_range],
+        "risk": sorted(str(r) for r in risk_filter),
+        "k": int(k),
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class SegmentationCache:
+    def __init__(self, max_entries: int = 64, disk_dir=None, max_disk_entries: int = 1024):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.pkl"
+
+    def _remember(self, key: str, value) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), "rb") as fh:
+                    value = pickle.load(fh)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                value = None
+            if value is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(key, value)
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value) -> None:
+        with self._lock:
+            self._remember(key, value)
+        if self.disk_dir:
+            tmp = self._disk_path(key).with_suffix(".tmp")
+            with open(tmp, "wb") as fh:
+                pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._disk_path(key))
+            self._prune_disk()
+
+    def get_or_compute(self, key: str, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _prune_disk(self) -> None:
+        files = sorted(self.disk_dir.glob("*.pkl"), key=lambda p: p.stat().st_mtime)
+        for stale in files[:max(0, len(files) - self.max_disk_entries)]:
+            stale.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir:
+            for path in self.disk_dir.glob("*.pkl"):
+                path.unlink(missing_ok=True)
+
+    def get_warm_started(self, key: str, anchor_key: str, compute, compute_anchor):
+        """
+        Cached result for ``key``; a miss runs ``compute(init_centroids_raw)``
+        seeded with the centroids of the anchor result (itself cached under
+        ``anchor_key`` and computed cold by ``compute_anchor``).
+        """
+        if key == anchor_key:
+            return self.get_or_compute(key, compute_anchor)
+
+        def warm():
+            return compute(self.get_or_compute(anchor_key, compute_anchor)["centroids"])
+        return self.get_or_compute(key, warm)
+
+    @property
+    def stats(self) -> dict:
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "entries": len(self._entries)}
@@ -0,0 +1,92 @@
+# core/segment_labels.py
+"""
+Rule engine for naming segments.
+
+A rule is a label plus conditions ``(column, op, threshold)``; the threshold
+is a number or the name of a population statistic of that column ("median",
+"mean", "q25", "q75"). Rules are checked in order and the first match wins,
+like the original if-chain. Population statistics are computed once per call
+and every rule is a boolean mask, so labeling a cluster profile or every
+member is one ``np.select``.
+
+Rules can be loaded from JSON (a list of {"label": ..., "when": [[col, op, thr], ...]}).
+"""
+import json
+import operator
+
+import numpy as np
+
+DEFAULT_RULES = [
+    {"label": "High Capacity Savers",
+     "when": [("Current_Savings", ">=", "median"), ("Annual_Income", ">=", "median")]},
+    {"label": "High Income, Low Savings",
+     "when": [("Current_Savings", "<", "median"), ("Annual_Income", ">=", "median")]},
+    {"label": "Aggressive & Underfunded",
+     "when": [("Risk_Tolerance_Num", ">=", 2.5), ("Current_Savings", "<", "median")]},
+    {"label": "Conservative & Funded",
+     "when": [("Risk_Tolerance_Num", "<=", 1.5), ("Current_Savings", ">=", "median")]},
+]
+DEFAULT_LABEL = "Balanced"
+
+OPERATORS = {">=": operator.ge, ">": operator.gt, "<=": operator.le, "<": operator.lt,
+             "==": operator.eq, "!=": operator.ne}
+STATISTICS = {
+    "median": lambda s: s.median(),
+    "mean": lambda s: s.mean(),
+    "q25": lambda s: s.quantile(0.25),
+    "q75": lambda s: s.quantile(0.75),
+}
+
+
+def load_rules(path):
+    with open(path) as fh:
+        rules = json.load(fh)
+    for rule in rules:
+        for _, op, threshold in rule["when"]:
+            if op not in OPERATORS:
+                raise ValueError(f"Unknown operator {op!r} in rule {rule['label']!r}")
+            if isinstance(threshold, str) and threshold not in STATISTICS:
+                raise ValueError(f"Unknown statistic {threshold!r} in rule {rule['label']!r}")
+    return rules
+
+
+def population_stats(population, rules=DEFAULT_RULES) -> dict:
+    """Every (column, statistic) the rules reference, each computed once."""
+    needed = {(col, thr) for rule in rules for col, _, thr in rule["when"] if isinstance(thr, str)}
+    return {(col, stat): float(STATISTICS[stat](population[col])) for col, stat in needed}
+
+
+def apply_rules(values: dict, stats: dict, rules=DEFAULT_RULES, default: str = DEFAULT_LABEL) -> np.ndarray:
+    """
+    ``values`` maps column -> array (one entry per cluster or member).
+    Returns the first matching rule's label per entry.
+    """
+    n = len(next(iter(values.values())))
+    masks = []
+    for rule in rules:
+        mask = np.ones(n, dtype=bool)
+        for col, op, threshold in rule["when"]:
+            bound = stats[(col, threshold)] if isinstance(threshold, str) else threshold
+            mask &= OPERATORS[op](np.asarray(values[col], dtype=float), bound)
+        masks.append(mask)
+    labels = [rule["label"] for rule in rules]
+    return np.select(masks, labels, default=default) if masks else np.full(n, default, dtype=object)
+
+
+def _rule_columns(rules):
+    return sorted({col for rule in rules for col, _, _ in rule["when"]})
+
+
+def label_profiles(profile, population, rules=DEFAULT_RULES, default: str = DEFAULT_LABEL) -> dict:
+    """{cluster: label} from a cluster profile's per-column means."""
+    stats = population_stats(population, rules)
+    values = {col: profile[(col, "mean")].to_numpy() for col in _rule_columns(rules)}
+    labels = apply_rules(values, stats, rules, default) if len(profile) else []
+    return {int(c): str(label) for c, label in zip(profile.index, labels)}
+
+
+def label_members(members, population=None, rules=DEFAULT_RULES, default: str = DEFAULT_LABEL) -> np.ndarray:
+    """Per-member segment labels, judged against ``population`` (default: ``members``)."""
+    stats = population_stats(members if population is None else population, rules)
+    values = {col: members[col].to_numpy() for col in _rule_columns(rules)}
+    return apply_rules(values, stats, rules, default)
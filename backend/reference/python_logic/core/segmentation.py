@@ -0,0 +1,265 @@
+# core/segmentation.py
+"""
+K-means member segmentation that scales past the in-memory Streamlit case.
+
+- Distances are computed chunk by chunk with ||x||^2 - 2 x.c + ||c||^2, so
+  memory is O(chunk x k) instead of the N x k x d broadcast tensor.
+- ``fit_segments`` warm-starts from previous centroids (one short Lloyd run
+  when an advisor nudges a filter), and switches to mini-batch k-means for
+  large tables. scikit-learn is used when installed, NumPy otherwise; it
+  is imported on the first fit, not with this module.
+- ``StreamingKMeans`` folds in chunks of the member table one at a time
+  (mini-batch updates), for tables that don't fit in memory.
+"""
+from importlib.util import find_spec
+
+import numpy as np
+
+from .instrumentation import stage
+from .segment_labels import DEFAULT_RULES, label_members, label_profiles
+
+sklearn_ok = find_spec("sklearn") is not None
+
+MEMBER_COLUMNS = ["User_ID", "Age", "Annual_Income", "Current_Savings", "Risk_Tolerance"]
+FEATURE_COLUMNS = ["Age", "Annual_Income", "Current_Savings", "Risk_Tolerance_Num"]
+RISK_MAP = {"Low": 1, "Medium": 2, "High": 3}
+PROFILE_STATS = ["mean", "median", "min", "max"]
+
+# Above this many rows a full Lloyd pass per iteration isn't worth it
+MINIBATCH_THRESHOLD = 50_000
+DEFAULT_CHUNK_SIZE = 65_536
+
+
+# -----------------------------
+# Standardization
+# -----------------------------
+def standardize(features, mean=None, scale=None):
+    """
+    Z-score ``features`` (population std, like StandardScaler). Pass ``mean``/
+    ``scale`` to reuse a fitted scaler. Returns (X, mean, scale).
+    """
+    values = np.asarray(features, dtype=float)
+    if mean is None:
+        mean = values.mean(axis=0)
+        scale = values.std(axis=0)
+        scale[scale == 0] = 1.0
+    return (values - mean) / scale, mean, scale
+
+
+# -----------------------------
+# Chunked distance kernels
+# -----------------------------
+def squared_distances(X: np.ndarray, centroids: np.ndarray, x_sq: np.ndarray = None) -> np.ndarray:
+    """(n, k) squared Euclidean distances via the dot-product expansion."""
+    if x_sq is None:
+        x_sq = np.einsum("ij,ij->i", X, X)
+    c_sq = np.einsum("ij,ij->i", centroids, centroids)
+    d = x_sq[:, None] - 2.0 * (X @ centroids.T) + c_sq[None, :]
+    return np.maximum(d, 0.0, out=d)
+
+
+def assign_labels(X: np.ndarray, centroids: np.ndarray, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Nearest-centroid labels and squared distances, ``chunk_size`` rows at a time."""
+    n = len(X)
+    labels = np.empty(n, dtype=np.int64)
+    dists = np.empty(n, dtype=float)
+    for lo in range(0, n, chunk_size):
+        d = squared_distances(X[lo:lo + chunk_size], centroids)
+        labels[lo:lo + chunk_size] = d.argmin(axis=1)
+        dists[lo:lo + chunk_size] = d[np.arange(len(d)), labels[lo:lo + chunk_size]]
+    return labels, dists
+
+
+def _cluster_sums(X, labels, k):
+    sums = np.zeros((k, X.shape[1]))
+    np.add.at(sums, labels, X)
+    return sums, np.bincount(labels, minlength=k)
+
+
+def kmeans_plus_plus(X: np.ndarray, k: int, rng: np.random.Generator, sample_size: int = 10_000) -> np.ndarray:
+    """k-means++ seeding on a random sample of at most ``sample_size`` rows."""
+    if len(X) > sample_size:
+        X = X[rng.choice(len(X), size=sample_size, replace=False)]
+    centroids = [X[rng.integers(len(X))]]
+    closest = squared_distances(X, np.asarray(centroids))[:, 0]
+    for _ in range(1, k):
+        total = closest.sum()
+        idx = rng.choice(len(X), p=closest / total) if total > 0 else rng.integers(len(X))
+        centroids.append(X[idx])
+        closest = np.minimum(closest, squared_distances(X, X[idx][None, :])[:, 0])
+    return np.array(centroids, dtype=float)
+
+
+# -----------------------------
+# NumPy fallbacks
+# -----------------------------
+def _lloyd(X, centroids, max_iter, tol, chunk_size):
+    centroids = centroids.copy()
+    for n_iter in range(1, max_iter + 1):
+        labels, _ = assign_labels(X, centroids, chunk_size)
+        sums, counts = _cluster_sums(X, labels, len(centroids))
+        nonempty = counts > 0
+        updated = centroids.copy()
+        updated[nonempty] = sums[nonempty] / counts[nonempty, None]
+        shift = np.sum((updated - centroids) ** 2)
+        centroids = updated
+        if shift <= tol:
+            break
+    return centroids, n_iter
+
+
+class StreamingKMeans:
+    """
+    Mini-batch k-means (Sculley 2010) over an iterable of chunks. Each centroid
+    moves toward the mean of its points in a batch with step n_batch / n_seen,
+    so state is just (k x d) centroids plus per-centroid counts.
+    """
+
+    def __init__(self, k: int, init: np.ndarray = None, seed: int = 42):
+        self.k = k
+        self.rng = np.random.default_rng(seed)
+        self.centroids_ = None if init is None else np.array(init, dtype=float)
+        self.counts_ = np.zeros(k)
+
+    def partial_fit(self, X_chunk: np.ndarray) -> "StreamingKMeans":
+        X_chunk = np.asarray(X_chunk, dtype=float)
+        if len(X_chunk) == 0:
+            return self
+        if self.centroids_ is None:
+            self.centroids_ = kmeans_plus_plus(X_chunk, self.k, self.rng)
+        labels, _ = assign_labels(X_chunk, self.centroids_)
+        sums, counts = _cluster_sums(X_chunk, labels, self.k)
+        seen = self.counts_ + counts
+        hit = counts > 0
+        self.centroids_[hit] = (self.centroids_[hit] * self.counts_[hit, None] + sums[hit]) / seen[hit, None]
+        self.counts_ = seen
+        return self
+
+    def fit(self, chunks, n_epochs: int = 1) -> "StreamingKMeans":
+        """``chunks`` is an iterable of arrays, or a callable returning one per epoch."""
+        for _ in range(n_epochs):
+            for chunk in (chunks() if callable(chunks) else chunks):
+                self.partial_fit(chunk)
+        return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return assign_labels(np.asarray(X, dtype=float), self.centroids_)[0]
+
+
+def _minibatch(X, k, init, batch_size, max_iter, rng):
+    model = StreamingKMeans(k, init=init)
+    model.rng = rng
+    n_batches = max(1, -(-len(X) // batch_size))
+    for _ in range(max_iter):
+        order = rng.permutation(len(X))
+        previous = None if model.centroids_ is None else model.centroids_.copy()
+        for b in range(n_batches):
+            model.partial_fit(X[order[b * batch_size:(b + 1) * batch_size]])
+        if previous is not None and np.sum((model.centroids_ - previous) ** 2) < 1e-6:
+            break
+    return model.centroids_
+
+
+# -----------------------------
+# Entry point used by the page
+# -----------------------------
+def fit_segments(X: np.ndarray, k: int, init_centroids: np.ndarray = None, seed: int = 42,
+                 minibatch_threshold: int = MINIBATCH_THRESHOLD, batch_size: int = 4096,
+                 max_iter: int = 100, tol: float = 1e-4, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """
+    Cluster standardized ``X`` into ``k`` segments.
+
+    ``init_centroids`` (k x d, same standardized space) warm-starts a single
+    run instead of ``n_init`` restarts. Returns labels, centroids and inertia.
+    """
+    X = np.asarray(X, dtype=float)
+    k = min(k, len(X))
+    init = None
+    if init_centroids is not None and np.shape(init_centroids) == (k, X.shape[1]):
+        init = np.asarray(init_centroids, dtype=float)
+    large = len(X) > minibatch_threshold
+
+    if sklearn_ok:
+        from sklearn.cluster import KMeans, MiniBatchKMeans
+
+        if large:
+            model = MiniBatchKMeans(n_clusters=k, init=init if init is not None else "k-means++",
+                                    n_init=1 if init is not None else 3, batch_size=batch_size,
+                                    max_iter=max_iter, random_state=seed)
+        else:
+            model = KMeans(n_clusters=k, init=init if init is not None else "k-means++",
+                           n_init=1 if init is not None else 10, max_iter=max_iter, tol=tol,
+                           random_state=seed)
+        model.fit(X)
+        centroids = model.cluster_centers_
+    else:
+        rng = np.random.default_rng(seed)
+        start = init if init is not None else kmeans_plus_plus(X, k, rng)
+        if large:
+            centroids = _minibatch(X, k, start, batch_size, max_iter, rng)
+        else:
+            centroids, _ = _lloyd(X, start, max_iter, tol, chunk_size)
+
+    labels, dists = assign_labels(X, centroids, chunk_size)
+    return {"labels": labels, "centroids": np.asarray(centroids), "inertia": float(dists.sum())}
+
+
+# -----------------------------
+# Page pipeline: filter -> standardize -> fit -> profile
+# -----------------------------
+def prepare_members(df, required=MEMBER_COLUMNS):
+    """Rows with every ``required`` field, plus the numeric Risk_Tolerance_Num feature."""
+    df_clean = df.dropna(subset=required).copy()
+    df_clean["Risk_Tolerance_Num"] = df_clean["Risk_Tolerance"].map(RISK_MAP).astype(float).fillna(2)
+    return df_clean
+
+
+def filter_members(df_clean, age_range, income_range, risk_filter):
+    mask = (
+        (df_clean["Age"].between(age_range[0], age_range[1])) &
+        (df_clean["Annual_Income"].between(income_range[0], income_range[1])) &
+        (df_clean["Risk_Tolerance"].isin(risk_filter))
+    )
+    return df_clean.loc[mask]
+
+
+def cluster_profile(data, labels, columns=FEATURE_COLUMNS):
+    frame = data[columns].assign(Cluster=labels)
+    profile = frame.groupby("Cluster")[columns].agg(PROFILE_STATS).round(2)
+    profile["count"] = frame["Cluster"].value_counts().sort_index()
+    return profile
+
+
+def segment_members(df_clean, age_range, income_range, risk_filter, k, init_centroids_raw=None,
+                    label_rules=DEFAULT_RULES) -> dict:
+    """
+    Everything the segmentation page derives from its inputs, in one result:
+    the filtered row index, labels, centroids (raw feature units), scaler
+    params, the per-cluster profile, and segment names per cluster and per
+    member (from ``label_rules``). ``init_centroids_raw`` warm-starts.
+    """
+    with stage("filter_members", rows=len(df_clean)):
+        data = filter_members(df_clean, age_range, income_range, risk_filter)
+    with stage("standardize", rows=len(data)):
+        X, mean, scale = standardize(data[FEATURE_COLUMNS].values)
+    init = None
+    if init_centroids_raw is not None and np.shape(init_centroids_raw) == (k, X.shape[1]):
+        init = (np.asarray(init_centroids_raw) - mean) / scale
+    with stage("kmeans_fit", rows=len(X), k=k, warm_start=init is not None):
+        fit = fit_segments(X, k, init_centroids=init)
+    with stage("cluster_profile", rows=len(data)):
+        profile = cluster_profile(data, fit["labels"])
+    with stage("segment_labels", rows=len(data)):
+        cluster_labels = label_profiles(profile, data, label_rules)
+        member_segments = label_members(data, rules=label_rules)
+    return {
+        "index": data.index,
+        "labels": fit["labels"],
+        "centroids": fit["centroids"] * scale + mean,
+        "scaler_mean": mean,
+        "scaler_scale": scale,
+        "inertia": fit["inertia"],
+        "profile": profile,
+        "cluster_labels": cluster_labels,
+        "member_segments": member_segments,
+    }
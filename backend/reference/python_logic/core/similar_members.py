@@ -0,0 +1,208 @@
+# core/similar_members.py
+"""
+"Members like me": k nearest neighbours over standardized member features.
+
+``MemberIndex`` holds every member's features in one float32 matrix,
+z-scored with the scaler fitted at build time (the segmentation page's
+FEATURE_COLUMNS, plus any extra numeric columns). The scaler is saved with
+the index. A query is a blocked brute-force scan: per block, distances come
+from ||x||^2 - 2 x.q + ||q||^2 (as in ``segmentation.squared_distances``)
+and ``argpartition`` keeps the block's top k, which is then merged into the
+running top k. With four features this is a few milliseconds per million
+members. A tree buys little at this dimensionality and would have to be
+rebuilt on insert.
+
+``add`` inserts or updates members in place using the stored scaler, so the
+index never has to be refit for new joiners; ``remove`` drops leavers.
+``save``/``load`` round-trip through one ``.npz`` file, tagged with the data
+version it was built from and the newest ``updated_at`` it has seen.
+``sync_index`` uses that watermark to bring a stale index up to date from
+``pension_data`` by re-reading only the rows changed since.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .segmentation import FEATURE_COLUMNS, prepare_members
+
+DEFAULT_K = 10
+DEFAULT_BLOCK_SIZE = 262_144
+
+
+class MemberIndex:
+    def __init__(self, columns, mean, scale, version: str = None, capacity: int = 1024, watermark: str = None):
+        self.columns = list(columns)
+        self.mean = np.asarray(mean, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.version = version
+        self.watermark = watermark
+        self.X = np.empty((capacity, len(self.columns)), dtype=np.float32)
+        self.sq = np.empty(capacity, dtype=np.float32)
+        self.ids = np.empty(capacity, dtype=object)
+        self.rows = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, user_id) -> bool:
+        return str(user_id) in self.rows
+
+    @classmethod
+    def build(cls, df, extra_columns=(), version: str = None) -> "MemberIndex":
+        """Fit the scaler on ``df`` (a member frame) and index every member in it."""
+        if "Risk_Tolerance_Num" not in df.columns:
+            df = prepare_members(df)
+        columns = FEATURE_COLUMNS + [c for c in extra_columns if c not in FEATURE_COLUMNS]
+        values = df[columns].astype(float).to_numpy()
+        mean = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else np.zeros(len(columns))
+        scale = np.nan_to_num(np.nanstd(values, axis=0)) if len(values) else np.ones(len(columns))
+        scale[scale == 0] = 1.0
+        index = cls(columns, mean, scale, version, capacity=max(len(df), 1))
+        index.add(df)
+        return index
+
+    def transform(self, df) -> np.ndarray:
+        """Standardized float32 features; missing values sit at the mean."""
+        values = df[self.columns].astype(float).to_numpy()
+        values = np.where(np.isnan(values), self.mean, values)
+        return ((values - self.mean) / self.scale).astype(np.float32)
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self.X)
+        if needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity)
+        for name in ("X", "sq", "ids"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(self.rows)] = old[:len(self.rows)]
+            setattr(self, name, new)
+
+    def add(self, df) -> int:
+        """Insert new members and update existing ones (by User_ID); returns how many were new."""
+        if "Risk_Tolerance_Num" not in df.columns and "Risk_Tolerance_Num" in self.columns:
+            df = prepare_members(df)
+        df = df.drop_duplicates("User_ID", keep="last")
+        X = self.transform(df)
+        ids = df["User_ID"].astype(str).to_numpy(dtype=object)
+        rows = np.array([self.rows.get(user_id, -1) for user_id in ids], dtype=np.int64)
+        new = rows < 0
+        start = len(self.rows)
+        rows[new] = np.arange(start, start + int(new.sum()))
+        self._grow(start + int(new.sum()))
+        self.rows.update(zip(ids[new], rows[new].tolist()))
+        self.X[rows] = X
+        self.sq[rows] = np.einsum("ij,ij->i", X, X)
+        self.ids[rows] = ids
+        return int(new.sum())
+
+    def remove(self, user_ids) -> int:
+        """Drop members by User_ID (the last rows move into the freed slots); returns how many were indexed."""
+        removed = 0
+        for user_id in dict.fromkeys(str(u) for u in user_ids):
+            row = self.rows.pop(user_id, None)
+            if row is None:
+                continue
+            last = len(self.rows)
+            if row != last:
+                for values in (self.X, self.sq, self.ids):
+                    values[row] = values[last]
+                self.rows[self.ids[row]] = row
+            removed += 1
+        return removed
+
+    def nearest(self, query: np.ndarray, k: int = DEFAULT_K, exclude: int = None,
+                block_size: int = DEFAULT_BLOCK_SIZE):
+        """Rows and distances of the ``k`` members nearest a standardized ``query`` vector."""
+        query = np.asarray(query, dtype=np.float32)
+        q_sq = float(query @ query)
+        n = len(self.rows)
+        best_rows = np.empty(0, dtype=np.int64)
+        best_d = np.empty(0, dtype=np.float32)
+        for lo in range(0, n, block_size):
+            hi = min(lo + block_size, n)
+            d = self.sq[lo:hi] - 2 * (self.X[lo:hi] @ query) + q_sq
+            if exclude is not None and lo <= exclude < hi:
+                d[exclude - lo] = np.inf
+            top = np.argpartition(d, k)[:k] if len(d) > k else np.arange(len(d))
+            best_rows = np.concatenate([best_rows, top + lo])
+            best_d = np.concatenate([best_d, d[top]])
+            if len(best_d) > k:
+                keep = np.argpartition(best_d, k)[:k]
+                best_rows, best_d = best_rows[keep], best_d[keep]
+        best_rows = best_rows[np.isfinite(best_d)]
+        # The expansion cancels badly in float32 for near-duplicates; the
+        # survivors are few, so measure them directly
+        exact = np.sqrt(((self.X[best_rows] - query) ** 2).sum(axis=1))
+        order = np.argsort(exact, kind="stable")
+        return best_rows[order], exact[order]
+
+    def query(self, user_id, k: int = DEFAULT_K):
+        """The ``k`` members most like ``user_id`` (not including them), nearest first."""
+        import pandas as pd
+
+        row = self.rows[str(user_id)]
+        rows, distances = self.nearest(self.X[row], k, exclude=row)
+        features = self.X[rows].astype(float) * self.scale + self.mean
+        frame = pd.DataFrame(features, columns=self.columns)
+        frame.insert(0, "User_ID", self.ids[rows])
+        frame["Distance"] = distances
+        return frame
+
+    def save(self, path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        n = len(self.rows)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, X=self.X[:n], ids=self.ids[:n].astype(str), columns=np.array(self.columns),
+                     mean=self.mean, scale=self.scale, version=np.array(self.version or ""),
+                     watermark=np.array(self.watermark or ""))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path) -> "MemberIndex":
+        with np.load(path, allow_pickle=False) as data:
+            index = cls(data["columns"].tolist(), data["mean"], data["scale"], str(data["version"]) or None,
+                        capacity=max(len(data["ids"]), 1),
+                        watermark=str(data["watermark"]) or None if "watermark" in data.files else None)
+            n = len(data["ids"])
+            index.X[:n] = data["X"]
+            index.ids[:n] = data["ids"].astype(object)
+        index.sq[:n] = np.einsum("ij,ij->i", index.X[:n], index.X[:n])
+        index.rows = {user_id: i for i, user_id in enumerate(index.ids[:n].tolist())}
+        return index
+
+
+def sync_index(db, columns, version: str, index: MemberIndex = None, extra_columns=()) -> MemberIndex:
+    """
+    ``index`` brought up to ``version`` of ``db`` (a ``member_db.MemberDB``).
+
+    Rows with ``updated_at`` at or after the index's watermark, or with no
+    ``updated_at`` (they can't be ordered), are re-read and added with the
+    stored scaler; members gone from the table, or now missing a feature,
+    are removed. Without an index, or one with no watermark (built from the
+    workbook), every member is read and the scaler is fitted afresh.
+    """
+    import pandas as pd
+
+    columns = list(dict.fromkeys(list(columns) + ["User_ID", "Updated_At"]))
+    if index is None or index.watermark is None:
+        rows = db.fetch_frame(columns)
+        index = MemberIndex.build(rows, extra_columns, version)
+    else:
+        # >= rather than >: rows updated in the watermark's own second are
+        # re-read, and adding them again only rewrites their row
+        rows = pd.concat([db.fetch_frame(columns, {"Updated_At": (index.watermark, None)}),
+                          db.fetch_frame(columns, {"Updated_At": None})])
+        complete = prepare_members(rows)
+        current = set(db.fetch_arrays(["User_ID"])["user_id"].astype(str))
+        incomplete = set(rows["User_ID"].astype(str)) - set(complete["User_ID"].astype(str))
+        index.remove([u for u in index.ids[:len(index)] if u not in current] + sorted(incomplete))
+        index.add(complete)
+        index.version = version
+    stamps = rows["Updated_At"].dropna()
+    index.watermark = max([m for m in (stamps.max() if len(stamps) else None, index.watermark) if m is not None],
+                          default=None)
+    return index
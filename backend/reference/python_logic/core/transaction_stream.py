@@ -0,0 +1,340 @@
+# core/transaction_stream.py
+"""
+Score transactions as they arrive, from running per-member statistics.
+
+``fraud_scoring`` rescans the whole of ``pension_data`` to score rows. Here
+each event updates one member's running state in O(1) and is scored against
+that member's state from before the event. No table reads happen per event.
+
+``MemberStateStore`` keeps the state as parallel NumPy arrays, one slot per
+member (doubling as members appear):
+
+- a Welford count/mean/M2 of amounts and an EWMA of amounts;
+- circular time-of-day sums;
+- stable 64-bit hashes of the last device, IP and geo location.
+
+Scores reuse the ``fraud_scoring`` weights. "New" device/IP here means
+different from the member's last one, not never seen. A changed geo location
+counts towards the IP weight. The store checkpoints to a single ``.npz``
+(written atomically) together with the byte offset it had consumed, so a
+restart resumes where it stopped.
+
+Events are JSON objects keyed by ``pension_data`` columns, one per line in an
+append-only file (``tail_events``) or pushed onto an ``asyncio.Queue``
+(``queue_events``).
+
+    python -m core.transaction_stream events.jsonl --checkpoint stream_state.npz --follow
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .fraud_scoring import FLAG_THRESHOLD, MIN_HISTORY, WEIGHTS, Z_CAP
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ALPHA = 0.2
+DEFAULT_CHECKPOINT_EVERY = 10_000
+DEFAULT_CAPACITY = 1024
+STATE_FIELDS = {
+    "count": np.int64, "mean": np.float64, "m2": np.float64, "ewma": np.float64,
+    "timed": np.int64, "cos": np.float64, "sin": np.float64,
+    "device": np.uint64, "ip": np.uint64, "geo": np.uint64,
+}
+
+
+def stable_hash(value) -> int:
+    """64-bit hash that is the same in every process (``hash()`` is salted)."""
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "little")
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+@dataclass(slots=True)
+class Verdict:
+    event_id: object
+    user_id: str
+    score: float
+    flagged: bool
+    amount_z: float
+    amount_ewma: float
+    time_deviation: float
+    new_device: bool
+    new_ip: bool
+    new_geo: bool
+    channel_rarity: float
+
+
+def welford_add(count: int, mean: float, m2: float, x: float) -> tuple:
+    """(count, mean, M2) after adding ``x`` (Welford's update)."""
+    count += 1
+    delta = x - mean
+    mean += delta / count
+    return count, mean, m2 + delta * (x - mean)
+
+
+def welford_z(count: int, mean: float, m2: float, x: float) -> float:
+    """z-score of ``x`` against (count, mean, M2); 0 without a spread to compare to."""
+    if count < 2 or m2 <= 0:
+        return 0.0
+    return (x - mean) / math.sqrt(m2 / (count - 1))
+
+
+class _Welford:
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count, self.mean, self.m2 = count, mean, m2
+
+    def add(self, x: float) -> None:
+        self.count, self.mean, self.m2 = welford_add(self.count, self.mean, self.m2, x)
+
+    def z(self, x: float) -> float:
+        return welford_z(self.count, self.mean, self.m2, x)
+
+
+class MemberStateStore:
+    """Per-member running statistics in array slots, plus population fallbacks."""
+
+    def __init__(self, alpha: float = DEFAULT_ALPHA, capacity: int = DEFAULT_CAPACITY,
+                 threshold: float = FLAG_THRESHOLD):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.slots = {}
+        self.state = {name: np.zeros(capacity, dtype=dtype) for name, dtype in STATE_FIELDS.items()}
+        self.population = _Welford()
+        self.population_time = [0, 0.0, 0.0]    # timed, cos, sin
+        self.channels = {}
+        self.events = 0
+        self.offset = 0
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def slot(self, user_id: str) -> int:
+        i = self.slots.get(user_id)
+        if i is None:
+            i = self.slots[user_id] = len(self.slots)
+            if i == len(self.state["count"]):
+                self.state = {name: np.concatenate([values, np.zeros_like(values)])
+                              for name, values in self.state.items()}
+        return i
+
+    def member(self, user_id: str) -> dict:
+        i = self.slots[user_id]
+        return {name: values[i].item() for name, values in self.state.items()}
+
+    def observe(self, event: dict) -> Verdict:
+        """Score ``event`` against the state so far, then fold it in."""
+        user_id = str(event.get("user_id"))
+        i = self.slot(user_id)
+        s = self.state
+        amount = _number(event.get("transaction_amount"))
+        time_of_day = _number(event.get("time_of_transaction"))
+        count, timed = int(s["count"][i]), int(s["timed"][i])
+
+        # -- score against the prior state --
+        if math.isnan(amount):
+            amount_z = 0.0
+        elif count >= MIN_HISTORY and s["m2"][i] > 0:
+            amount_z = welford_z(count, float(s["mean"][i]), float(s["m2"][i]), amount)
+        else:
+            amount_z = self.population.z(amount)
+
+        time_deviation = 0.0
+        if not math.isnan(time_of_day):
+            n, cos, sin = (timed, float(s["cos"][i]), float(s["sin"][i])) if timed >= MIN_HISTORY \
+                else self.population_time
+            if n:
+                angle = 2 * math.pi * time_of_day - math.atan2(sin, cos)
+                distance = abs(math.atan2(math.sin(angle), math.cos(angle))) / math.pi
+                time_deviation = distance * math.hypot(cos, sin) / n
+
+        seen = count > 0 or timed > 0
+        device, ip, geo = (stable_hash(event.get(key)) for key in ("device_id", "ip_address", "geo_location"))
+        new_device = seen and device != int(s["device"][i])
+        new_ip = seen and ip != int(s["ip"][i])
+        new_geo = seen and geo != int(s["geo"][i])
+
+        channel = str(event.get("transaction_channel"))
+        channel_rarity = 1.0 - self.channels.get(channel, 0) / self.events if self.events else 0.0
+        previous_fraud = _number(event.get("previous_fraud_flag")) > 0
+
+        score = (WEIGHTS["amount_z"] * min(abs(amount_z) / Z_CAP, 1.0)
+                 + WEIGHTS["time_deviation"] * time_deviation
+                 + WEIGHTS["new_device"] * new_device
+                 + WEIGHTS["new_ip"] * (new_ip or new_geo)
+                 + WEIGHTS["channel_rarity"] * channel_rarity
+                 + WEIGHTS["previous_fraud"] * previous_fraud)
+        verdict = Verdict(event.get("id", event.get("transaction_id")), user_id, score, score >= self.threshold,
+                          amount_z, float(s["ewma"][i]), time_deviation, new_device, new_ip, new_geo,
+                          channel_rarity)
+
+        # -- fold the event in --
+        if not math.isnan(amount):
+            count, s["mean"][i], s["m2"][i] = welford_add(count, float(s["mean"][i]), float(s["m2"][i]), amount)
+            s["count"][i] = count
+            s["ewma"][i] = amount if count == 1 else self.alpha * amount + (1 - self.alpha) * float(s["ewma"][i])
+            self.population.add(amount)
+        if not math.isnan(time_of_day):
+            angle = 2 * math.pi * time_of_day
+            s["timed"][i] += 1
+            s["cos"][i] += math.cos(angle)
+            s["sin"][i] += math.sin(angle)
+            pt = self.population_time
+            pt[0] += 1
+            pt[1] += math.cos(angle)
+            pt[2] += math.sin(angle)
+        s["device"][i], s["ip"][i], s["geo"][i] = device, ip, geo
+        self.channels[channel] = self.channels.get(channel, 0) + 1
+        self.events += 1
+        return verdict
+
+    # -----------------------------
+    # Checkpoints
+    # -----------------------------
+    def save(self, path) -> None:
+        """Write the whole store to ``path`` (.npz) atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        size = len(self.slots)
+        meta = {"alpha": self.alpha, "threshold": self.threshold, "events": self.events, "offset": self.offset,
+                "population": [self.population.count, self.population.mean, self.population.m2],
+                "population_time": self.population_time, "channels": self.channels}
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, user_ids=np.array(list(self.slots), dtype=str), meta=np.array(json.dumps(meta)),
+                     **{name: values[:size] for name, values in self.state.items()})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path) -> "MemberStateStore":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            store = cls(meta["alpha"], max(DEFAULT_CAPACITY, len(data["user_ids"])), meta["threshold"])
+            store.slots = {user_id: i for i, user_id in enumerate(data["user_ids"].tolist())}
+            for name in STATE_FIELDS:
+                store.state[name][:len(store.slots)] = data[name]
+        store.events, store.offset, store.channels = meta["events"], meta["offset"], meta["channels"]
+        store.population = _Welford(*meta["population"])
+        store.population_time = meta["population_time"]
+        return store
+
+
+# -----------------------------
+# Sources and pipeline stages
+# -----------------------------
+def tail_events(path, offset: int = 0, follow: bool = False, poll_seconds: float = 1.0):
+    """
+    Yield ``(next_offset, event)`` for each complete JSON line of ``path``
+    from byte ``offset``. With ``follow`` keep polling for appended lines;
+    a partially written last line is re-read once it is complete. Blank and
+    malformed lines yield ``(next_offset, None)`` (malformed ones are logged
+    with their offset), so a checkpoint moves past them too.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                if not follow:
+                    return
+                f.seek(offset)
+                time.sleep(poll_seconds)
+                continue
+            start, offset = offset, offset + len(line)
+            event = None
+            if line.strip():
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    logger.warning("skipping malformed event at byte %d of %s: %s", start, path, exc)
+            yield offset, event
+
+
+async def queue_events(queue: asyncio.Queue):
+    """Async stand-in for a message queue: yield ``(None, event)`` until a ``None`` is queued."""
+    while (event := await queue.get()) is not None:
+        yield None, event
+
+
+def _observe(store: MemberStateStore, offset, event, checkpoint, checkpoint_every: int):
+    if offset is not None:
+        store.offset = offset
+    if event is None:
+        return None
+    verdict = store.observe(event)
+    if checkpoint and store.events % checkpoint_every == 0:
+        store.save(checkpoint)
+    return verdict
+
+
+def score_stream(events, store: MemberStateStore, checkpoint=None,
+                 checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY):
+    """Yield a Verdict per ``(offset, event)`` (skipping ``None`` events); checkpoints every N events and on exit."""
+    try:
+        for offset, event in events:
+            if (verdict := _observe(store, offset, event, checkpoint, checkpoint_every)) is not None:
+                yield verdict
+    finally:
+        if checkpoint:
+            store.save(checkpoint)
+
+
+async def ascore_stream(events, store: MemberStateStore, checkpoint=None,
+                        checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY):
+    """``score_stream`` over an async iterable such as ``queue_events``."""
+    try:
+        async for offset, event in events:
+            if (verdict := _observe(store, offset, event, checkpoint, checkpoint_every)) is not None:
+                yield verdict
+    finally:
+        if checkpoint:
+            store.save(checkpoint)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Score a JSON-lines transaction feed as it grows.")
+    parser.add_argument("events", help="append-only JSON-lines file of pension_data transactions")
+    parser.add_argument("--checkpoint", help=".npz state file; resumed from when it exists")
+    parser.add_argument("--checkpoint-every", type=int, default=DEFAULT_CHECKPOINT_EVERY)
+    parser.add_argument("--follow", action="store_true", help="keep waiting for new lines")
+    parser.add_argument("--threshold", type=float, default=FLAG_THRESHOLD)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.checkpoint and Path(args.checkpoint).exists():
+        store = MemberStateStore.load(args.checkpoint)
+        store.threshold = args.threshold
+        logger.info("resuming %d members at byte %d", len(store), store.offset)
+    else:
+        store = MemberStateStore(threshold=args.threshold)
+    flagged = 0
+    try:
+        for verdict in score_stream(tail_events(args.events, store.offset, args.follow), store,
+                                    args.checkpoint, args.checkpoint_every):
+            if verdict.flagged:
+                flagged += 1
+                print(json.dumps(asdict(verdict), default=str), flush=True)
+    except KeyboardInterrupt:
+        pass
+    logger.info("%d events, %d flagged, %d members", store.events, flagged, len(store))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,173 @@
+# core/whatif_parser.py
+"""
+Local parser for what-if questions.
+
+The what-if page used to send every question to Ollama just to get
+``retirement_age=XX`` or ``contribution_rate=YY`` back. The common phrasings
+("retire at 55", "contribute 12%", "5 years earlier", "increase my
+contributions by 3%") are handled here with precompiled patterns in
+microseconds. The LLM is only asked when no rule matches with confidence,
+and every question logs which path answered it.
+"""
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+CONFIDENCE_THRESHOLD = 0.8
+MIN_RETIREMENT_AGE, MAX_RETIREMENT_AGE = 40, 80
+MAX_CONTRIBUTION_RATE = 100.0
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "a couple of": 2, "a few": 3,
+}
+_NUM = r"(\d+(?:\.\d+)?|" + "|".join(sorted(map(re.escape, NUMBER_WORDS), key=len, reverse=True)) + r")"
+_PCT = r"\s*(?:%|percent|per\s*cent|pct)"
+_CONTRIB = r"(?:contribut\w*|sav(?:e|ing)\w*|put(?:ting)?\s+(?:in|away)|deposit\w*)"
+
+# (name, pattern, field, kind); kind is "absolute", "relative" (to the member's current value) or "scale"
+RULES = [
+    ("retire_relative", re.compile(
+        rf"\b{_NUM}\s+years?\s+(earlier|sooner|later|early|late)\b", re.I), "retirement_age", "relative"),
+    ("retire_at", re.compile(
+        r"\bretir\w*\b[^0-9?]{0,25}?\b(?:at|by|when\s+i(?:'m|\s+am)|age|aged|was|is|to|of)\s+(?:age\s+)?(\d{2})\b", re.I),
+     "retirement_age", "absolute"),
+    ("age_then_retire", re.compile(
+        r"\b(?:at|by)\s+(?:age\s+)?(\d{2})\b[^0-9?]{0,20}?\bretir\w*", re.I), "retirement_age", "absolute"),
+    ("contribution_change", re.compile(
+        rf"\b(increase|raise|bump|up|boost|decrease|reduce|lower|cut|drop)\s+(?:my\s+|the\s+)?{_CONTRIB}"
+        rf"[^0-9?]{{0,20}}?\bby\s+{_NUM}(?:{_PCT}|\s*percentage\s+points?)?", re.I), "contribution_rate", "relative"),
+    ("contribution_more", re.compile(
+        rf"{_CONTRIB}[^0-9?]{{0,15}}?\b{_NUM}{_PCT}\s+(more|less)\b", re.I), "contribution_rate", "relative"),
+    ("contribution_scale", re.compile(
+        rf"\b(double|triple|halve|half)\b[^0-9?]{{0,15}}?{_CONTRIB}", re.I), "contribution_rate", "scale"),
+    ("contribution_to", re.compile(
+        rf"{_CONTRIB}[^0-9?]{{0,30}}?\b(?:to\s+|of\s+|at\s+)?(\d+(?:\.\d+)?){_PCT}", re.I),
+     "contribution_rate", "absolute"),
+    ("percent_first", re.compile(
+        rf"(\d+(?:\.\d+)?){_PCT}\s+(?:of\s+(?:my\s+)?(?:salary|income|pay)\s+)?(?:in(?:to)?\s+)?(?:my\s+|the\s+)?"
+        rf"(?:contribution|savings?|pension|retirement)", re.I), "contribution_rate", "absolute"),
+]
+# "... instead of 60" names the baseline, not the what-if
+_BASELINE = re.compile(
+    r"\b(?:instead\s+of|rather\s+than|versus|vs\.?|compared\s+(?:to|with))\s+"
+    r"(?:retiring\s+|contributing\s+)?(?:at\s+)?(?:age\s+)?\d+(?:\.\d+)?(?:\s*(?:%|percent))?", re.I)
+_BARE_AGE = re.compile(r"\b([4-7]\d|80)\b")
+_DOWN = {"decrease", "reduce", "lower", "cut", "drop", "earlier", "sooner", "early", "less"}
+_SCALE = {"double": 2.0, "triple": 3.0, "halve": 0.5, "half": 0.5}
+
+
+@dataclass
+class WhatIf:
+    retirement_age: int = None
+    contribution_rate: float = None
+    confidence: float = 0.0
+    rules: list = field(default_factory=list)
+    source: str = "local"
+
+    @property
+    def found(self) -> bool:
+        return self.retirement_age is not None or self.contribution_rate is not None
+
+
+def _number(text: str):
+    text = text.lower()
+    if text in NUMBER_WORDS:
+        return float(NUMBER_WORDS[text])
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def parse_whatif(question: str, current_retirement_age: int = None, current_contribution_rate: float = None) -> WhatIf:
+    """
+    Extract a retirement age and/or contribution rate (% of salary).
+    Relative phrasings need the member's current values. ``confidence`` is
+    1.0 when a rule matched with in-range values, 0.5 for a bare age guess.
+    """
+    result = WhatIf()
+    question = _BASELINE.sub(" ", question)
+    for name, pattern, target, kind in RULES:
+        if getattr(result, target) is not None:
+            continue
+        m = pattern.search(question)
+        if not m:
+            continue
+        if kind == "absolute":
+            value = _number(m.group(1))
+        elif kind == "scale":
+            if current_contribution_rate is None:
+                continue
+            value = current_contribution_rate * _SCALE[m.group(1).lower()]
+        else:
+            current = current_retirement_age if target == "retirement_age" else current_contribution_rate
+            if current is None:
+                continue
+            words = [g.lower() for g in m.groups() if g]
+            amount = next(n for n in map(_number, words) if n is not None)
+            value = current - amount if _DOWN & set(words) else current + amount
+        setattr(result, target, value)
+        result.rules.append(name)
+
+    valid = True
+    if result.retirement_age is not None:
+        result.retirement_age = int(round(result.retirement_age))
+        valid &= MIN_RETIREMENT_AGE <= result.retirement_age <= MAX_RETIREMENT_AGE
+    if result.contribution_rate is not None:
+        valid &= 0 <= result.contribution_rate <= MAX_CONTRIBUTION_RATE
+    if result.found:
+        result.confidence = 1.0 if valid else 0.3
+        return result
+
+    # "what about 58?" -- probably an age, but not sure enough to skip the LLM
+    if re.search(r"\bretir", question, re.I) or "?" in question:
+        ages = _BARE_AGE.findall(question)
+        if len(ages) == 1:
+            result.retirement_age = int(ages[0])
+            result.rules.append("bare_age")
+            result.confidence = 0.5
+    return result
+
+
+# -----------------------------
+# LLM fallback
+# -----------------------------
+LLM_PROMPT = ("Extract retirement age or contribution changes from this question: {question}. "
+              "Reply strictly in format: retirement_age=XX or contribution_rate=YY")
+_LLM_AGE = re.compile(r"retirement_age\s*=\s*(\d+)")
+_LLM_RATE = re.compile(r"contribution_rate\s*=\s*(\d+)")
+
+
+def parse_llm_reply(text: str) -> WhatIf:
+    result = WhatIf(source="llm")
+    match_age = _LLM_AGE.search(text or "")
+    match_rate = _LLM_RATE.search(text or "")
+    if match_age:
+        result.retirement_age = int(match_age.group(1))
+    if match_rate:
+        result.contribution_rate = float(match_rate.group(1))
+    result.confidence = 1.0 if result.found else 0.0
+    return result
+
+
+def resolve_whatif(question: str, current_retirement_age: int = None, current_contribution_rate: float = None,
+                   llm=None, threshold: float = CONFIDENCE_THRESHOLD) -> WhatIf:
+    """
+    Parse locally; ask ``llm(prompt) -> str`` only below ``threshold``.
+    Logs the path taken and how long it took.
+    """
+    start = time.perf_counter()
+    result = parse_whatif(question, current_retirement_age, current_contribution_rate)
+    if result.confidence < threshold and llm is not None:
+        local = result
+        result = parse_llm_reply(llm(LLM_PROMPT.format(question=question)))
+        if not result.found and local.found:
+            local.source = "local-fallback"
+            result = local
+    logger.info("what-if parsed via %s in %.1f ms (rules=%s, confidence=%.2f): %r", result.source,
+                (time.perf_counter() - start) * 1000, ",".join(result.rules) or "-", result.confidence, question)
+    return result
@@ -1,36 +1,28 @@
 # risk_alerts_user1.py
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
-import requests
 
-st.set_page_config(page_title="Personalized Risk Alerts (User 1)", layout="centered")
-st.title("🚨 Personalized Retirement Risk Alerts (User 1)")
+from core.instrumentation import debug_enabled, panel_rows, stage, start_run
+from core.llm_client import ask_ollama
+from core.member_store import load_members
+from core.risk_alerts import (STATUS_ICONS, alert_queue, depletion_path, scan_members,
+                              withdrawal_rate as compute_withdrawal_rate, withdrawal_status)
 
-# -----------------------------
-# Helper: Call Ollama API
-# -----------------------------
-def ask_ollama(prompt: str) -> str:
-    try:
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={"model": "mistral", "prompt": prompt, "stream": False},
-            timeout=120
-        )
-        response.raise_for_status()
-        return response.json().get("response", "⚠️ No response from Ollama.")
-    except Exception as e:
-        return f"⚠️ Ollama error: {str(e)}"
+st.set_page_config(page_title="Personalized Risk Alerts", layout="centered")
+st.title("🚨 Personalized Retirement Risk Alerts")
+timings = start_run("personalised_risk_alert")
 
 # -----------------------------
-# Load data & pick first user
+# Load data & pick a member (first user by default)
 # -----------------------------
 @st.cache_data
 def load_data():
-    return pd.read_excel("Copy of Usecase 5(1).xlsx", sheet_name="Usecase 5 data")
+    return load_members(columns=["User_ID", "Age", "Annual_Income", "Current_Savings",
+                                 "Contribution_Amount", "Retirement_Age_Goal", "Monthly_Expenses"])
 
 df = load_data()
-member = df.iloc[0]   # first user
+user_id = st.selectbox("Member", df["User_ID"], index=0)
+member = df.loc[df["User_ID"] == user_id].iloc[0]
 
 st.subheader("👤 Selected User")
 st.write(member[["User_ID", "Age", "Annual_Income", "Current_Savings", 
@@ -42,16 +34,10 @@ st.write(member[["User_ID", "Age", "Annual_Income", "Current_Savings",
 current_savings = member["Current_Savings"]
 monthly_expenses = member.get("Monthly_Expenses", 0)
 annual_withdrawal = monthly_expenses * 12
-withdrawal_rate = annual_withdrawal / current_savings if current_savings > 0 else 0
+withdrawal_rate = compute_withdrawal_rate(current_savings, annual_withdrawal)
 
-SAFE_THRESHOLD = 0.04   # 4% rule
-status = ""
-if withdrawal_rate <= SAFE_THRESHOLD:
-    status = "🟢 Safe"
-elif withdrawal_rate <= 0.06:
-    status = "🟡 Caution"
-else:
-    status = "🔴 Risky"
+plain_status = withdrawal_status(withdrawal_rate)
+status = f"{STATUS_ICONS[plain_status]} {plain_status}"
 
 st.subheader("📉 Risk Analysis")
 st.write(f"- Annual expenses (treated as withdrawals): **${annual_withdrawal:,.0f}**")
@@ -61,14 +47,9 @@ st.write(f"- Risk status: **{status}**")
 # -----------------------------
 # Projection if withdrawals continue
 # -----------------------------
-years = 30   # simulate for 30 years
-balance = current_savings
-balances = []
-for _ in range(years):
-    balance = balance - annual_withdrawal  # ignoring growth for simplicity
-    balances.append(balance if balance > 0 else 0)
-    if balance <= 0:
-        break
+# Closed form of "subtract a year's expenses until the balance hits zero",
+# capped at 30 years and ignoring growth for simplicity
+balances = depletion_path(current_savings, annual_withdrawal)
 
 fig, ax = plt.subplots()
 ax.plot(range(1, len(balances) + 1), balances, color="red")
@@ -103,3 +84,25 @@ st.subheader("📊 Summary")
 st.write(f"- Withdrawal rate: **{withdrawal_rate*100:.2f}%** (Safe threshold: 4%)")
 st.write(f"- Projected savings last: **{len(balances)} years**")
 st.write(f"- Status: **{status}**")
+
+# -----------------------------
+# Book-wide alert queue
+# -----------------------------
+@st.cache_data
+def scan_book(data):
+    return scan_members(data)
+
+with st.expander("🚩 Alert queue: all members above 6% withdrawal rate"):
+    with stage("alert_queue", rows=len(df)):
+        queue = alert_queue(scan_book(df), min_rate=0.06)
+    st.write(f"**{len(queue)}** of {len(df)} members, most urgent first.")
+    st.dataframe(queue, use_container_width=True)
+    st.download_button("Download alert queue (CSV)", queue.to_csv(index=False).encode(),
+                       file_name="risk_alert_queue.csv", mime="text/csv")
+
+# -----------------------------
+# Debug: stage timings for this run
+# -----------------------------
+if debug_enabled() or st.query_params.get("debug") == "1":
+    with st.expander("⏱️ Stage timings"):
+        st.dataframe(panel_rows(timings), use_container_width=True)
@@ -2,27 +2,17 @@
 import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
-import requests
+
+from core.instrumentation import debug_enabled, panel_rows, stage, start_run
+from core.llm_client import ask_ollama
+from core.monte_carlo import simulate_paths
+from core.projection import (DEFAULT_RETURN, RISK_RETURNS, required_contribution_rate,
+                             simulate_growth as project_growth)
 
 st.set_page_config(page_title="Smart Contribution Recommendations", layout="centered")
 
 st.title("💡 Smart Contribution Recommendations")
-
-# -----------------------------
-# Helper: Call Ollama API
-# -----------------------------
-def ask_ollama(prompt: str) -> str:
-    try:
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={"model": "llama3", "prompt": prompt, "stream": False},  # you can swap "llama3" with "mistral"
-            timeout=120
-        )
-        response.raise_for_status()
-        data = response.json()
-        return data.get("response", "⚠️ No response from Ollama.")
-    except Exception as e:
-        return f"⚠️ Ollama error: {str(e)}"
+timings = start_run("smart_contribution_recommendations")
 
 # -----------------------------
 # Inputs
@@ -37,26 +27,16 @@ risk_tolerance = st.selectbox("Risk Tolerance", ["Low", "Medium", "High"])
 # Simple model to simulate outcomes
 # -----------------------------
 def simulate_growth(contribution_rate, risk_tolerance):
-    yearly_contribution = (contribution_rate / 100) * salary
-    
-    if risk_tolerance == "Low":
-        r = 0.04
-    elif risk_tolerance == "Medium":
-        r = 0.06
-    else:
-        r = 0.08
-
-    balance = 0
-    balances = []
-    for _ in range(years_to_retirement):
-        balance = balance * (1 + r) + yearly_contribution
-        balances.append(balance)
-    return balances
+    r = RISK_RETURNS.get(risk_tolerance, DEFAULT_RETURN)
+    # Closed-form annuity values; identical to the year-by-year loop
+    return project_growth(0, salary, contribution_rate, r, years_to_retirement)
 
 # Current scenario
 current_balances = simulate_growth(current_contribution, risk_tolerance)
-# Suggested scenario: +5% contribution
-suggested_contribution = min(current_contribution + 5, 50)
+# Suggested scenario: the minimum whole-percent contribution that reaches the goal (max 50%)
+required_contribution = float(required_contribution_rate(
+    goal_amount, salary, years_to_retirement, RISK_RETURNS.get(risk_tolerance, DEFAULT_RETURN)))
+suggested_contribution = int(min(max(np.ceil(required_contribution), current_contribution), 50))
 suggested_balances = simulate_growth(suggested_contribution, risk_tolerance)
 
 # -----------------------------
@@ -72,6 +52,36 @@ ax.set_title("Contribution Scenarios")
 ax.legend()
 st.pyplot(fig)
 
+# -----------------------------
+# Monte Carlo range (stochastic returns)
+# -----------------------------
+with st.expander("🎲 Monte Carlo Range (market uncertainty)"):
+    volatility = st.slider("Annual volatility (%)", 0, 30, 10)
+    n_paths = st.select_slider("Simulated paths", options=[1_000, 10_000, 100_000], value=10_000)
+    mean_return = RISK_RETURNS.get(risk_tolerance, DEFAULT_RETURN)
+    with stage("monte_carlo", rows=2 * n_paths):
+        mc_current = simulate_paths(0, (current_contribution / 100) * salary, years_to_retirement,
+                                    mean_return, volatility / 100, n_paths=n_paths, goal=goal_amount, seed=42)
+        mc_suggested = simulate_paths(0, (suggested_contribution / 100) * salary, years_to_retirement,
+                                      mean_return, volatility / 100, n_paths=n_paths, goal=goal_amount, seed=42)
+
+    fig_mc, ax_mc = plt.subplots()
+    for mc, name in ((mc_current, f"Current ({current_contribution}%)"),
+                     (mc_suggested, f"Suggested ({suggested_contribution}%)")):
+        ax_mc.fill_between(mc["years"], mc["p5"], mc["p95"], alpha=0.2, label=f"{name} P5–P95")
+        ax_mc.plot(mc["years"], mc["p50"], label=f"{name} median")
+    ax_mc.axhline(goal_amount, color="red", linestyle=":", label="Goal")
+    ax_mc.set_xlabel("Years")
+    ax_mc.set_ylabel("Retirement Savings ($)")
+    ax_mc.set_title("Projected Range of Outcomes")
+    ax_mc.legend()
+    st.pyplot(fig_mc)
+
+    st.write(f"- Probability of reaching goal at {current_contribution}%: "
+             f"**{mc_current['success_probability']:.0%}**")
+    st.write(f"- Probability of reaching goal at {suggested_contribution}%: "
+             f"**{mc_suggested['success_probability']:.0%}**")
+
 # -----------------------------
 # Gap analysis
 # -----------------------------
@@ -97,7 +107,7 @@ Write a short financial recommendation in plain English (2-3 sentences).
 
 if st.button("Generate AI Recommendation"):
     with st.spinner("🤖 Thinking... generating recommendation..."):
-        ai_response = ask_ollama(prompt)
+        ai_response = ask_ollama(prompt, model="llama3")  # you can swap "llama3" with "mistral"
         st.success(ai_response)
 
 # -----------------------------
@@ -107,3 +117,11 @@ st.subheader("📊 Summary")
 st.write(message)
 st.write(f"- Final balance with {current_contribution}% contributions: **${current_final:,.0f}**")
 st.write(f"- Final balance with {suggested_contribution}% contributions: **${suggested_final:,.0f}**")
+st.write(f"- Minimum contribution to reach the goal: **{required_contribution:.1f}%** of salary")
+
+# -----------------------------
+# Debug: stage timings for this run
+# -----------------------------
+if debug_enabled() or st.query_params.get("debug") == "1":
+    with st.expander("⏱️ Stage timings"):
+        st.dataframe(panel_rows(timings), use_container_width=True)
@@ -0,0 +1,10 @@
+import os
+import sys
+from pathlib import Path
+
+# Stage timings would otherwise be appended to backend/logs on every test run
+os.environ.setdefault("PYTHON_LOGIC_TIMING", "0")
+
+# Pages are run with `streamlit run <page>.py`, which puts python_logic/ on
+# sys.path; mirror that so tests import `core.*` the same way the pages do.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
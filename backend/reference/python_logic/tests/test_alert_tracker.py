@@ -0,0 +1,97 @@
+import sqlite3
+
+import pytest
+
+from core.alert_tracker import AlertTracker
+
+
+def make_db(path, members):
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE pension_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT UNIQUE, age INTEGER,
+        current_savings INTEGER, monthly_expenses INTEGER, updated_at TEXT)""")
+    conn.executemany("INSERT INTO pension_data (user_id, age, current_savings, monthly_expenses, updated_at) "
+                     "VALUES (?, ?, ?, ?, '2025-08-19 15:29:55')", members)
+    conn.commit()
+    return conn
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "pension.db"
+    # withdrawal rates: 3.6% Safe, 4.8% Caution, 12% Risky
+    conn = make_db(path, [("U1", 40, 100_000, 300), ("U2", 50, 100_000, 400), ("U3", 60, 100_000, 1000)])
+    yield path, conn
+    conn.close()
+
+
+def update(conn, user_id, expenses, updated_at):
+    conn.execute("UPDATE pension_data SET monthly_expenses = ?, updated_at = ? WHERE user_id = ?",
+                 (expenses, updated_at, user_id))
+    conn.commit()
+
+
+def test_first_run_scores_everyone(db):
+    path, _ = db
+    tracker = AlertTracker(path)
+    stats = tracker.refresh()
+    assert stats == {"candidates": 3, "changed": 3, "transitions": 3, "removed": 0,
+                     "watermark": "2025-08-19 15:29:55"}
+    states = dict(tracker.conn.execute("SELECT user_id, status FROM risk_alert_state"))
+    assert states == {"U1": "Safe", "U2": "Caution", "U3": "Risky"}
+    assert tracker.events()["from_status"].isna().all()
+
+
+def test_only_changed_rows_are_rescored(db):
+    path, conn = db
+    tracker = AlertTracker(path)
+    tracker.refresh()
+
+    update(conn, "U1", 450, "2025-09-01 09:00:00")   # 5.4%: Safe -> Caution
+    stats = tracker.refresh()
+    # U2/U3 share the old watermark second so they are re-read, but not re-scored
+    assert stats["candidates"] == 3 and stats["changed"] == 1 and stats["transitions"] == 1
+    event = tracker.events("U1").iloc[0]
+    assert (event["from_status"], event["to_status"]) == ("Safe", "Caution")
+
+    assert tracker.refresh() == {"candidates": 1, "changed": 0, "transitions": 0, "removed": 0,
+                                 "watermark": "2025-09-01 09:00:00"}
+    # A touch without an input change is filtered by the row hash
+    update(conn, "U2", 400, "2025-09-02 09:00:00")
+    assert tracker.refresh() == {"candidates": 2, "changed": 0, "transitions": 0, "removed": 0,
+                                 "watermark": "2025-09-02 09:00:00"}
+
+
+def test_full_mode_catches_updates_without_timestamp(db):
+    path, conn = db
+    tracker = AlertTracker(path)
+    tracker.refresh()
+    update(conn, "U3", 100, "2025-08-19 15:29:55")   # Risky -> Safe, old timestamp
+    conn.execute("UPDATE pension_data SET updated_at = '2025-01-01 00:00:00' WHERE user_id = 'U3'")
+    conn.commit()
+    assert tracker.refresh()["changed"] == 0
+    stats = tracker.refresh(full=True)
+    assert stats["candidates"] == 3 and stats["changed"] == 1 and stats["transitions"] == 1
+    status, = tracker.conn.execute("SELECT status FROM risk_alert_state WHERE user_id = 'U3'").fetchone()
+    assert status == "Safe"
+
+
+def test_rows_without_timestamp_and_deleted_members(db):
+    path, conn = db
+    tracker = AlertTracker(path)
+    tracker.refresh()
+    # no updated_at
+    conn.execute("INSERT INTO pension_data (user_id, age, current_savings, monthly_expenses) "
+                 "VALUES ('U4', 45, 100000, 1000)")
+    conn.execute("DELETE FROM pension_data WHERE user_id = 'U1'")
+    conn.commit()
+
+    stats = tracker.refresh()
+    assert stats == {"candidates": 3, "changed": 1, "transitions": 1, "removed": 1,
+                     "watermark": "2025-08-19 15:29:55"}
+    states = dict(tracker.conn.execute("SELECT user_id, status FROM risk_alert_state"))
+    assert states == {"U2": "Caution", "U3": "Risky", "U4": "Risky"}
+    # NULL-stamped rows are re-read every run but only re-scored when they change
+    update(conn, "U4", 300, None)
+    assert tracker.refresh()["changed"] == 1
+    assert tracker.events("U4")["to_status"].tolist() == ["Safe", "Risky"]
@@ -0,0 +1,72 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from core.allocation import (
+    ASSET_CLASSES,
+    guess_current_allocation,
+    rebalance_deltas,
+    recommend_allocation,
+    recommend_allocation_batch,
+)
+
+RISKS = ["Low", "Medium", "High", " high ", "LOW", "Unknown", None]
+STRATEGIES = ["Fixed", "Flexible", "Dynamic", "Bucket", "dynamic", "Other", None]
+PENSION_TYPES = ["Defined Benefit", "Defined Contribution", "defined benefit", "Hybrid", None]
+AGES = [18, 25, 30, 30.5, 41, 48, 55, 58.25, 63, 67, 80, np.nan]
+GOALS = [50, 60, 62, 65, 70, np.nan]
+
+
+def member_grid():
+    rows = itertools.product(AGES, RISKS, STRATEGIES, PENSION_TYPES, GOALS)
+    return pd.DataFrame(rows, columns=["Age", "Risk_Tolerance", "Withdrawal_Strategy",
+                                       "Pension_Type", "Retirement_Age_Goal"])
+
+
+def text_or_none(value):
+    return None if pd.isna(value) else value
+
+
+def test_batch_matches_scalar_exactly():
+    df = member_grid()
+    batch = recommend_allocation_batch(df)
+
+    for row, got in zip(df.itertuples(index=False), batch.itertuples(index=False)):
+        expected = recommend_allocation(
+            age=row.Age,
+            risk=text_or_none(row.Risk_Tolerance),
+            pension_type=text_or_none(row.Pension_Type),
+            withdrawal_strategy=text_or_none(row.Withdrawal_Strategy),
+            retirement_age_goal=row.Retirement_Age_Goal,
+        )
+        assert got._asdict() == expected, row
+
+
+def test_batch_accepts_categorical_columns():
+    df = member_grid()
+    typed = df.astype({c: "category" for c in ["Risk_Tolerance", "Withdrawal_Strategy", "Pension_Type"]})
+    pd.testing.assert_frame_equal(recommend_allocation_batch(typed), recommend_allocation_batch(df))
+
+
+def test_rebalance_deltas():
+    df = pd.DataFrame({
+        "User_ID": ["U1", "U2", "U3"],
+        "Age": [35, 60, 45],
+        "Risk_Tolerance": ["High", "Low", "Medium"],
+        "Pension_Type": ["Defined Contribution"] * 3,
+        "Withdrawal_Strategy": ["Fixed", "Dynamic", "Fixed"],
+        "Retirement_Age_Goal": [65, 65, 65],
+        "Investment_Type": pd.Categorical(["Stocks", "Bonds", "ETF"]),
+    })
+    table = rebalance_deltas(df)
+
+    assert table["User_ID"].tolist() == ["U1", "U2", "U3"]
+    for i, row in df.iterrows():
+        current = guess_current_allocation(row["Investment_Type"])
+        rec = recommend_allocation(row["Age"], row["Risk_Tolerance"], row["Pension_Type"],
+                                   row["Withdrawal_Strategy"], row["Retirement_Age_Goal"])
+        for asset in ASSET_CLASSES:
+            assert table.loc[i, f"Current_{asset}"] == current[asset]
+            assert table.loc[i, f"Recommended_{asset}"] == rec[asset]
+            assert table.loc[i, f"Delta_{asset}"] == round(rec[asset] - current[asset], 1)
@@ -0,0 +1,68 @@
+import sqlite3
+
+import pytest
+
+from benchmarks.compare import compare, format_report
+from benchmarks.run import run_benchmarks
+from benchmarks.synthetic import COLUMNS, generate_members, to_member_frame, write_sqlite
+from core.member_db import DEFAULT_DB_PATH, MemberDB
+from core.member_store import CATEGORICAL_COLUMNS, NUMERIC_COLUMNS
+
+
+def _report(seconds, peak_mb):
+    return {"results": {"case@1000": {"seconds_median": seconds, "peak_mb": peak_mb}}}
+
+
+@pytest.mark.skipif(not DEFAULT_DB_PATH.exists(), reason="backend database not present")
+def test_synthetic_members_match_pension_data_schema():
+    conn = sqlite3.connect(f"{DEFAULT_DB_PATH.as_uri()}?mode=ro", uri=True)
+    try:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(pension_data)")]
+    finally:
+        conn.close()
+    assert COLUMNS == columns
+
+
+def test_synthetic_members_load_like_real_ones(tmp_path):
+    members = generate_members(500, seed=1)
+    assert len(members) == 500 and members["user_id"].is_unique
+    frame = to_member_frame(members)
+    assert set(NUMERIC_COLUMNS + CATEGORICAL_COLUMNS) <= set(frame.columns)
+
+    write_sqlite(members, tmp_path / "members.db")
+    db = MemberDB(tmp_path / "members.db", wal=False)
+    try:
+        fetched = db.fetch_frame(["User_ID", "Age", "Risk_Tolerance"], {"Age": (30, 40)})
+    finally:
+        db.close()
+    expected = frame[frame["Age"].between(30, 40)]
+    assert fetched["User_ID"].tolist() == expected["User_ID"].tolist()
+
+
+def test_run_benchmarks_reports_time_and_memory():
+    report = run_benchmarks([200], ["recommend_allocation_batch", "withdrawal_projection"], repeat=1,
+                            log=lambda _: None)
+    assert set(report["results"]) == {"recommend_allocation_batch@200", "withdrawal_projection@200"}
+    for result in report["results"].values():
+        assert result["seconds_median"] > 0 and result["peak_mb"] > 0
+
+
+def test_run_benchmarks_skips_sizes_above_case_cap():
+    report = run_benchmarks([20_000], ["load_xlsx"], repeat=1, log=lambda _: None)
+    assert report["results"] == {}
+
+
+def test_compare_flags_time_and_memory_regressions():
+    assert not compare(_report(0.100, 10), _report(0.120, 12))[0]["regression"]
+    slower = compare(_report(0.100, 10), _report(0.200, 10))[0]
+    assert slower["regression"] and slower["status"] == "slower"
+    bigger = compare(_report(0.100, 10), _report(0.100, 20))[0]
+    assert bigger["regression"] and bigger["status"] == "more memory"
+    assert "1 regression(s)" in format_report([bigger])
+
+
+def test_compare_ignores_noise_and_missing_cases():
+    # sub-millisecond timings double easily; below min_seconds they don't count
+    assert not compare(_report(0.0002, 1), _report(0.0004, 1))[0]["regression"]
+    rows = compare(_report(0.1, 1), {"results": {}})
+    assert rows[0]["status"] == "missing" and not rows[0]["regression"]
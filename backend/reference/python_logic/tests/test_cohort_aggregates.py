@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.cohort_aggregates import (CohortAggregates, QuantileSketch, band_range, build_cells, combine_cells,
+                                    select_cells)
+
+
+def members(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Age": rng.integers(22, 70, n),
+        "Annual_Income": rng.integers(30_000, 150_000, n),
+        "Current_Savings": rng.lognormal(11.5, 0.8, n).round(),
+        "Risk_Tolerance": rng.choice(["Low", "Medium", "High"], n),
+        "Pension_Type": rng.choice(["Defined Benefit", "Defined Contribution"], n),
+    })
+
+
+def test_sketch_quantiles_are_relatively_accurate():
+    values = np.random.default_rng(1).lognormal(10, 1.5, 20_000)
+    sketch = QuantileSketch(0.01).add(values)
+    for q in (0.05, 0.5, 0.95):
+        exact = np.quantile(values, q, method="lower")
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.011)
+
+
+def test_merged_sketch_equals_sketch_of_union():
+    rng = np.random.default_rng(2)
+    a, b = rng.normal(0, 100, 3000), rng.normal(50, 10, 2000)
+    merged = QuantileSketch().add(a).merge(QuantileSketch().add(b))
+    whole = QuantileSketch().add(np.concatenate([a, b]))
+    assert merged.count == whole.count == 5000
+    assert (merged.positive, merged.negative, merged.zero) == (whole.positive, whole.negative, whole.zero)
+    assert QuantileSketch.from_json(merged.to_json()).quantile(0.5) == whole.quantile(0.5)
+
+
+def test_combined_cells_match_filtered_rows():
+    df = members()
+    cells = build_cells(df)
+    summary = combine_cells(select_cells(cells, (30, 45), (40_000, 99_999), ["Low", "High"]))
+    rows = df[df["Age"].between(30, 45) & df["Annual_Income"].between(40_000, 99_999)
+              & df["Risk_Tolerance"].isin(["Low", "High"])]
+    savings = summary.loc["Current_Savings"]
+    assert savings["count"] == len(rows)
+    assert savings["mean"] == pytest.approx(rows["Current_Savings"].mean())
+    assert (savings["min"], savings["max"]) == (rows["Current_Savings"].min(), rows["Current_Savings"].max())
+    assert savings["median"] == pytest.approx(rows["Current_Savings"].median(), rel=0.02)
+    assert summary.loc["Risk_Tolerance_Num", "max"] == 3.0
+
+
+def test_store_round_trip(tmp_path):
+    df = members(800)
+    store = CohortAggregates(tmp_path / "agg.db")
+    assert store.version() is None
+    store.refresh(df, "v1")
+    assert store.version() == "v1"
+    expected = combine_cells(select_cells(build_cells(df), (25, 60), None, ["Medium"], ["Defined Benefit"]))
+    got = store.summary((25, 60), None, ["Medium"], ["Defined Benefit"])
+    pd.testing.assert_frame_equal(got, expected)
+    assert store.summary(risk_filter=[]).empty
+    assert store.bounds()["Age"] == (df["Age"].min(), df["Age"].max())
+    assert store.bounds(["Low"])["Annual_Income"] == (
+        df.loc[df["Risk_Tolerance"] == "Low", "Annual_Income"].min(),
+        df.loc[df["Risk_Tolerance"] == "Low", "Annual_Income"].max())
+    assert store.bounds([]) == {}
+    store.close()
+
+
+def test_band_range_selects_whole_bands_exactly():
+    df = members(3000, seed=3)
+    df.loc[:9, "Annual_Income"] = 60_000  # on a band edge
+    lo, hi = band_range(40_000, 60_000)
+    summary = combine_cells(select_cells(build_cells(df), None, (lo, hi)))
+    rows = df[df["Annual_Income"].between(lo, hi)]
+    assert rows["Annual_Income"].max() < 60_000
+    assert summary.loc["Age", "count"] == len(rows)
@@ -0,0 +1,124 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import fraud_scoring
+from core.fraud_scoring import FraudScorer, HashSet, ensemble_score, first_seen, fit_model, transaction_features
+
+
+def transactions(rows):
+    return pd.DataFrame(rows, columns=["id", "user_id", "transaction_amount", "time_of_transaction",
+                                       "transaction_channel", "ip_address", "device_id", "previous_fraud_flag"])
+
+
+# U1 pays ~1,000 mid-morning from one phone; the last row is a 9,000 payment at
+# 3am from a new device and IP over the rarest channel
+HISTORY = [
+    (1, "U1", 1000, 0.40, "Online", "10.0.0.1", "d1", "0.0"),
+    (2, "U1", 1100, 0.42, "Online", "10.0.0.1", "d1", "0.0"),
+    (3, "U1", 900, 0.41, "Online", "10.0.0.1", "d1", "0.0"),
+    (4, "U1", 1050, 0.39, "Online", "10.0.0.1", "d1", "0.0"),
+    (5, "U2", 500, 0.70, "Online", "10.0.0.2", "d2", "0.0"),
+    (6, "U3", 700, 0.20, "Branch", "10.0.0.3", "d3", "1.0"),
+    (7, "U4", 650, 0.60, "Online", "10.0.0.4", "d4", "0.0"),
+    (8, "U1", 9000, 0.12, "ATM", "172.16.0.9", "d9", "0.0"),
+]
+
+
+def score_frame(rows, chunk_size=None):
+    frame = transactions(rows)
+    chunks = [frame] if chunk_size is None else [frame.iloc[i:i + chunk_size] for i in range(0, len(frame), chunk_size)]
+    model = fit_model(chunks)
+    seen = HashSet(), HashSet(), HashSet()
+    features = pd.concat([transaction_features(chunk, model, *seen) for chunk in chunks])
+    return features, ensemble_score(features, frame["previous_fraud_flag"])
+
+
+def test_hash_set_membership_and_first_seen():
+    seen = HashSet()
+    seen.add(np.array([5, 1, 9], dtype=np.uint64))
+    seen.add(np.array([9, 3], dtype=np.uint64))
+    assert seen.values.tolist() == [1, 3, 5, 9]
+    probe = np.array([3, 4, 4, 10], dtype=np.uint64)
+    assert seen.contains(probe).tolist() == [True, False, False, False]
+    assert first_seen(probe, seen).tolist() == [False, True, False, True]
+
+
+def test_outlier_transaction_scores_highest():
+    features, score = score_frame(HISTORY)
+    last = features.iloc[-1]
+    assert last["amount_z"] > 2
+    assert last["new_device"] and last["new_ip"]
+    assert last["channel_rarity"] == pytest.approx(1 - 1 / 8)
+    assert score.argmax() == len(HISTORY) - 1
+    # A user's first transaction is never "new device": there is nothing to compare with
+    assert not features["new_device"].iloc[[0, 4, 5, 6]].any()
+    assert features["time_deviation"].iloc[-1] > features["time_deviation"].iloc[1]
+
+
+def test_chunking_does_not_change_scores():
+    whole, whole_score = score_frame(HISTORY)
+    chunked, chunked_score = score_frame(HISTORY, chunk_size=3)
+    pd.testing.assert_frame_equal(whole, chunked)
+    np.testing.assert_allclose(whole_score, chunked_score)
+
+
+def test_previous_fraud_flag_raises_score():
+    rows = [HISTORY[4], HISTORY[4][:1] + ("U5",) + HISTORY[4][2:7] + ("1.0",)]
+    _, score = score_frame(rows)
+    assert score[1] > score[0]
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "pension.db"
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE pension_data (
+        id INTEGER PRIMARY KEY, user_id TEXT, transaction_amount INTEGER, time_of_transaction REAL,
+        transaction_channel TEXT, ip_address TEXT, device_id TEXT, previous_fraud_flag TEXT)""")
+    conn.executemany("INSERT INTO pension_data VALUES (?, ?, ?, ?, ?, ?, ?, ?)", HISTORY)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_scorer_writes_every_row(db):
+    scorer = FraudScorer(db)
+    try:
+        stats = scorer.score(chunk_size=3, threshold=0.5)
+        assert stats == {"rows": 8, "flagged": 1, "chunks": 3}
+        top = scorer.top(1).iloc[0]
+        assert (top["pension_id"], top["user_id"], top["flagged"]) == (8, "U1", 1)
+
+        # Re-scoring replaces rather than appends
+        scorer.score(chunk_size=100)
+        assert scorer.conn.execute("SELECT COUNT(*) FROM fraud_scores").fetchone()[0] == 8
+    finally:
+        scorer.close()
+
+
+def test_failed_run_keeps_previous_scores(db, monkeypatch):
+    scorer = FraudScorer(db)
+    try:
+        scorer.score(chunk_size=3)
+        before = scorer.top(8)
+        calls = []
+
+        def fail_on_second_chunk(features, previous):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError("boom")
+            return ensemble_score(features, previous)
+
+        monkeypatch.setattr(fraud_scoring, "ensemble_score", fail_on_second_chunk)
+        with pytest.raises(RuntimeError):
+            scorer.score(chunk_size=3)
+        # Another connection never saw the delete or the first chunk's inserts
+        other = sqlite3.connect(db)
+        assert other.execute("SELECT COUNT(*) FROM fraud_scores").fetchone()[0] == 8
+        other.close()
+        pd.testing.assert_frame_equal(scorer.top(8), before)
+    finally:
+        scorer.close()
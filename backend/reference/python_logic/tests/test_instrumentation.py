@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+import pytest
+
+from core import instrumentation
+from core.instrumentation import panel_rows, stage, start_run, timed
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYTHON_LOGIC_TIMING", "1")
+    monkeypatch.setenv("PYTHON_LOGIC_LOG_DIR", str(tmp_path))
+    monkeypatch.delenv("PYTHON_LOGIC_TRACE_MEMORY", raising=False)
+    monkeypatch.delenv("PYTHON_LOGIC_PROFILE", raising=False)
+    return tmp_path
+
+
+def logged(log_dir):
+    return [json.loads(line) for line in instrumentation.log_path().read_text().splitlines()]
+
+
+def test_stages_are_logged_as_json_lines(log_dir):
+    records = start_run("test_page")
+    with stage("outer", rows=10, cache_hit=False):
+        with stage("inner") as inner:
+            inner.rows = 3
+
+    lines = logged(log_dir)
+    assert instrumentation.log_path().name.startswith("python_timing-")
+    assert [r["stage"] for r in lines] == ["inner", "outer"]
+    assert lines == records
+    inner, outer = lines
+    assert inner["parentStage"] == "outer" and outer["parentStage"] is None
+    assert inner["page"] == outer["page"] == "test_page"
+    assert (inner["rows"], outer["rows"], outer["cacheHit"]) == (3, 10, False)
+    assert outer["type"] == "PYTHON_TIMING" and outer["timestamp"].endswith("Z")
+    assert outer["wallMs"] >= inner["wallMs"] >= 0 and outer["cpuMs"] >= 0
+    assert outer["peakMb"] is None    # tracemalloc is opt-in
+    assert set(panel_rows(records)[0]) == set(instrumentation.PANEL_COLUMNS)
+
+
+def test_errors_are_recorded_and_reraised(log_dir):
+    with pytest.raises(ZeroDivisionError):
+        with stage("broken"):
+            1 / 0
+    assert logged(log_dir)[-1]["error"] == "ZeroDivisionError"
+
+
+def test_timed_counts_rows_from_the_result(log_dir):
+    @timed("make_rows", rows=len)
+    def make_rows(n):
+        return list(range(n))
+
+    assert make_rows(7) == list(range(7))
+    assert logged(log_dir)[-1]["stage"] == "make_rows" and logged(log_dir)[-1]["rows"] == 7
+
+
+def test_peak_memory_nests(log_dir, monkeypatch):
+    monkeypatch.setenv("PYTHON_LOGIC_TRACE_MEMORY", "1")
+    with stage("outer"):
+        with stage("inner"):
+            block = np.ones(2_000_000)      # ~15 MB, freed before outer ends
+            del block
+        small = np.ones(1000)
+    inner, outer = logged(log_dir)
+    assert 14 < inner["peakMb"] < 20
+    # The inner stage reset tracemalloc's peak; the outer one still sees it
+    assert outer["peakMb"] >= inner["peakMb"]
+    assert small.sum() == 1000
+
+
+def test_file_logging_can_be_switched_off(log_dir, monkeypatch):
+    monkeypatch.setenv("PYTHON_LOGIC_TIMING", "0")
+    records = start_run("quiet")
+    with stage("quiet_stage"):
+        pass
+    assert not instrumentation.log_path().exists()
+    assert records[0]["stage"] == "quiet_stage"
+    assert instrumentation.recent(1)[0]["stage"] == "quiet_stage"
+
+
+def test_profiler_hook_writes_selected_stages(log_dir, monkeypatch):
+    monkeypatch.setenv("PYTHON_LOGIC_PROFILE", "hot")
+    with stage("cold"):
+        pass
+    with stage("hot"):
+        sum(range(10_000))
+    cold, hot = logged(log_dir)
+    assert "profile" not in cold
+    assert hot["profile"].startswith(str(log_dir / "profiles" / "hot-"))
+    assert (log_dir / "profiles").exists() and len(list((log_dir / "profiles").iterdir())) == 1
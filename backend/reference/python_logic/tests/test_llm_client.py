@@ -0,0 +1,94 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from core.llm_client import AsyncOllamaClient, OllamaClient, ResponseCache
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.calls.append(body)
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+
+        if body.get("stream"):
+            words = ["echo", ":", body["prompt"]]
+            payload = "".join(json.dumps({"response": w, "done": False}) + "\n" for w in words)
+            payload += json.dumps({"response": "", "done": True}) + "\n"
+        else:
+            payload = json.dumps({"response": f"echo:{body['prompt']}"})
+        data = payload.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllama)
+    server.calls, server.lock, server.in_flight, server.peak, server.delay = [], threading.Lock(), 0, 0, 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def client_for(server, **kwargs):
+    return OllamaClient(base_url=f"http://127.0.0.1:{server.server_port}", **kwargs)
+
+
+def test_generate_caches_on_normalized_prompt(stub):
+    client = client_for(stub)
+    assert client.generate("Member  profile\n  age 40") == "echo:Member  profile\n  age 40"
+    assert client.generate("Member profile age 40") == "echo:Member  profile\n  age 40"
+    assert client.generate("Member profile age 40", model="llama3") == "echo:Member profile age 40"
+    assert len(stub.calls) == 2
+    assert client.cache.hits == 1
+
+
+def test_cache_ttl_and_lru_eviction():
+    cache = ResponseCache(max_entries=2, ttl=0.05)
+    cache.put("m", "a", "A")
+    cache.put("m", "b", "B")
+    cache.get("m", "a")
+    cache.put("m", "c", "C")
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == "A"
+    time.sleep(0.06)
+    assert cache.get("m", "a") is None
+
+
+def test_stream_yields_tokens_then_serves_from_cache(stub):
+    client = client_for(stub)
+    assert list(client.stream("hi")) == ["echo", ":", "hi"]
+    assert list(client.stream("hi")) == ["echo:hi"]
+    assert client.generate("hi") == "echo:hi"
+    assert len(stub.calls) == 1
+
+
+def test_async_client_bounds_concurrency(stub):
+    stub.delay = 0.05
+    client = AsyncOllamaClient(client_for(stub, pool_size=3), max_concurrency=3)
+    results = asyncio.run(client.generate_many([f"p{i}" for i in range(9)]))
+    assert results == [f"echo:p{i}" for i in range(9)]
+    assert stub.peak <= 3
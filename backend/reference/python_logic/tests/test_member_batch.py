@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.member_batch import OUTPUT_COLUMNS, member_arrays, project_frame, project_members, run_sharded
+from core.projection import balance_path, market_rate
+from core.risk_alerts import depletion_years, withdrawal_status
+
+
+@pytest.fixture
+def members():
+    rng = np.random.default_rng(3)
+    n = 3000
+    return pd.DataFrame({
+        "User_ID": [f"U{i}" for i in range(n)],
+        "Current_Savings": rng.integers(0, 500_000, n).astype(float),
+        "Annual_Income": rng.integers(30_000, 150_000, n).astype(float),
+        "Age": rng.integers(25, 65, n).astype(float),
+        "Contribution_Amount": rng.integers(100, 2_000, n).astype(float),
+        "Retirement_Age_Goal": rng.integers(60, 70, n).astype(float),
+        "Monthly_Expenses": rng.integers(1_000, 10_000, n).astype(float),
+    })
+
+
+def test_matches_single_member_page_math(members):
+    out = project_members(member_arrays(members), scenario="Aggressive", inflation=True)
+    rate = market_rate("Aggressive", True)
+    for i in range(0, len(members), 97):
+        m = members.iloc[i]
+        contribution_rate = m["Contribution_Amount"] / m["Annual_Income"] * 100
+        path = balance_path(m["Current_Savings"], contribution_rate / 100 * m["Annual_Income"], rate,
+                            int(m["Retirement_Age_Goal"] - m["Age"]))
+        # Members already past their goal keep today's savings
+        assert out[2, i] == pytest.approx(path[-1] if len(path) else m["Current_Savings"], rel=1e-12)
+        withdrawal = m["Monthly_Expenses"] * 12
+        assert ["Safe", "Caution", "Risky"][int(out[4, i])] == withdrawal_status(out[3, i])
+        assert out[5, i] == depletion_years(m["Current_Savings"], withdrawal)
+
+
+def test_what_if_overrides(members):
+    X = member_arrays(members)
+    out = project_members(X, contribution_rate=15, retirement_age=67)
+    np.testing.assert_array_equal(out[0], 15)
+    np.testing.assert_array_equal(out[1], np.maximum(67 - X[2], 0))
+
+
+def test_sharded_run_matches_in_process(members):
+    X = member_arrays(members)
+    expected = project_members(X)
+    sharded = run_sharded(X, chunk_size=700, max_workers=2, parallel_min_rows=0)
+    np.testing.assert_array_equal(sharded, expected)
+    assert sharded.shape == (len(OUTPUT_COLUMNS), len(members))
+
+
+def test_project_frame(members):
+    frame = project_frame(members.head(50))
+    assert list(frame.columns[:1]) == ["User_ID"] and "Status_Code" not in frame
+    assert frame["Status"].cat.categories.tolist() == ["Safe", "Caution", "Risky"]
+    assert frame["Years_To_Depletion"].dtype == int
@@ -0,0 +1,92 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from core.member_db import MIGRATIONS_DIR, MemberDB, frame_column, migration_statements, open_member_db
+
+# Migrations added for python_logic; the backend runner must not drop any of their statements
+PYTHON_MIGRATIONS = ["007_create_analytics_indexes_sqlite.sql", "008_create_fraud_scores_sqlite.sql",
+                     "009_create_advisor_rationales_sqlite.sql", "010_create_risk_alert_tables_sqlite.sql"]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "pension.db"
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE pension_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT, age INTEGER, annual_income INTEGER,
+        current_savings INTEGER, risk_tolerance TEXT, years_of_payout INTEGER, volatility REAL)""")
+    rng = np.random.default_rng(0)
+    rows = [(f"U{i}", int(rng.integers(25, 65)), int(rng.integers(30_000, 150_000)),
+             int(rng.integers(0, 500_000)), ["Low", "Medium", "High", None][i % 4], 20, float(rng.random()))
+            for i in range(2500)]
+    conn.executemany("INSERT INTO pension_data (user_id, age, annual_income, current_savings, risk_tolerance, "
+                     "years_of_payout, volatility) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_frame_columns_follow_workbook_names():
+    assert frame_column("years_of_payout") == "Years_of_Payout"
+    assert frame_column("ip_address") == "IP_Address"
+    assert frame_column("some_new_column") == "Some_New_Column"
+
+
+def test_pushed_down_filters_match_pandas(db_path):
+    db = MemberDB(db_path)
+    columns = ["User_ID", "Age", "Annual_Income", "Current_Savings", "Risk_Tolerance", "Years_of_Payout"]
+    everyone = db.fetch_frame(columns, chunk_size=300)
+    assert len(everyone) == 2500
+    assert everyone["Age"].dtype == np.int64
+    # NULL risk stays missing, as on the workbook path
+    assert everyone["Risk_Tolerance"].isna().sum() == 625
+
+    filters = {"Age": (30, 45), "Annual_Income": (50_000.0, 120_000.0), "Risk_Tolerance": ["Medium", "High"]}
+    pushed = db.fetch_frame(columns, filters, chunk_size=97)
+    expected = everyone[everyone["Age"].between(30, 45) & everyone["Annual_Income"].between(50_000, 120_000)
+                        & everyone["Risk_Tolerance"].isin(["Medium", "High"])]
+    assert list(pushed.index) == list(expected.index)
+    # categories differ (only the filtered levels are present), values don't
+    assert pushed.astype({"Risk_Tolerance": str}).equals(expected.astype({"Risk_Tolerance": str}))
+    db.close()
+
+
+def test_arrays_bounds_and_read_only(db_path):
+    db = MemberDB(db_path)
+    arrays = db.fetch_arrays(["Age", "Volatility"], {"Risk_Tolerance": ["Low"]})
+    assert arrays["age"].dtype == float and len(arrays["age"]) == 625
+    assert db.bounds(["Age"], {"Risk_Tolerance": []}) == {"Age": (None, None)}
+    lo, hi = db.bounds(["Age"])["Age"]
+    assert lo <= arrays["age"].min() and hi >= arrays["age"].max()
+    with db.connection() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM pension_data")
+    with pytest.raises(KeyError):
+        db.fetch_arrays(["age; DROP TABLE pension_data"])
+    db.close()
+
+
+def test_wal_and_missing_database(db_path, tmp_path):
+    MemberDB(db_path).close()
+    assert sqlite3.connect(db_path).execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert open_member_db(tmp_path / "missing.db") is None
+
+
+@pytest.mark.parametrize("name", PYTHON_MIGRATIONS)
+def test_runner_keeps_every_migration_statement(name):
+    sql = (MIGRATIONS_DIR / name).read_text(encoding="utf-8")
+    statements = migration_statements(sql)
+    code = "\n".join(line for line in sql.splitlines() if not line.lstrip().startswith("--"))
+    assert len(statements) == code.count("CREATE ")
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE pension_data (id INTEGER PRIMARY KEY, age INTEGER, annual_income INTEGER, "
+                 "updated_at TEXT)")
+    for statement in statements:
+        conn.execute(statement)
+
+
+def test_comment_lines_do_not_hide_statements():
+    sql = "-- header\n-- Date: today\n\nCREATE TABLE a (x);\n\n-- why\nCREATE INDEX i ON a(x);\n-- trailing\n"
+    assert migration_statements(sql) == ["CREATE TABLE a (x)", "CREATE INDEX i ON a(x)"]
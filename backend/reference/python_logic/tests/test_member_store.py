@@ -0,0 +1,69 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("openpyxl")
+pytest.importorskip("pyarrow")
+
+from core import member_store
+
+
+def write_book(path, rows):
+    pd.DataFrame(rows).to_excel(path, sheet_name="Usecase 5 data", index=False)
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "members.xlsx"
+    write_book(path, {
+        "User_ID": ["U1", "U2", "U3"],
+        "Age": ["40", 55, "n/a"],
+        "Current_Savings": [1000, 2000, 3000],
+        "Risk_Tolerance": ["Low", None, "High"],
+        "Pension_Type": ["Defined Benefit", "Defined Contribution", None],
+    })
+    return path
+
+
+def test_cleans_and_types_columns(workbook, tmp_path):
+    df = member_store.load_members(workbook, cache_dir=tmp_path / "cache")
+
+    assert df["Age"].isna().tolist() == [False, False, True]
+    assert df["Risk_Tolerance"].isna().tolist() == [False, True, False]
+    assert isinstance(df["Risk_Tolerance"].dtype, pd.CategoricalDtype)
+    assert "Withdrawal_Strategy" not in df.columns
+
+
+def test_category_defaults_are_opt_in(workbook, tmp_path):
+    df = member_store.fill_category_defaults(member_store.load_members(workbook, cache_dir=tmp_path / "cache"))
+    assert df["Risk_Tolerance"].tolist() == ["Low", "Medium", "High"]
+    assert df["Pension_Type"].tolist() == ["Defined Benefit", "Defined Contribution", "Defined Contribution"]
+    assert df["Withdrawal_Strategy"].unique().tolist() == ["Fixed"]
+
+
+def test_column_pruning_fills_missing(workbook, tmp_path):
+    df = member_store.load_members(workbook, columns=["User_ID", "Monthly_Expenses"],
+                                   cache_dir=tmp_path / "cache")
+    assert list(df.columns) == ["User_ID", "Monthly_Expenses"]
+    assert df["Monthly_Expenses"].isna().all()
+
+
+def test_cache_reused_until_content_changes(workbook, tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    member_store.load_members(workbook, cache_dir=cache)
+    calls = []
+    original = member_store.read_workbook
+    monkeypatch.setattr(member_store, "read_workbook",
+                        lambda *a, **kw: calls.append(a) or original(*a, **kw))
+
+    member_store.load_members(workbook, cache_dir=cache)
+    stat = workbook.stat()
+    os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    member_store.load_members(workbook, cache_dir=cache)
+    assert calls == []
+
+    write_book(workbook, {"User_ID": ["U9"], "Age": [30]})
+    df = member_store.load_members(workbook, cache_dir=cache)
+    assert len(calls) == 1
+    assert df["User_ID"].tolist() == ["U9"]
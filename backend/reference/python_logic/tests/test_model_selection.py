@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from core import model_selection
+from core.model_selection import davies_bouldin, elbow_k, select_k, silhouette_sampled
+
+
+def blobs(k=4, n_per=150, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(-10, 10, size=(k, 3))
+    X = np.concatenate([c + rng.normal(0, 0.4, size=(n_per, 3)) for c in centers])
+    return X, np.repeat(np.arange(k), n_per), centers
+
+
+def test_metrics_match_sklearn():
+    metrics = pytest.importorskip("sklearn.metrics")
+    X, labels, _ = blobs()
+    centroids = np.array([X[labels == c].mean(axis=0) for c in range(4)])
+    assert silhouette_sampled(X, labels, sample_size=len(X)) == pytest.approx(
+        metrics.silhouette_score(X, labels), rel=1e-9)
+    assert davies_bouldin(X, labels, centroids) == pytest.approx(
+        metrics.davies_bouldin_score(X, labels), rel=1e-9)
+
+
+def test_elbow_k():
+    assert elbow_k([2, 3, 4, 5, 6], [100, 40, 10, 8, 7]) == 4
+
+
+def test_select_k_recommends_true_k_and_caches(monkeypatch):
+    model_selection.clear_cache()
+    X, _, _ = blobs()
+    first = select_k(X, range(2, 8))
+    assert first["recommended_k"] == 4
+    assert [m["k"] for m in first["metrics"]] == list(range(2, 8))
+
+    monkeypatch.setattr(model_selection, "_score_k", lambda *a, **kw: pytest.fail("cache miss"))
+    assert select_k(X, range(2, 8)) == first
+
+
+def test_parallel_sweep_matches_serial():
+    model_selection.clear_cache()
+    X, _, _ = blobs(k=3, n_per=100, seed=5)
+    serial = select_k(X, range(2, 6), max_workers=1)
+    model_selection.clear_cache()
+    parallel = select_k(X, range(2, 6), max_workers=2, parallel_min_rows=0)
+    assert parallel["recommended_k"] == serial["recommended_k"] == 3
+    for a, b in zip(serial["metrics"], parallel["metrics"]):
+        assert a["inertia"] == pytest.approx(b["inertia"])
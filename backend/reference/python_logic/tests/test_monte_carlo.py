@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from core.monte_carlo import member_return_params, simulate_paths
+
+
+def deterministic(balance, contribution, years, r):
+    balances = []
+    for _ in range(years):
+        balance = balance * (1 + r) + contribution
+        balances.append(balance)
+    return balances
+
+
+def test_zero_volatility_matches_deterministic_loop():
+    result = simulate_paths(50_000, 6_000, 25, 0.06, 0.0, n_paths=100, seed=1)
+    expected = deterministic(50_000, 6_000, 25, 0.06)
+    for p in ("p5", "p50", "p95"):
+        np.testing.assert_allclose(result[p], expected, rtol=1e-6)
+
+
+def test_seeded_runs_are_reproducible_and_chunked():
+    a = simulate_paths(10_000, 5_000, 30, 0.06, 0.12, n_paths=25_001, chunk_size=4_096, seed=7, goal=600_000)
+    b = simulate_paths(10_000, 5_000, 30, 0.06, 0.12, n_paths=25_001, chunk_size=4_096, seed=7, goal=600_000)
+    np.testing.assert_array_equal(a["final"], b["final"])
+    assert a["success_probability"] == b["success_probability"]
+    assert len(a["final"]) == 25_001
+    assert np.all(a["p5"] <= a["p50"]) and np.all(a["p50"] <= a["p95"])
+
+
+def test_success_probability_brackets_goal():
+    median = deterministic(0, 10_000, 20, 0.05)[-1]
+    low = simulate_paths(0, 10_000, 20, 0.05, 0.1, n_paths=20_000, seed=3, goal=median * 0.5)
+    high = simulate_paths(0, 10_000, 20, 0.05, 0.1, n_paths=20_000, seed=3, goal=median * 2)
+    assert low["success_probability"] > 0.95
+    assert high["success_probability"] < 0.05
+
+
+def test_member_return_params_uses_percentage_columns():
+    assert member_return_params({"Annual_Return_Rate": 5.97, "Volatility": 2.05}) == pytest.approx((0.0597, 0.0205))
+    assert member_return_params({}) == (0.06, 0.0)
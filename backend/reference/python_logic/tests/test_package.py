@@ -0,0 +1,42 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import core
+
+PYTHON_LOGIC_DIR = Path(__file__).resolve().parents[1]
+UI_MODULES = ["streamlit", "plotly", "matplotlib"]
+
+
+def _loaded_after(code: str) -> set:
+    script = f"import sys\n{code}\nprint(' '.join(sorted(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", script], cwd=PYTHON_LOGIC_DIR, check=True,
+                         capture_output=True, text=True).stdout
+    return {name.split(".")[0] for name in out.split()}
+
+
+def test_every_export_resolves():
+    for name in core.__all__:
+        assert getattr(core, name) is not None
+    assert set(core.__all__) <= set(dir(core))
+
+
+def test_numpy_only_jobs_skip_heavy_imports():
+    loaded = _loaded_after("import core\n"
+                           "core.recommend_allocation(45, 'High')\n"
+                           "core.simulate_growth(0, 60000, 10, core.market_rate('Moderate'), 30)\n"
+                           "core.depletion_years(500000, 40000)\n"
+                           "core.parse_whatif('retire at 60')\n"
+                           "from core.instrumentation import stage\n"
+                           "with stage('numpy_only'): pass")
+    assert not loaded & {"pandas", "sklearn", "requests", *UI_MODULES}
+
+
+def test_llm_client_loads_requests_on_first_client():
+    assert "requests" not in _loaded_after("import core.llm_client")
+    assert "requests" in _loaded_after("import core.llm_client\ncore.llm_client.OllamaClient()")
+
+
+def test_segmentation_loads_sklearn_on_first_fit():
+    assert "sklearn" not in _loaded_after("import core.segmentation")
+    assert not _loaded_after("import core.segmentation, core.member_store, core.member_db") & set(UI_MODULES)
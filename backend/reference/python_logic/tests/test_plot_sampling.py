@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from core.plot_sampling import density_grid, group_quotas, render_mode, stratified_sample
+
+
+def test_small_inputs_are_not_sampled():
+    assert stratified_sample(np.zeros(100), max_points=100).tolist() == list(range(100))
+    assert render_mode(1_000) == "svg" and render_mode(1_001) == "webgl"
+
+
+def test_quotas_are_proportional_with_a_floor():
+    quotas = group_quotas(np.array([90_000, 9_000, 1_000, 10]), 1_000, min_per_group=50)
+    assert quotas.sum() <= 1_000
+    assert quotas[3] == 10                       # whole tiny cluster
+    assert quotas[2] >= 50                       # floor
+    assert quotas[0] > 10 * quotas[2] - 500      # big cluster keeps most of the budget
+
+
+def test_stratified_sample_is_bounded_deterministic_and_covers_clusters():
+    rng = np.random.default_rng(1)
+    groups = rng.choice(4, size=200_000, p=[0.7, 0.2, 0.0999, 0.0001])
+    rows = stratified_sample(groups, max_points=2_000, seed=3)
+    assert len(rows) <= 2_000 and len(np.unique(rows)) == len(rows)
+    assert np.all(np.diff(rows) > 0)
+    assert set(groups[rows]) == {0, 1, 2, 3}
+    np.testing.assert_array_equal(rows, stratified_sample(groups, max_points=2_000, seed=3))
+    shares = np.bincount(groups[rows], minlength=4) / len(rows)
+    assert shares[0] == pytest.approx(0.7, abs=0.05)
+
+
+def test_more_groups_than_budget():
+    groups = np.repeat(np.arange(500), 10)
+    rows = stratified_sample(groups, max_points=1_000, min_per_group=50)
+    assert len(rows) == 1_000 and np.all(np.bincount(groups[rows]) == 2)
+
+
+def test_density_grid_counts_every_point_once():
+    rng = np.random.default_rng(0)
+    x = np.concatenate([rng.normal(0, 1, 50_000), rng.normal(10, 1, 50_000), [np.nan]])
+    y = np.concatenate([rng.normal(0, 1, 50_000), rng.normal(10, 1, 50_000), [1.0]])
+    groups = np.concatenate([np.zeros(50_000, int), np.ones(50_000, int), [0]])
+    grid = density_grid(x, y, groups, bins=40)
+    assert grid["count"].sum() == 100_000
+    assert len(grid) <= 40 * 40
+    assert grid.loc[grid["x"] < 5, "group"].eq(0).all()
+    assert grid.loc[grid["x"] > 5, "group"].eq(1).all()
+    assert grid["share"].between(0, 1).all()
+
+
+def test_density_grid_without_points():
+    assert density_grid([], []).empty
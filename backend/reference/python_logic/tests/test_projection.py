@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.projection import (
+    balance_path,
+    future_value,
+    market_rate,
+    member_required_contributions,
+    required_contribution_rate,
+    required_years,
+    simulate_growth,
+)
+
+
+def loop_balances(balance, contribution, rate, years):
+    balances = []
+    for _ in range(years):
+        balance = balance * (1 + rate) + contribution
+        balances.append(balance)
+    return balances
+
+
+@pytest.mark.parametrize("rate", [0.0, 0.02, 0.06, -0.01])
+def test_closed_form_matches_yearly_loop(rate):
+    expected = loop_balances(25_000, 7_200, rate, 35)
+    np.testing.assert_allclose(balance_path(25_000, 7_200, rate, 35), expected, rtol=1e-12)
+    assert future_value(25_000, 7_200, rate, 35) == pytest.approx(expected[-1], rel=1e-12)
+    assert len(balance_path(25_000, 7_200, rate, 0)) == 0
+
+
+def test_simulate_growth_contributes_share_of_salary():
+    rate = market_rate("Moderate", inflation=True)
+    assert rate == pytest.approx(0.04)
+    assert market_rate("Unknown") == 0.08
+    np.testing.assert_allclose(simulate_growth(10_000, 60_000, 12, rate, 20),
+                               loop_balances(10_000, 7_200, rate, 20), rtol=1e-12)
+
+
+def test_required_contribution_rate_hits_goal_exactly():
+    salary = np.array([40_000, 60_000, 120_000])
+    years = np.array([10, 25, 40])
+    rate = np.array([0.04, 0.06, 0.0])
+    savings = np.array([5_000, 50_000, 0])
+    pct = required_contribution_rate(1_000_000, salary, years, rate, savings)
+
+    final = future_value(savings, pct / 100 * salary, rate, years)
+    np.testing.assert_allclose(final, 1_000_000, rtol=1e-9)
+
+
+def test_required_contribution_rate_edge_cases():
+    pct = required_contribution_rate([100, 1_000], [50_000, 50_000], [10, 0], 0.05, [200, 0])
+    assert pct[0] == 0.0
+    assert np.isnan(pct[1])
+
+
+def test_required_years_matches_first_crossing():
+    for contribution, rate, start in [(5_000, 0.06, 0), (12_000, 0.0, 1_000), (3_000, 0.08, 40_000)]:
+        balances = loop_balances(start, contribution, rate, 200)
+        first = next(i + 1 for i, b in enumerate(balances) if b >= 500_000)
+        assert required_years(500_000, contribution, rate, start) == first
+
+    assert np.isnan(required_years(500_000, 0, 0.0, 1_000))
+    assert required_years(100, 0, 0.05, 1_000) == 0
+
+
+def test_member_required_contributions():
+    df = pd.DataFrame({
+        "User_ID": ["U1", "U2"],
+        "Age": [30, 50],
+        "Retirement_Age_Goal": [65, 60],
+        "Annual_Income": [80_000, 100_000],
+        "Current_Savings": [20_000, 300_000],
+        "Contribution_Amount": [8_000, 10_000],
+        "Annual_Return_Rate": [6.0, 5.0],
+    })
+    table = member_required_contributions(df, goal_amount=1_000_000)
+    assert table["User_ID"].tolist() == ["U1", "U2"]
+    final = future_value(df["Current_Savings"], table["Required_Contribution_Pct"] / 100 * df["Annual_Income"],
+                         df["Annual_Return_Rate"] / 100, df["Retirement_Age_Goal"] - df["Age"])
+    np.testing.assert_allclose(final, 1_000_000, rtol=1e-9)
@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from core import rationales
+from core.allocation import guess_current_allocation, recommend_allocation
+from core.rationales import (
+    RateLimiter,
+    RationaleStore,
+    build_jobs,
+    build_rationale_prompt,
+    run_batch,
+    select_cohort,
+)
+
+
+class FakeClient:
+    def __init__(self, fail_first=0):
+        self.prompts = []
+        self.fail_first = fail_first
+        self.lock = threading.Lock()
+
+    def generate(self, prompt, model=None):
+        with self.lock:
+            self.prompts.append(prompt)
+            if self.fail_first:
+                self.fail_first -= 1
+                raise ConnectionError("busy")
+        return f"rationale {len(prompt)}"
+
+
+@pytest.fixture
+def members():
+    return pd.DataFrame({
+        "User_ID": ["U1", "U2", "U3"],
+        "Age": [30, 58, 45],
+        "Risk_Tolerance": ["High", "Low", "Medium"],
+        "Pension_Type": ["Defined Benefit", "Defined Contribution", "Defined Contribution"],
+        "Withdrawal_Strategy": ["Dynamic", "Fixed", "Bucket"],
+        "Current_Savings": [10_000, 250_000, 90_000],
+        "Investment_Type": ["Stocks", "Bonds", "ETF"],
+        "Retirement_Age_Goal": [65, 62, 60],
+    })
+
+
+def test_batch_prompts_match_page_prompt(members):
+    jobs = list(build_jobs(members, "mistral"))
+    member = members.iloc[1]
+    expected = build_rationale_prompt(
+        member,
+        guess_current_allocation(member["Investment_Type"]),
+        recommend_allocation(member["Age"], member["Risk_Tolerance"], member["Pension_Type"],
+                             member["Withdrawal_Strategy"], member["Retirement_Age_Goal"]))
+    assert jobs[1][0] == "U2"
+    assert jobs[1][2] == expected
+
+
+def test_rerun_skips_unchanged_members(members, tmp_path):
+    store = RationaleStore(tmp_path / "r.db")
+    client = FakeClient()
+    assert run_batch(members, client, store, workers=2) == {"generated": 3, "skipped": 0, "failed": 0}
+    assert run_batch(members, client, store, workers=2) == {"generated": 0, "skipped": 3, "failed": 0}
+
+    members.loc[0, "Current_Savings"] = 20_000
+    assert run_batch(members, client, store, workers=2)["generated"] == 1
+    assert len(client.prompts) == 4
+    assert store.latest("U1").startswith("rationale")
+
+
+def test_transient_failures_are_retried(members, tmp_path):
+    store = RationaleStore(tmp_path / "r.db")
+    stats = run_batch(members, FakeClient(fail_first=2), store, workers=1, backoff=0.001)
+    assert stats == {"generated": 3, "skipped": 0, "failed": 0}
+
+
+def test_requests_in_flight_are_bounded(members, tmp_path, monkeypatch):
+    many = pd.concat([members] * 10, ignore_index=True).assign(User_ID=[f"U{i}" for i in range(30)])
+    pulled = []
+    jobs = rationales.build_jobs
+    monkeypatch.setattr(rationales, "build_jobs", lambda *a: (pulled.append(job) or job for job in jobs(*a)))
+    release = threading.Event()
+
+    class BlockingClient(FakeClient):
+        def generate(self, prompt, model=None):
+            release.wait(5)
+            return super().generate(prompt, model)
+
+    def run():
+        pulled.append(run_batch(many, BlockingClient(), RationaleStore(tmp_path / "r.db"), workers=2))
+
+    runner = threading.Thread(target=run)
+    runner.start()
+    time.sleep(0.2)
+    assert len(pulled) == 4       # 2 * workers prompts built while both workers are busy
+    release.set()
+    runner.join(5)
+    assert pulled[-1] == {"generated": 30, "skipped": 0, "failed": 0}
+
+
+def test_select_cohort_filters(members):
+    assert select_cohort(members, risk=["Low", "High"], min_age=40)["User_ID"].tolist() == ["U2"]
+    assert len(select_cohort(members, limit=2)) == 2
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(rate=50)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.09
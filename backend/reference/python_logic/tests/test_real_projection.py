@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.member_batch import run_sharded
+from core.projection import future_value
+from core.real_projection import (KERNEL_COLUMNS, periods_per_year, project_real, project_real_members,
+                                  real_annual_rate, real_balance_kernel)
+
+
+@pytest.fixture
+def book():
+    rng = np.random.default_rng(11)
+    n = 4000
+    return {
+        "savings": rng.integers(0, 500_000, n).astype(float),
+        "contribution": rng.integers(100, 2_000, n).astype(float),
+        "employer": rng.integers(0, 1_000, n).astype(float),
+        "periods": rng.choice([12, 4, 1], n),
+        "return_pct": rng.uniform(2, 12, n),
+        "fees_pct": rng.uniform(0.1, 2, n),
+        "years": rng.integers(0, 41, n).astype(float),
+    }
+
+
+def test_fisher_real_rate_after_fees():
+    assert real_annual_rate(0.06, 0.0, 0.02) == pytest.approx(1.06 / 1.02 - 1)
+    assert real_annual_rate(0.06, 0.01, 0.0) == pytest.approx(1.06 * 0.99 - 1)
+    assert real_annual_rate(0.02, 0.0, 0.02) == pytest.approx(0.0)
+
+
+def test_periods_per_year():
+    assert periods_per_year(["Monthly", "Quarterly", "Annually", None, "Weekly"]).tolist() == [12, 4, 1, 1, 1]
+
+
+def test_matches_closed_form_per_frequency(book):
+    final, snapshots = project_real(*book.values())
+    rate = real_annual_rate(book["return_pct"] / 100, book["fees_pct"] / 100)
+    p = book["periods"]
+    expected = future_value(book["savings"], (book["contribution"] + book["employer"]) / p, rate / p,
+                            book["years"] * p)
+    assert final.dtype == np.float32
+    np.testing.assert_allclose(final, expected, rtol=1e-4)
+    # Yearly snapshots end at the retirement balance and stay there
+    assert snapshots.shape == (len(final), int(book["years"].max()))
+    np.testing.assert_array_equal(snapshots[:, -1], final)
+    done = book["years"] > 0
+    np.testing.assert_array_equal(snapshots[done, book["years"][done].astype(int) - 1], final[done])
+    np.testing.assert_array_equal(final[~done], book["savings"][~done].astype(np.float32))
+
+
+def test_monthly_compounding_beats_annual():
+    args = dict(current_savings=[10_000, 10_000], contribution=[1_200, 1_200], employer_contribution=[0, 0],
+                periods=[12, 1], annual_return_pct=[7, 7], fees_pct=[0.5, 0.5], years=[30, 30])
+    final, _ = project_real(**args, record_every=0)
+    assert final[0] > final[1]
+
+
+def test_contributions_are_annual_amounts():
+    # No growth: every frequency pays in the same total, like the page's contribution rate assumes
+    final, _ = project_real([0, 0, 0], [1_200] * 3, [300] * 3, [12, 4, 1], [0, 0, 0], [0, 0, 0], [10, 10, 10],
+                            inflation_rate=0.0, record_every=0)
+    np.testing.assert_allclose(final, 15_000, rtol=1e-6)
+
+
+def test_member_frame_and_sharded_kernel(book):
+    frame = pd.DataFrame({
+        "Current_Savings": book["savings"], "Contribution_Amount": book["contribution"],
+        "Employer_Contribution": book["employer"],
+        "Contribution_Frequency": pd.Categorical(pd.Series(book["periods"]).map(
+            {12: "Monthly", 4: "Quarterly", 1: "Annually"})),
+        "Annual_Return_Rate": book["return_pct"], "Fees_Percentage": book["fees_pct"],
+        "Age": 60 - book["years"], "Retirement_Age_Goal": 60.0,
+    })
+    final, _ = project_real_members(frame, record_every=0)
+    direct, _ = project_real(*book.values(), record_every=0)
+    np.testing.assert_array_equal(final, direct)
+
+    inputs = np.stack([book[k] for k in book]).astype(float)
+    assert len(inputs) == len(KERNEL_COLUMNS)
+    sharded = run_sharded(inputs, kernel=real_balance_kernel, n_outputs=1, chunk_size=1000, max_workers=2,
+                          parallel_min_rows=0)
+    np.testing.assert_array_equal(sharded[0], direct)
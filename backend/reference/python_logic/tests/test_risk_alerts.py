@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import risk_alerts
+from core.risk_alerts import alert_queue, depletion_path, depletion_years, export_alerts, scan_members
+
+
+def loop_projection(current_savings, annual_withdrawal, years=30):
+    # The year-by-year loop from personalised_risk_alert.py
+    balance = current_savings
+    balances = []
+    for _ in range(years):
+        balance = balance - annual_withdrawal
+        balances.append(balance if balance > 0 else 0)
+        if balance <= 0:
+            break
+    return balances
+
+
+def members(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    savings = rng.integers(-1000, 2_000_000, n).astype(float)
+    expenses = rng.integers(0, 20_000, n).astype(float)
+    # exact multiples, zero expenses and empty balances are the edge cases
+    savings[:50] = expenses[:50] * 12 * rng.integers(1, 40, 50)
+    expenses[50:60] = 0
+    savings[60:70] = 0
+    return pd.DataFrame({"User_ID": [f"U{i}" for i in range(n)], "Age": rng.integers(25, 70, n),
+                         "Current_Savings": savings, "Monthly_Expenses": expenses})
+
+
+def test_depletion_matches_loop():
+    df = members()
+    withdrawal = df["Monthly_Expenses"].to_numpy() * 12
+    expected = [len(loop_projection(s, w)) for s, w in zip(df["Current_Savings"], withdrawal)]
+    np.testing.assert_array_equal(depletion_years(df["Current_Savings"].to_numpy(), withdrawal), expected)
+    for s, w in zip(df["Current_Savings"][:100], withdrawal[:100]):
+        np.testing.assert_allclose(depletion_path(s, w), loop_projection(s, w))
+
+
+def test_status_buckets_match_page():
+    df = members()
+    scan = scan_members(df)
+    for rate, status in zip(scan["Withdrawal_Rate"], scan["Status"]):
+        expected = "Safe" if rate <= 0.04 else "Caution" if rate <= 0.06 else "Risky"
+        assert status == expected
+    assert (scan.loc[df["Current_Savings"] <= 0, "Withdrawal_Rate"] == 0).all()
+
+
+def test_alert_queue_is_prioritized():
+    queue = alert_queue(scan_members(members()), min_rate=0.06)
+    assert (queue["Withdrawal_Rate"] > 0.06).all()
+    assert list(queue["Priority"]) == list(range(1, len(queue) + 1))
+    order = list(zip(-queue["Status"].cat.codes, queue["Years_To_Depletion"], -queue["Withdrawal_Rate"]))
+    assert order == sorted(order)
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_export_round_trip(tmp_path, suffix):
+    if suffix == ".parquet" and not risk_alerts.pyarrow_ok:
+        pytest.skip("pyarrow not installed")
+    queue = alert_queue(scan_members(members(200)))
+    path = export_alerts(queue, tmp_path / f"alerts{suffix}")
+    back = pd.read_csv(path) if suffix == ".csv" else pd.read_parquet(path)
+    assert list(back["User_ID"]) == list(queue["User_ID"])
+    assert list(back["Status"]) == list(queue["Status"].astype(str))
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.scenario_grid import (CONTRIBUTION_RATES, DEFAULT_CONTRIBUTION_RATE, RETIREMENT_AGES, SCENARIOS,
+                                 ScenarioGrid, member_grid)
+from core.projection import MARKET_RETURNS
+
+
+def loop_final_balance(savings, salary, age, contribution_rate, retirement_age, scenario, inflation):
+    # simulate_growth from what_if_simulator_modified.py, before the closed form
+    r = MARKET_RETURNS.get(scenario, 0.08) - (0.02 if inflation else 0.0)
+    balance = savings
+    for _ in range(retirement_age - age):
+        balance = balance * (1 + r) + contribution_rate / 100 * salary
+    return balance
+
+
+def test_grid_matches_yearly_loop():
+    grid = ScenarioGrid(current_savings=120_000, salary=85_000, current_age=41)
+    assert grid.values.shape == (3, 2, len(RETIREMENT_AGES), len(CONTRIBUTION_RATES))
+    for scenario in SCENARIOS:
+        for inflation in (False, True):
+            for age in (50, 63, 75):
+                for rate in (0, 7, 50):
+                    expected = loop_final_balance(120_000, 85_000, 41, rate, age, scenario, inflation)
+                    assert grid.final_balance(age, rate, scenario, inflation) == pytest.approx(expected, rel=1e-12)
+
+
+def test_off_grid_lookup_uses_closed_form():
+    grid = ScenarioGrid(50_000, 60_000, 30)
+    expected = loop_final_balance(50_000, 60_000, 30, 7.25, 67, "Moderate", True)
+    assert grid.final_balance(67, 7.25, "Moderate", True) == pytest.approx(expected, rel=1e-12)
+    # Already past the retirement age: savings stay as they are
+    assert ScenarioGrid(50_000, 60_000, 70).final_balance(55, 10, "Aggressive", False) == 50_000
+
+
+def test_heatmap_and_member_cache():
+    member = pd.Series({"Current_Savings": 80_000, "Annual_Income": 70_000, "Age": 35})
+    grid = member_grid(member)
+    assert member_grid(member.copy()) is grid
+    table = grid.heatmap("Conservative", False)
+    assert list(table.index) == list(RETIREMENT_AGES) and list(table.columns) == list(CONTRIBUTION_RATES)
+    # More years and more contributions never shrink the balance
+    assert (np.diff(table.values, axis=0) >= 0).all() and (np.diff(table.values, axis=1) >= 0).all()
+    with pytest.raises(ValueError):
+        grid.values[0, 0, 0, 0] = 1.0
+
+
+def test_nearest_rate_clamps_and_defaults():
+    grid = ScenarioGrid(50_000, 60_000, 30)
+    assert grid.nearest_rate(7.4) == 7
+    assert grid.nearest_rate(80) == 50 and grid.nearest_rate(-3) == 0
+    assert grid.nearest_rate(float("nan")) == grid.nearest_rate(float("inf")) == DEFAULT_CONTRIBUTION_RATE
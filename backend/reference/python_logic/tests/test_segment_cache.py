@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from core.instrumentation import start_run
+from core.segment_cache import SegmentationCache, segmentation_key
+from core.segmentation import FEATURE_COLUMNS, segment_members
+
+
+def test_key_normalizes_inputs():
+    a = segmentation_key("v1", (30, 60), (1e4, 2e5), ["High", "Low"], 4)
+    assert a == segmentation_key("v1", [30.0, 60.0], (10000, 200000), ["Low", "High"], 4)
+    assert a != segmentation_key("v2", (30, 60), (1e4, 2e5), ["High", "Low"], 4)
+    assert a != segmentation_key("v1", (30, 60), (1e4, 2e5), ["High", "Low"], 5)
+
+
+def test_lru_eviction_and_counters():
+    cache = SegmentationCache(max_entries=2)
+    calls = []
+    compute = lambda v: (lambda: calls.append(v) or v)
+    cache.get_or_compute("a", compute(1))
+    cache.get_or_compute("b", compute(2))
+    cache.get_or_compute("a", compute(1))
+    cache.get_or_compute("c", compute(3))
+    cache.get_or_compute("b", compute(2))
+    assert calls == [1, 2, 3, 2]
+    assert cache.stats == {"hits": 1, "disk_hits": 0, "misses": 4, "entries": 2}
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    SegmentationCache(disk_dir=tmp_path).put("k", {"labels": np.arange(3)})
+    fresh = SegmentationCache(disk_dir=tmp_path)
+    np.testing.assert_array_equal(fresh.get("k")["labels"], np.arange(3))
+    assert fresh.get("k") is not None
+    assert fresh.stats["disk_hits"] == 1 and fresh.stats["hits"] == 1
+
+
+def test_segment_members_profile():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Age": rng.integers(20, 70, 300),
+        "Annual_Income": rng.uniform(2e4, 2e5, 300),
+        "Current_Savings": rng.uniform(0, 5e5, 300),
+        "Risk_Tolerance": rng.choice(["Low", "Medium", "High"], 300),
+    })
+    df["Risk_Tolerance_Num"] = df["Risk_Tolerance"].map({"Low": 1, "Medium": 2, "High": 3}).astype(float)
+
+    result = segment_members(df, (30, 60), (0, 1e6), ["Low", "High"], 3)
+    data = df.loc[result["index"]]
+    assert data["Age"].between(30, 60).all() and set(data["Risk_Tolerance"]) <= {"Low", "High"}
+    expected = data.assign(Cluster=result["labels"]).groupby("Cluster")[FEATURE_COLUMNS].mean().round(2)
+    pd.testing.assert_frame_equal(result["profile"].xs("mean", axis=1, level=1), expected, check_names=False)
+    assert result["profile"]["count"].sum() == len(data)
+
+
+def test_slider_nudge_warm_starts_from_the_anchor():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        "Age": rng.integers(20, 70, 3000),
+        "Annual_Income": rng.uniform(2e4, 2e5, 3000),
+        "Current_Savings": rng.uniform(0, 5e5, 3000),
+        "Risk_Tolerance": rng.choice(["Low", "Medium", "High"], 3000),
+    })
+    df["Risk_Tolerance_Num"] = df["Risk_Tolerance"].map({"Low": 1, "Medium": 2, "High": 3}).astype(float)
+    full = ((20, 69), (2e4, 2e5), ["Low", "Medium", "High"])
+    nudged = ((22, 69), (2e4, 2e5), ["Low", "Medium", "High"])
+
+    def lookup(cache, filters):
+        return cache.get_warm_started(
+            segmentation_key("v1", *filters, 4), segmentation_key("v1", *full, 4),
+            lambda init: segment_members(df, *filters, 4, init_centroids_raw=init),
+            lambda: segment_members(df, *full, 4))
+
+    records = start_run("test")
+    result = lookup(SegmentationCache(), nudged)
+    fits = [r for r in records if r["stage"] == "kmeans_fit"]
+    assert [f["warmStart"] for f in fits] == [False, True]     # anchor cold, nudge warm
+
+    # Same key, same labels, whatever the cache saw before
+    other = SegmentationCache()
+    lookup(other, ((40, 50), (2e4, 2e5), ["Low"]))
+    np.testing.assert_array_equal(lookup(other, nudged)["labels"], result["labels"])
@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.segment_labels import DEFAULT_RULES, label_members, label_profiles, load_rules
+from core.segmentation import FEATURE_COLUMNS, cluster_profile
+
+
+def label_cluster(row, data):
+    # The if-chain the segmentation page used before the rule engine
+    inc = row[("Annual_Income", "mean")]
+    sav = row[("Current_Savings", "mean")]
+    risk = row[("Risk_Tolerance_Num", "mean")]
+    if sav >= data["Current_Savings"].median() and inc >= data["Annual_Income"].median():
+        return "High Capacity Savers"
+    if sav < data["Current_Savings"].median() and inc >= data["Annual_Income"].median():
+        return "High Income, Low Savings"
+    if risk >= 2.5 and sav < data["Current_Savings"].median():
+        return "Aggressive & Underfunded"
+    if risk <= 1.5 and sav >= data["Current_Savings"].median():
+        return "Conservative & Funded"
+    return "Balanced"
+
+
+def members(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Age": rng.integers(22, 70, n).astype(float),
+        "Annual_Income": rng.lognormal(11, 0.5, n).round(),
+        "Current_Savings": rng.lognormal(11.5, 0.8, n).round(),
+        "Risk_Tolerance_Num": rng.integers(1, 4, n).astype(float),
+    })
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_profile_labels_match_if_chain(seed):
+    data = members(seed=seed)
+    labels = np.random.default_rng(seed).integers(0, 8, len(data))
+    profile = cluster_profile(data, labels, FEATURE_COLUMNS)
+    expected = {int(c): label_cluster(profile.loc[c], data) for c in profile.index}
+    assert label_profiles(profile, data) == expected
+
+
+def test_member_labels_match_if_chain():
+    data = members()
+    rows = data.rename(columns=lambda c: (c, "mean"))
+    expected = [label_cluster(row, data) for _, row in rows.iterrows()]
+    assert list(label_members(data)) == expected
+
+
+def test_custom_rules_from_json(tmp_path):
+    rules = [{"label": "Near Retirement", "when": [["Age", ">=", 60]]}] + DEFAULT_RULES
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(rules))
+    data = members()
+    labels = label_members(data, rules=load_rules(path))
+    assert (labels[data["Age"].to_numpy() >= 60] == "Near Retirement").all()
+    assert "Near Retirement" not in labels[data["Age"].to_numpy() < 60]
+
+
+def test_load_rules_rejects_unknown_statistic(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([{"label": "X", "when": [["Age", ">=", "p99"]]}]))
+    with pytest.raises(ValueError):
+        load_rules(path)
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from core import segmentation
+from core.segmentation import (
+    StreamingKMeans,
+    assign_labels,
+    fit_segments,
+    squared_distances,
+    standardize,
+)
+
+CENTERS = np.array([[-5.0, -5.0, 0.0], [0.0, 5.0, 5.0], [5.0, -5.0, -5.0]])
+
+
+def blobs(n_per=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.concatenate([c + rng.normal(0, 0.5, size=(n_per, 3)) for c in CENTERS])
+    return X, np.repeat(np.arange(len(CENTERS)), n_per)
+
+
+def same_partition(a, b):
+    # Labels may be permuted between runs; compare the co-membership structure
+    pairs = {(x, y) for x, y in zip(a, b)}
+    return len(pairs) == len(set(a)) == len(set(b))
+
+
+def test_squared_distances_match_broadcast():
+    rng = np.random.default_rng(1)
+    X, C = rng.normal(size=(50, 4)), rng.normal(size=(3, 4))
+    expected = ((X[:, None, :] - C[None, :, :]) ** 2).sum(axis=2)
+    np.testing.assert_allclose(squared_distances(X, C), expected, atol=1e-10)
+
+
+def test_assign_labels_is_chunk_size_independent():
+    X, _ = blobs()
+    whole = assign_labels(X, CENTERS, chunk_size=len(X))
+    chunked = assign_labels(X, CENTERS, chunk_size=7)
+    np.testing.assert_array_equal(whole[0], chunked[0])
+    np.testing.assert_allclose(whole[1], chunked[1])
+
+
+@pytest.mark.parametrize("use_sklearn", [True, False])
+@pytest.mark.parametrize("threshold", [10**9, 100])
+def test_fit_segments_recovers_blobs(monkeypatch, use_sklearn, threshold):
+    if use_sklearn and not segmentation.sklearn_ok:
+        pytest.skip("scikit-learn not installed")
+    monkeypatch.setattr(segmentation, "sklearn_ok", use_sklearn)
+    X, truth = blobs()
+    result = fit_segments(X, 3, minibatch_threshold=threshold, batch_size=256)
+    assert same_partition(result["labels"], truth)
+    assert result["centroids"].shape == (3, 3)
+
+
+@pytest.mark.parametrize("use_sklearn", [True, False])
+def test_warm_start_keeps_label_order(monkeypatch, use_sklearn):
+    if use_sklearn and not segmentation.sklearn_ok:
+        pytest.skip("scikit-learn not installed")
+    monkeypatch.setattr(segmentation, "sklearn_ok", use_sklearn)
+    X, truth = blobs()
+    result = fit_segments(X, 3, init_centroids=CENTERS)
+    np.testing.assert_array_equal(result["labels"], truth)
+
+
+def test_streaming_kmeans_over_chunks():
+    X, truth = blobs(seed=3)
+    order = np.random.default_rng(0).permutation(len(X))
+    X, truth = X[order], truth[order]
+    model = StreamingKMeans(3, seed=0).fit(lambda: (X[i:i + 100] for i in range(0, len(X), 100)), n_epochs=3)
+    assert same_partition(model.predict(X), truth)
+
+
+def test_standardize_reuses_fitted_scaler():
+    X, _ = blobs()
+    Z, mean, scale = standardize(X)
+    np.testing.assert_allclose(Z.mean(axis=0), 0, atol=1e-12)
+    np.testing.assert_allclose(standardize(X[:10], mean, scale)[0], Z[:10])
@@ -0,0 +1,143 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.member_db import MemberDB
+from core.segmentation import FEATURE_COLUMNS, MEMBER_COLUMNS, prepare_members, standardize
+from core.similar_members import MemberIndex, sync_index
+
+
+def members(n=500, seed=0, start=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "User_ID": [f"U{i}" for i in range(start, start + n)],
+        "Age": rng.integers(22, 70, n),
+        "Annual_Income": rng.uniform(20_000, 200_000, n),
+        "Current_Savings": rng.uniform(0, 500_000, n),
+        "Risk_Tolerance": rng.choice(["Low", "Medium", "High"], n),
+        "Years_Contributed": rng.integers(0, 40, n),
+    })
+
+
+def brute_force(df, user_id, k, columns=FEATURE_COLUMNS):
+    data = prepare_members(df)
+    X, _, _ = standardize(data[columns].values)
+    row = int(np.flatnonzero(data["User_ID"] == user_id)[0])
+    d = np.sqrt(((X - X[row]) ** 2).sum(axis=1))
+    d[row] = np.inf
+    order = np.argsort(d, kind="stable")[:k]
+    return data["User_ID"].to_numpy()[order].tolist(), d[order]
+
+
+def test_query_matches_brute_force_across_blocks():
+    df = members()
+    index = MemberIndex.build(df)
+    expected_ids, expected_d = brute_force(df, "U7", 10)
+    for block_size in (10_000, 64, 7):
+        result = index.nearest(index.X[index.rows["U7"]], 10, exclude=index.rows["U7"], block_size=block_size)
+        np.testing.assert_allclose(result[1], expected_d, rtol=1e-4)
+        assert index.ids[result[0]].tolist() == expected_ids
+    similar = index.query("U7", k=10)
+    assert similar["User_ID"].tolist() == expected_ids
+    assert "U7" not in similar["User_ID"].tolist()
+    # Features come back in raw units
+    np.testing.assert_allclose(similar["Age"], df.set_index("User_ID").loc[expected_ids, "Age"], rtol=1e-4)
+
+
+def test_extra_columns_change_the_neighbourhood():
+    df = members()
+    base = MemberIndex.build(df)
+    extra = MemberIndex.build(df, extra_columns=["Years_Contributed"])
+    assert extra.columns == FEATURE_COLUMNS + ["Years_Contributed"]
+    assert extra.query("U3")["User_ID"].tolist() == brute_force(df, "U3", 10, extra.columns)[0]
+    assert extra.query("U3")["User_ID"].tolist() != base.query("U3")["User_ID"].tolist()
+
+
+def test_incremental_inserts_use_the_stored_scaler():
+    df = members()
+    index = MemberIndex.build(df, version="v1")
+    mean = index.mean.copy()
+    twin = df.iloc[[42]].assign(User_ID="NEW1")
+    assert index.add(pd.concat([twin, members(2000, seed=1, start=1000)])) == 2001
+    np.testing.assert_array_equal(index.mean, mean)
+    assert len(index) == 2501 and len(index.X) >= 2501
+    first = index.query("U42", k=1).iloc[0]
+    assert first["User_ID"] == "NEW1" and first["Distance"] == pytest.approx(0, abs=1e-5)
+
+    # Re-adding an existing member updates their row in place
+    moved = twin.assign(Age=twin["Age"] + 30)
+    assert index.add(moved) == 0
+    assert len(index) == 2501
+    assert index.query("NEW1", k=1)["Age"].iloc[0] != twin["Age"].iloc[0]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    df = members()
+    index = MemberIndex.build(df, extra_columns=["Years_Contributed"], version="abc")
+    path = tmp_path / "index.npz"
+    index.save(path)
+    loaded = MemberIndex.load(path)
+    assert loaded.version == "abc" and loaded.columns == index.columns and len(loaded) == len(index)
+    pd.testing.assert_frame_equal(loaded.query("U11"), index.query("U11"))
+    loaded.add(members(5, seed=3, start=900))
+    assert "U904" in loaded
+
+
+def test_unknown_member_raises():
+    index = MemberIndex.build(members(20))
+    with pytest.raises(KeyError):
+        index.query("nobody")
+
+
+def test_remove_moves_the_last_member_into_the_gap():
+    df = members(50)
+    index = MemberIndex.build(df)
+    assert index.remove(["U3", "U49", "nobody"]) == 2
+    assert len(index) == 48 and "U3" not in index and "U49" not in index
+    fresh = MemberIndex(index.columns, index.mean, index.scale)
+    fresh.add(df[~df["User_ID"].isin(["U3", "U49"])])
+    pd.testing.assert_frame_equal(index.query("U10", k=5), fresh.query("U10", k=5))
+
+
+def test_sync_index_rereads_only_changed_rows(tmp_path):
+    df = members(300)
+    path = tmp_path / "pension.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE pension_data (id INTEGER PRIMARY KEY, user_id TEXT, age INTEGER, annual_income REAL, "
+                 "current_savings REAL, risk_tolerance TEXT, updated_at TEXT)")
+    conn.executemany("INSERT INTO pension_data (user_id, age, annual_income, current_savings, risk_tolerance, "
+                     "updated_at) VALUES (?, ?, ?, ?, ?, '2025-01-01 00:00:00')",
+                     df[MEMBER_COLUMNS].itertuples(index=False, name=None))
+    conn.execute("UPDATE pension_data SET updated_at = '2025-01-02 00:00:00' WHERE user_id = 'U0'")
+    conn.commit()
+    db = MemberDB(path, wal=False)
+    index = sync_index(db, MEMBER_COLUMNS, "v1")
+    assert index.watermark == "2025-01-02 00:00:00" and len(index) == 300
+    mean = index.mean.copy()
+
+    with conn:
+        conn.execute("UPDATE pension_data SET age = age + 20, updated_at = '2025-02-01 00:00:00' "
+                     "WHERE user_id = 'U7'")
+        conn.execute("UPDATE pension_data SET current_savings = NULL, updated_at = '2025-02-01 00:00:00' "
+                     "WHERE user_id = 'U8'")
+        conn.execute("DELETE FROM pension_data WHERE user_id = 'U9'")
+        conn.execute("INSERT INTO pension_data (user_id, age, annual_income, current_savings, risk_tolerance) "
+                     "VALUES ('NEW', 40, 80000, 90000, 'Low')")
+    conn.close()
+    fetched, fetch_frame = [], db.fetch_frame
+
+    def counting_fetch(columns, filters=None):
+        rows = fetch_frame(columns, filters)
+        fetched.append(len(rows))
+        return rows
+
+    db.fetch_frame = counting_fetch
+    synced = sync_index(db, MEMBER_COLUMNS, "v2", index)
+    # U0 from the watermark's own second, U7 and U8 since, NEW without an updated_at
+    assert sum(fetched) == 4
+    assert synced.version == "v2" and synced.watermark == "2025-02-01 00:00:00"
+    np.testing.assert_array_equal(synced.mean, mean)
+    assert "NEW" in synced and "U8" not in synced and "U9" not in synced and len(synced) == 299
+    assert synced.query("U6", k=300).set_index("User_ID").loc["U7", "Age"] == pytest.approx(df.loc[7, "Age"] + 20)
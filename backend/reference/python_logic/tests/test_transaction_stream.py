@@ -0,0 +1,116 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from core.transaction_stream import MemberStateStore, ascore_stream, queue_events, score_stream, tail_events
+
+
+def event(i, user="U1", amount=1000, time_of_day=0.40, channel="Online", ip="10.0.0.1", device="d1",
+          geo="London", previous="0.0"):
+    return {"id": i, "user_id": user, "transaction_amount": amount, "time_of_transaction": time_of_day,
+            "transaction_channel": channel, "ip_address": ip, "device_id": device, "geo_location": geo,
+            "previous_fraud_flag": previous}
+
+
+ROUTINE = [event(1, amount=1000), event(2, amount=1100, time_of_day=0.42), event(3, amount=900, time_of_day=0.41),
+           event(4, amount=1050, time_of_day=0.39), event(5, user="U2", amount=500)]
+OUTLIER = event(6, amount=9000, time_of_day=0.12, channel="ATM", ip="172.16.0.9", device="d9", geo="Lagos")
+
+
+def write_events(path, events):
+    with open(path, "a") as f:
+        for e in events:
+            f.write(json.dumps(e) + "\n")
+
+
+def test_running_stats_match_numpy():
+    store = MemberStateStore(alpha=0.5)
+    for e in ROUTINE:
+        store.observe(e)
+    amounts = np.array([1000, 1100, 900, 1050])
+    state = store.member("U1")
+    assert state["count"] == 4
+    assert state["mean"] == pytest.approx(amounts.mean())
+    assert state["m2"] / 3 == pytest.approx(amounts.var(ddof=1))
+    assert state["ewma"] == pytest.approx(((1000 * 0.5 + 1100 * 0.5) * 0.5 + 900 * 0.5) * 0.5 + 1050 * 0.5)
+    assert len(store) == 2 and store.events == 5
+
+
+def test_outlier_is_flagged_against_prior_state():
+    store = MemberStateStore()
+    verdicts = [store.observe(e) for e in ROUTINE + [OUTLIER]]
+    assert not any(v.flagged for v in verdicts[:-1])
+    last = verdicts[-1]
+    assert last.flagged and last.amount_z > 10
+    assert last.new_device and last.new_ip and last.new_geo
+    assert last.amount_ewma == pytest.approx(store.member("U1")["ewma"] - 0.2 * (9000 - last.amount_ewma))
+    # First sighting of a member has no "last device" to differ from
+    assert not verdicts[4].new_device
+
+
+def test_slots_grow_past_capacity():
+    store = MemberStateStore(capacity=2)
+    for i in range(5):
+        store.observe(event(i, user=f"U{i}", amount=100 * (i + 1)))
+    assert len(store.state["count"]) == 8
+    assert store.member("U4")["mean"] == 500
+
+
+def test_tail_events_skips_partial_line(tmp_path):
+    path = tmp_path / "events.jsonl"
+    write_events(path, ROUTINE[:2])
+    with open(path, "a") as f:
+        f.write('{"id": 3, "user_')
+    read = list(tail_events(path))
+    assert [e["id"] for _, e in read] == [1, 2]
+    offset = read[-1][0]
+    with open(path, "a") as f:
+        f.write('id": "U1"}\n')
+    assert [e["id"] for _, e in tail_events(path, offset)] == [3]
+
+
+def test_checkpoint_resumes_where_it_stopped(tmp_path):
+    path, checkpoint = tmp_path / "events.jsonl", tmp_path / "state.npz"
+    write_events(path, ROUTINE)
+    store = MemberStateStore()
+    list(score_stream(tail_events(path), store, checkpoint, checkpoint_every=2))
+
+    write_events(path, [OUTLIER])
+    resumed = MemberStateStore.load(checkpoint)
+    assert resumed.offset == path.stat().st_size - len(json.dumps(OUTLIER)) - 1
+    verdicts = list(score_stream(tail_events(path, resumed.offset), resumed))
+    assert [v.event_id for v in verdicts] == [6]
+
+    straight = MemberStateStore()
+    expected = [straight.observe(e) for e in ROUTINE + [OUTLIER]][-1]
+    assert verdicts[0] == expected
+    assert resumed.member("U1") == straight.member("U1")
+
+
+def test_async_queue_source():
+    async def run():
+        queue = asyncio.Queue()
+        for e in ROUTINE + [OUTLIER, None]:
+            queue.put_nowait(e)
+        return [v async for v in ascore_stream(queue_events(queue), MemberStateStore())]
+
+    verdicts = asyncio.run(run())
+    assert [v.flagged for v in verdicts] == [False] * 5 + [True]
+
+
+def test_malformed_line_is_skipped_and_checkpointed_past(tmp_path, caplog):
+    path, checkpoint = tmp_path / "events.jsonl", tmp_path / "state.npz"
+    write_events(path, ROUTINE[:2])
+    bad_at = path.stat().st_size
+    with open(path, "a") as f:
+        f.write('{"id": 3, oops}\n')
+    verdicts = list(score_stream(tail_events(path), MemberStateStore(), checkpoint))
+    assert [v.event_id for v in verdicts] == [1, 2]
+    assert f"byte {bad_at}" in caplog.text
+    # Restarting from the checkpoint starts after the bad line
+    resumed = MemberStateStore.load(checkpoint)
+    assert resumed.offset == path.stat().st_size
+    write_events(path, [ROUTINE[2]])
+    assert [v.event_id for v in score_stream(tail_events(path, resumed.offset), resumed)] == [3]
@@ -0,0 +1,62 @@
+import json
+import logging
+import time
+from pathlib import Path
+
+import pytest
+
+from core.whatif_parser import CONFIDENCE_THRESHOLD, parse_whatif, resolve_whatif
+
+CORPUS = [json.loads(line) for line in
+          (Path(__file__).parent / "data" / "whatif_corpus.jsonl").read_text().splitlines() if line.strip()]
+# Every corpus question is asked of a member retiring at 60 and contributing 10%
+CURRENT_AGE, CURRENT_RATE = 60, 10.0
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=[c["question"] for c in CORPUS])
+def test_corpus(case):
+    result = parse_whatif(case["question"], CURRENT_AGE, CURRENT_RATE)
+    if case.get("expect") == "llm":
+        assert result.confidence < CONFIDENCE_THRESHOLD
+    else:
+        assert result.confidence >= CONFIDENCE_THRESHOLD
+        assert (result.retirement_age, result.contribution_rate) == (case["retirement_age"],
+                                                                     case["contribution_rate"])
+
+
+def test_corpus_coverage_and_latency():
+    local = [c for c in CORPUS if c.get("expect") != "llm"]
+    assert len(local) / len(CORPUS) >= 0.75
+    start = time.perf_counter()
+    for _ in range(20):
+        for case in CORPUS:
+            parse_whatif(case["question"], CURRENT_AGE, CURRENT_RATE)
+    per_question = (time.perf_counter() - start) / (20 * len(CORPUS))
+    # Microseconds in practice; the bound only guards against pathological regexes
+    assert per_question < 1e-3
+
+
+def test_relative_phrasing_needs_current_values():
+    assert not parse_whatif("retire 5 years earlier").found
+    assert parse_whatif("retire 5 years earlier", current_retirement_age=65).retirement_age == 60
+
+
+def test_resolve_only_calls_llm_when_unsure(caplog):
+    calls = []
+
+    def llm(prompt):
+        calls.append(prompt)
+        return "retirement_age=58"
+
+    with caplog.at_level(logging.INFO, logger="core.whatif_parser"):
+        local = resolve_whatif("What if I retire at 55?", CURRENT_AGE, CURRENT_RATE, llm=llm)
+        remote = resolve_whatif("What about 58?", CURRENT_AGE, CURRENT_RATE, llm=llm)
+    assert (local.source, local.retirement_age) == ("local", 55)
+    assert (remote.source, remote.retirement_age) == ("llm", 58)
+    assert len(calls) == 1 and "What about 58?" in calls[0]
+    assert [r.getMessage().split()[3] for r in caplog.records] == ["local", "llm"]
+
+
+def test_unusable_llm_reply_keeps_local_guess():
+    result = resolve_whatif("What about 58?", CURRENT_AGE, CURRENT_RATE, llm=lambda prompt: "I can't say.")
+    assert (result.source, result.retirement_age) == ("local-fallback", 58)
@@ -1,37 +1,33 @@
 # what_if_simulator_user1.py
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
-import requests
-import re
 
-st.set_page_config(page_title="What-If Simulator (User 1)", layout="centered")
-st.title("🔮 What-If Retirement Simulator (User 1)")
+from core.instrumentation import debug_enabled, panel_rows, stage, start_run
+from core.llm_client import ask_ollama
+from core.member_store import load_members
+from core.monte_carlo import member_return_params, simulate_paths
+from core.projection import INFLATION_RATE, market_rate, simulate_growth as project_growth
+from core.real_projection import MEMBER_COLUMNS as REAL_COLUMNS, project_real_members
+from core.scenario_grid import member_grid
+from core.whatif_parser import resolve_whatif
 
-# -----------------------------
-# Helper: Call Ollama API
-# -----------------------------
-def ask_ollama(prompt: str) -> str:
-    try:
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={"model": "mistral", "prompt": prompt, "stream": False},
-            timeout=120
-        )
-        response.raise_for_status()
-        return response.json().get("response", "⚠️ No response from Ollama.")
-    except Exception as e:
-        return f"⚠️ Ollama error: {str(e)}"
+st.set_page_config(page_title="What-If Simulator", layout="centered")
+st.title("🔮 What-If Retirement Simulator")
+timings = start_run("what_if_simulator")
 
 # -----------------------------
-# Load data & pick first user
+# Load data & pick a member (first user by default)
 # -----------------------------
 @st.cache_data
 def load_data():
-    return pd.read_excel("Copy of Usecase 5(1).xlsx", sheet_name="Usecase 5 data")
+    return load_members(columns=["User_ID", "Age", "Annual_Income", "Current_Savings",
+                                 "Contribution_Amount", "Retirement_Age_Goal",
+                                 "Annual_Return_Rate", "Volatility", "Employer_Contribution",
+                                 "Contribution_Frequency", "Fees_Percentage"])
 
 df = load_data()
-member = df.iloc[0]   # <-- first user in dataset
+user_id = st.selectbox("Member", df["User_ID"], index=0)
+member = df.loc[df["User_ID"] == user_id].iloc[0]
 
 st.subheader("👤 Selected User")
 st.write(member[["User_ID", "Age", "Annual_Income", "Current_Savings", 
@@ -51,29 +47,85 @@ inflation_adjusted = st.checkbox("Adjust for Inflation (2%)", value=True)
 # -----------------------------
 # Simulation function
 # -----------------------------
-def simulate_growth(contribution_rate, retirement_age, market_scenario, inflation):
-    years_to_retirement = retirement_age - current_age
-    yearly_contribution = (contribution_rate / 100) * salary
-    
-    if market_scenario == "Conservative":
-        r = 0.04
-    elif market_scenario == "Moderate":
-        r = 0.06
-    else:
-        r = 0.08
-
-    if inflation:
-        r -= 0.02
-
-    balance = member["Current_Savings"]
-    balances = []
-    for _ in range(years_to_retirement):
-        balance = balance * (1 + r) + yearly_contribution
-        balances.append(balance)
-    return balances
+def simulate_growth(member, contribution_rate, retirement_age, market_scenario, inflation):
+    # Closed-form annuity values; identical to the year-by-year loop
+    return project_growth(member["Current_Savings"], member["Annual_Income"], contribution_rate,
+                          market_rate(market_scenario, inflation), retirement_age - member["Age"])
 
 # Baseline projection
-baseline_balances = simulate_growth(contribution_rate, retirement_age, market_scenario, inflation_adjusted)
+baseline_balances = simulate_growth(member, contribution_rate, retirement_age, market_scenario, inflation_adjusted)
+
+# -----------------------------
+# Monte Carlo range (member's own return & volatility)
+# -----------------------------
+with st.expander("🎲 Monte Carlo Range (member return & volatility)"):
+    mean_return, volatility = member_return_params(member)
+    if inflation_adjusted:
+        mean_return -= INFLATION_RATE
+    with stage("monte_carlo", rows=10_000):
+        mc = simulate_paths(member["Current_Savings"], (contribution_rate / 100) * salary,
+                            retirement_age - current_age, mean_return, volatility,
+                            n_paths=10_000, seed=42)
+    fig_mc, ax_mc = plt.subplots()
+    ax_mc.fill_between(mc["years"], mc["p5"], mc["p95"], alpha=0.2, label="P5–P95")
+    ax_mc.plot(mc["years"], mc["p50"], label="Median")
+    ax_mc.plot(range(1, len(baseline_balances) + 1), baseline_balances, linestyle="--",
+               label=f"Deterministic ({market_scenario})")
+    ax_mc.set_xlabel("Years to Retirement")
+    ax_mc.set_ylabel("Projected Savings ($)")
+    ax_mc.set_title(f"Range of Outcomes (return {mean_return:.2%}, volatility {volatility:.2%})")
+    ax_mc.legend()
+    st.pyplot(fig_mc)
+
+# -----------------------------
+# Real-terms projection from the member's own return, fees and contributions
+# -----------------------------
+with st.expander("🧾 Real-Terms Projection (member return, fees, employer match)"):
+    real_final, real_path = project_real_members(df.loc[df["User_ID"] == user_id, REAL_COLUMNS])
+    st.metric("Projected savings in today's money", f"${float(real_final[0]):,.0f}",
+              delta=f"{float(real_final[0]) - baseline_balances[-1]:,.0f} vs. {market_scenario} scenario"
+              if len(baseline_balances) else None)
+    st.caption(f"{member['Annual_Return_Rate']:.2f}% return less {member['Fees_Percentage']:.2f}% fees and "
+               f"{INFLATION_RATE:.0%} inflation; ${member['Contribution_Amount']:,.0f} a year plus "
+               f"${member['Employer_Contribution']:,.0f} from the employer, paid {member['Contribution_Frequency']}.")
+    if real_path.shape[1]:
+        fig_real, ax_real = plt.subplots()
+        ax_real.plot(range(1, real_path.shape[1] + 1), real_path[0], label="Real terms (member inputs)")
+        ax_real.plot(range(1, len(baseline_balances) + 1), baseline_balances, linestyle="--",
+                     label=f"Scenario ({market_scenario})")
+        ax_real.set_xlabel("Years to Retirement")
+        ax_real.set_ylabel("Projected Savings ($)")
+        ax_real.legend()
+        st.pyplot(fig_real)
+
+# -----------------------------
+# Scenario grid: every retirement age x contribution rate, precomputed
+# -----------------------------
+with stage("scenario_grid"):
+    grid = member_grid(member)
+
+with st.expander("🗺️ Scenario Grid (retirement age × contribution rate)"):
+    col_age, col_rate = st.columns(2)
+    grid_age = col_age.slider("Retirement age", int(grid.retirement_ages[0]), int(grid.retirement_ages[-1]),
+                              min(max(retirement_age, int(grid.retirement_ages[0])), int(grid.retirement_ages[-1])))
+    grid_rate = col_rate.slider("Contribution rate (%)", int(grid.contribution_rates[0]),
+                                int(grid.contribution_rates[-1]), grid.nearest_rate(contribution_rate))
+    grid_balance = grid.final_balance(grid_age, grid_rate, market_scenario, inflation_adjusted)
+    current_balance = grid.final_balance(retirement_age, contribution_rate, market_scenario, inflation_adjusted)
+    st.metric(f"Projected savings at {grid_age} with {grid_rate}% contributions", f"${grid_balance:,.0f}",
+              delta=f"{grid_balance - current_balance:,.0f} vs. current plan")
+
+    table = grid.heatmap(market_scenario, inflation_adjusted)
+    fig_grid, ax_grid = plt.subplots()
+    im = ax_grid.imshow(table.values, aspect="auto", origin="lower", cmap="viridis",
+                        extent=[table.columns[0] - 0.5, table.columns[-1] + 0.5,
+                                table.index[0] - 0.5, table.index[-1] + 0.5])
+    ax_grid.plot(grid_rate, grid_age, marker="o", color="red")
+    ax_grid.set_xlabel("Contribution Rate (%)")
+    ax_grid.set_ylabel("Retirement Age")
+    ax_grid.set_title(f"Projected Savings ({market_scenario}{', inflation-adjusted' if inflation_adjusted else ''})")
+    fig_grid.colorbar(im, ax=ax_grid, label="Projected Savings ($)")
+    st.pyplot(fig_grid)
 
 # -----------------------------
 # What-if scenario (AI parsing)
@@ -85,20 +137,20 @@ whatif_balances = None
 new_retirement_age = retirement_age
 
 if st.button("Run What-If Scenario"):
-    with st.spinner("Analyzing with AI..."):
-        ai_text = ask_ollama(f"Extract retirement age or contribution changes from this question: {user_question}. "
-                             f"Reply strictly in format: retirement_age=XX or contribution_rate=YY")
-        
-        # Try extracting numbers
-        match_age = re.search(r"retirement_age\s*=\s*(\d+)", ai_text)
-        match_contrib = re.search(r"contribution_rate\s*=\s*(\d+)", ai_text)
-        
-        if match_age:
-            new_retirement_age = int(match_age.group(1))
-        if match_contrib:
-            contribution_rate = float(match_contrib.group(1))
-        
-        whatif_balances = simulate_growth(contribution_rate, new_retirement_age, market_scenario, inflation_adjusted)
+    with st.spinner("Analyzing..."):
+        # Common phrasings ("retire at 55", "contribute 12%", "5 years earlier")
+        # are parsed locally; Ollama is only asked when the parser isn't sure
+        whatif = resolve_whatif(user_question, retirement_age, contribution_rate, llm=ask_ollama)
+
+        if whatif.retirement_age is not None:
+            new_retirement_age = whatif.retirement_age
+        if whatif.contribution_rate is not None:
+            contribution_rate = whatif.contribution_rate
+        st.caption(f"Understood via {'AI' if whatif.source == 'llm' else 'local rules'}: "
+                   f"retire at {new_retirement_age}, contribute {contribution_rate:.1f}%")
+
+        whatif_balances = simulate_growth(member, contribution_rate, new_retirement_age, market_scenario,
+                                          inflation_adjusted)
 
         # -----------------------------
         # Plot comparison
@@ -126,3 +178,10 @@ if st.button("Run What-If Scenario"):
 
         ai_insight = ask_ollama(insight_prompt)
         st.success(ai_insight)
+
+# -----------------------------
+# Debug: stage timings for this run
+# -----------------------------
+if debug_enabled() or st.query_params.get("debug") == "1":
+    with st.expander("⏱️ Stage timings"):
+        st.dataframe(panel_rows(timings), use_container_width=True)
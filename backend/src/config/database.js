@@ -281,11 +281,17 @@ class DatabaseConnection {
         console.log(`📝 Running migration: ${file}`);
         
         if (this.dbType === 'sqlite') {
-          // For SQLite, split and execute statements separately
+          // For SQLite, split and execute statements separately. Comment lines
+          // are dropped first so a header comment doesn't hide the statement
+          // that follows it in the same chunk.
           const statements = sql.split(';').filter(stmt => stmt.trim().length > 0);
           for (const statement of statements) {
-            const cleanStatement = statement.trim();
-            if (cleanStatement && !cleanStatement.startsWith('--')) {
+            const cleanStatement = statement
+              .split('\n')
+              .filter(line => !line.trim().startsWith('--'))
+              .join('\n')
+              .trim();
+            if (cleanStatement) {
               try {
                 this.sqlite.exec(cleanStatement);
               } catch (error) {